@@ -30,6 +30,7 @@ def get_api_health(base_uri, access_token):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -47,7 +48,7 @@ def get_api_health(base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -32,6 +32,7 @@ def get_api_root(base_uri, access_token):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -51,7 +52,7 @@ def get_api_root(base_uri, access_token):
     try:
         # Make the GET request
         logger.info("Making GET request to /api endpoint")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
         
         # Check if the request was successful
         response.raise_for_status()
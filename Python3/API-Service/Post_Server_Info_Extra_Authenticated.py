@@ -29,6 +29,7 @@ def get_server_info_extra_authenticated(BaseURI, AccessToken, username, password
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -52,7 +53,7 @@ def get_server_info_extra_authenticated(BaseURI, AccessToken, username, password
     try:
         # Make the POST request
         logger.debug(f"Making POST request to {url}")
-        response = requests.post(url, headers=headers, json=payload)
+        response = Http_Client.post(url, headers=headers, json=payload)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -33,6 +33,7 @@ def get_org_unit_access_groups(org_unit_id, base_uri, access_token, page_number=
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -64,7 +65,7 @@ def get_org_unit_access_groups(org_unit_id, base_uri, access_token, page_number=
     try:
         # Make the API request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         
         # Check if the request was successful
         response.raise_for_status()
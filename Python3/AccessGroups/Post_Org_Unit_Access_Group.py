@@ -51,6 +51,7 @@ def create_org_unit_access_group(org_unit_id, group_name, group_description, aut
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -81,7 +82,7 @@ def create_org_unit_access_group(org_unit_id, group_name, group_description, aut
 
     try:
         # Make the POST request
-        response = requests.post(url, headers=headers, json=payload)
+        response = Http_Client.post(url, headers=headers, json=payload)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -42,6 +42,7 @@ def create_device_access_group(org_unit_id, group_name, group_description, devic
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -74,7 +75,7 @@ def create_device_access_group(org_unit_id, group_name, group_description, devic
 
     try:
         # Make the API call
-        response = requests.post(url, headers=headers, json=body)
+        response = Http_Client.post(url, headers=headers, json=body)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -44,6 +44,7 @@ def get_active_issues(BaseURI, AccessToken, orgUnitId, pageNumber=1, pageSize=50
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -82,7 +83,7 @@ def get_active_issues(BaseURI, AccessToken, orgUnitId, pageNumber=1, pageSize=50
 
     try:
         # Send the GET request
-        response = requests.get(url, headers=headers, params=query_string)
+        response = Http_Client.get(url, headers=headers, params=query_string)
 
         # Check if the request was successful
         response.raise_for_status()
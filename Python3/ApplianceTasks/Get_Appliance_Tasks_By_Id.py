@@ -1,5 +1,6 @@
 import requests
 import logging
+from Utilities import Http_Client
 
 def get_appliance_task_information(taskId, BaseURI, AccessToken):
     """
@@ -50,7 +51,7 @@ def get_appliance_task_information(taskId, BaseURI, AccessToken):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check the response status code
         response.raise_for_status()
@@ -29,6 +29,7 @@ def validate_auth_token(base_uri, access_token):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -46,7 +47,7 @@ def validate_auth_token(base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check the response status code
         response.raise_for_status()
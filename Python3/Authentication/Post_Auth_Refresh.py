@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def refresh_auth_token(base_uri, refresh_token, access_expiry=None, refresh_expiry=None):
     """
@@ -62,7 +63,7 @@ def refresh_auth_token(base_uri, refresh_token, access_expiry=None, refresh_expi
 
     try:
         # Send POST request
-        response = requests.post(url, headers=headers, data=refresh_token)
+        response = Http_Client.post(url, headers=headers, data=refresh_token)
         
         # Check for successful response
         response.raise_for_status()
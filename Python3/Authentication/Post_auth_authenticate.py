@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def authenticate_user(base_uri, jwt_token, access_expiry=None, refresh_expiry=None):
     """
@@ -64,7 +65,7 @@ def authenticate_user(base_uri, jwt_token, access_expiry=None, refresh_expiry=No
 
     try:
         # Send POST request
-        response = requests.post(url, headers=headers)
+        response = Http_Client.post(url, headers=headers)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -33,6 +33,7 @@ def get_device_filters(base_uri, access_token, view_scope=None, page_number=None
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -64,7 +65,7 @@ def get_device_filters(base_uri, access_token, view_scope=None, page_number=None
 
     # Make the API request
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         response.raise_for_status()  # Raise an exception for bad status codes
         
         logger.debug(f"Request URL: {response.url}")
@@ -0,0 +1,186 @@
+"""
+Bulk Custom Property Writer
+
+This module pushes a desired set of custom property values to many devices, sending a PUT only
+where the current value differs, instead of one blocking update_device_custom_property call per
+device and property whether or not anything changed.
+
+Key Features:
+- Takes a desired-state mapping {deviceId: {propertyId: value}}
+- Reads current values from a cache (a dict or a Devices/Custom_Property_Matrix.py matrix) or
+  fetches them concurrently with get_device_custom_properties
+- Issues only the PUTs that change a value, in parallel across devices, under a shared rate limit
+- Writes a per-device result line to a checkpoint file (Utilities/Checkpoint.py) as each device
+  completes; rerunning with the same file skips devices already done and retries failures
+- Dry-run mode reports the planned changes without writing
+
+Usage:
+    from Devices.Bulk_Custom_Property_Writer import write_custom_properties
+
+    desired = {1001: {7: "Gold", 8: "Nightly"}, 1002: {7: "Silver"}}
+    summary = write_custom_properties(desired, base_uri, access_token,
+                                      checkpoint_path="custom_property_write.jsonl", rate=10)
+
+Notes:
+- Values are compared as strings, and a missing value equals an empty string, matching how
+  N-central stores custom property values.
+- A cached current value can be stale; pass current=None to always read live values.
+"""
+
+import requests
+
+from Devices.Get_Device_Custom_Properties import get_device_custom_properties
+from Devices.Put_Custom_Property_By_Property_Id import update_device_custom_property
+from Utilities.Checkpoint import Checkpoint
+from Utilities.Concurrency import imap_unordered
+from Utilities.Rate_Limiter import RateLimiter
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE = 10  # Requests per second across all workers
+
+STATUS_UNCHANGED = "unchanged"
+STATUS_UPDATED = "updated"
+STATUS_PARTIAL = "partial"
+STATUS_FAILED = "failed"
+STATUS_PLANNED = "planned"
+
+
+def _normalize(value):
+    return "" if value is None else str(value)
+
+
+def _write_error(error):
+    """Return the message for a failed PUT: the exception, plus the start of the server's error body."""
+    response = getattr(error, "response", None)
+    if response is None or not response.text:
+        return str(error) or type(error).__name__
+    return f"{error}: {response.text[:200]}"
+
+
+def _cached_values(current, device_id, property_ids):
+    """Return {propertyId: value} from the cache, or None if the device is not cached."""
+    if current is None:
+        return None
+    if isinstance(current, dict):
+        values = current.get(device_id)
+        return dict(values) if values is not None else None
+    # A CustomPropertyMatrix (or anything with the same value() lookup)
+    if device_id not in current:
+        return None
+    values = {}
+    for property_id in property_ids:
+        try:
+            values[property_id] = current.value(device_id, property_id)
+        except KeyError:
+            values[property_id] = None
+    return values
+
+
+def write_custom_properties(desired, base_uri, access_token, current=None, checkpoint_path=None,
+                            max_workers=DEFAULT_MAX_WORKERS, rate=DEFAULT_RATE, dry_run=False):
+    """
+    SYNOPSIS
+    Bring devices' custom properties to the desired values, writing only what changed.
+
+    DESCRIPTION
+    Devices are processed in parallel (max_workers). For each device the current values are
+    taken from the cache or fetched, compared with the desired values, and only the differing
+    properties are updated. Every request (reads and writes) draws from one rate limiter shared
+    by all workers. Each device's outcome is appended to the checkpoint file as it completes.
+
+    ARGUMENTS
+    desired : dict
+        {deviceId: {propertyId: value}}
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    current : dict or CustomPropertyMatrix, optional
+        Cached current values ({deviceId: {propertyId: value}} or a matrix). Devices not in the
+        cache are fetched.
+    checkpoint_path : str, optional
+        A JSON Lines file receiving one result per device. Devices already recorded as
+        "updated" or "unchanged" in it are skipped, so an interrupted run can be resumed.
+    max_workers : int, optional
+        The maximum number of devices processed concurrently. Defaults to 8.
+    rate : float, optional
+        The maximum requests per second across all workers. Defaults to 10.
+    dry_run : bool, optional
+        Compare only; report the planned changes with status "planned".
+
+    OUTPUTS
+    dict
+        {"results": {deviceId: result}, "counts": {status: devices}, "resumed": devices skipped}
+        where result is {"status", "updated": [propertyIds], "unchanged": [propertyIds],
+        "failed": {propertyId: message}, "error": message or None}
+
+    USAGE_EXAMPLE
+    summary = write_custom_properties({1001: {7: "Gold"}}, base_uri, access_token, dry_run=True)
+    print(summary["counts"])
+    """
+    limiter = RateLimiter(rate=rate, burst=max_workers)
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+
+    def process(device_id):
+        wanted = desired[device_id]
+        result = {"status": STATUS_UNCHANGED, "updated": [], "unchanged": [], "failed": {}, "error": None}
+
+        values = _cached_values(current, device_id, wanted)
+        if values is None:
+            limiter.acquire()
+            response = get_device_custom_properties(device_id, base_uri, access_token)
+            items = response.get("data", []) if isinstance(response, dict) else response or []
+            values = {item.get("propertyId"): item.get("value") for item in items}
+
+        for property_id, value in wanted.items():
+            if _normalize(values.get(property_id)) == _normalize(value):
+                result["unchanged"].append(property_id)
+                continue
+            if dry_run:
+                result["updated"].append(property_id)
+                continue
+            limiter.acquire()
+            try:
+                # Failure is decided by the HTTP status; the error body has no reliable shape
+                update_device_custom_property(device_id, property_id, _normalize(value), base_uri, access_token,
+                                              raise_on_error=True)
+            except requests.exceptions.RequestException as e:
+                result["failed"][property_id] = _write_error(e)
+            else:
+                result["updated"].append(property_id)
+
+        if dry_run:
+            result["status"] = STATUS_PLANNED if result["updated"] else STATUS_UNCHANGED
+        elif result["failed"]:
+            result["status"] = STATUS_PARTIAL if result["updated"] else STATUS_FAILED
+        elif result["updated"]:
+            result["status"] = STATUS_UPDATED
+        return result
+
+    results = {}
+    resumed = 0
+    try:
+        pending = []
+        for device_id in desired:
+            if checkpoint is not None and not dry_run and checkpoint.completed(device_id):
+                resumed += 1
+            else:
+                pending.append(device_id)
+
+        for device_id, result, error in imap_unordered(process, pending, max_workers=max_workers):
+            if error is not None:
+                result = {"status": STATUS_FAILED, "updated": [], "unchanged": [], "failed": {},
+                          "error": str(error) or type(error).__name__}
+            results[device_id] = result
+            if checkpoint is not None and not dry_run:
+                checkpoint.record(device_id, result)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    counts = {}
+    for result in results.values():
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print(f"Custom properties: {len(results)} devices processed, {resumed} already done; "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+    return {"results": results, "counts": counts, "resumed": resumed}
@@ -0,0 +1,253 @@
+"""
+Bulk Asset Lifecycle Import
+
+This module imports asset lifecycle information (warranty, lease, purchase dates, ...) for many
+devices from a CSV file, sending each device a PATCH that contains only the fields that actually
+change, instead of calling patch_device_asset_lifecycle_info by hand row after row.
+
+Key Features:
+- Streams the CSV row by row, so files with tens of thousands of rows are never loaded whole
+- Validates every row before any request: deviceId, dates (normalized to YYYY-MM-DD), cost and
+  description length; invalid rows are reported and skipped
+- Fetches the current lifecycle info concurrently and builds a minimal PATCH body per device;
+  devices already up to date get no request
+- Bounded concurrency over the shared pooled HTTP client, with an optional rate limit
+- Checkpointing (Utilities/Checkpoint.py): each row's outcome is journaled as it completes, and a
+  rerun with the same checkpoint file skips the devices already imported
+- Returns and prints a summary report by status
+
+Usage:
+    from Devices.Bulk_Lifecycle_Import import import_lifecycle_csv
+
+    summary = import_lifecycle_csv("warranty_dates.csv", base_uri, access_token,
+                                   checkpoint_path="warranty_import.jsonl", max_workers=8)
+
+CSV format:
+    deviceId,warrantyExpiryDate,leaseExpiryDate,purchaseDate
+    1001,2027-03-31,,2024-03-31
+
+Notes:
+- Columns other than deviceId and the LIFECYCLE_FIELDS are ignored. An empty cell leaves the
+  field unchanged.
+- A deviceId appearing on more than one row is imported from its first row; later rows are
+  reported as duplicates.
+"""
+
+import csv
+from datetime import datetime
+
+from Devices.Get_Life_Cycle_Info_By_Device_Id import get_device_asset_lifecycle_info
+from Devices.Patch_Life_Cycle_Info_By_Device_Id import patch_device_asset_lifecycle_info
+from Utilities.Checkpoint import Checkpoint
+from Utilities.Concurrency import imap_unordered
+from Utilities.Rate_Limiter import RateLimiter
+
+# Writable lifecycle fields (updateWarrantyError is read-only)
+LIFECYCLE_FIELDS = ("assetTag", "cost", "description", "expectedReplacementDate", "leaseExpiryDate",
+                    "location", "purchaseDate", "warrantyExpiryDate")
+DATE_FIELDS = ("expectedReplacementDate", "leaseExpiryDate", "purchaseDate", "warrantyExpiryDate")
+DESCRIPTION_MAX_LENGTH = 255
+
+# Accepted input date formats, tried in order; values are sent as YYYY-MM-DD
+DEFAULT_DATE_FORMATS = ("%Y-%m-%d",)
+
+DEFAULT_MAX_WORKERS = 8
+
+STATUS_UPDATED = "updated"
+STATUS_UNCHANGED = "unchanged"
+STATUS_INVALID = "invalid"
+STATUS_FAILED = "failed"
+STATUS_PLANNED = "planned"
+
+
+def _parse_date(value, date_formats):
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"'{value}' is not a date in any of the formats {list(date_formats)}")
+
+
+def validate_row(row, date_formats=DEFAULT_DATE_FORMATS):
+    """
+    SYNOPSIS
+    Validate and normalize one CSV row.
+
+    ARGUMENTS
+    row : dict
+        A csv.DictReader row.
+    date_formats : tuple, optional
+        strptime formats accepted for date fields. Defaults to ("%Y-%m-%d",).
+
+    OUTPUTS
+    tuple
+        (device_id, {field: normalized value}); raises ValueError describing every problem found.
+    """
+    problems = []
+    device_id = None
+    try:
+        device_id = int(str(row.get("deviceId") or "").strip())
+    except ValueError:
+        problems.append(f"deviceId '{row.get('deviceId')}' is not an integer")
+
+    fields = {}
+    for field in LIFECYCLE_FIELDS:
+        value = (row.get(field) or "").strip()
+        if not value:
+            continue
+        try:
+            if field in DATE_FIELDS:
+                value = _parse_date(value, date_formats)
+            elif field == "cost":
+                value = float(value)
+            elif field == "description" and len(value) > DESCRIPTION_MAX_LENGTH:
+                raise ValueError(f"longer than {DESCRIPTION_MAX_LENGTH} characters")
+        except ValueError as e:
+            problems.append(f"{field}: {e}")
+            continue
+        fields[field] = value
+
+    if problems:
+        raise ValueError("; ".join(problems))
+    if not fields:
+        raise ValueError("no lifecycle fields to import")
+    return device_id, fields
+
+
+def _same(field, current, desired):
+    if current is None:
+        return False
+    if field in DATE_FIELDS:
+        return str(current)[:10] == desired
+    if field == "cost":
+        try:
+            return float(current) == desired
+        except (TypeError, ValueError):
+            return False
+    return str(current) == desired
+
+
+def minimal_patch(current, desired):
+    """Return the fields of desired whose values differ from current (the PATCH body)."""
+    current = current or {}
+    return {field: value for field, value in desired.items() if not _same(field, current.get(field), value)}
+
+
+def _rows(csv_path, date_formats, checkpoint, report):
+    """Yield (line, device_id, fields) for valid, not yet imported rows; report the others."""
+    seen = {}
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as csv_file:
+        reader = csv.DictReader(csv_file)
+        if "deviceId" not in (reader.fieldnames or []):
+            raise ValueError(f"{csv_path} has no deviceId column")
+        for row in reader:
+            line = reader.line_num
+            try:
+                device_id, fields = validate_row(row, date_formats)
+            except ValueError as e:
+                report(line, row.get("deviceId"), {"status": STATUS_INVALID, "error": str(e)})
+                continue
+            if device_id in seen:
+                report(line, device_id, {"status": STATUS_INVALID,
+                                         "error": f"duplicate deviceId (first on line {seen[device_id]})"})
+                continue
+            seen[device_id] = line
+            if checkpoint is not None and checkpoint.completed(device_id):
+                report(line, device_id, None)
+                continue
+            yield line, device_id, fields
+
+
+def import_lifecycle_csv(csv_path, base_uri, access_token, checkpoint_path=None, max_workers=DEFAULT_MAX_WORKERS,
+                         rate=None, date_formats=DEFAULT_DATE_FORMATS, dry_run=False):
+    """
+    SYNOPSIS
+    Import asset lifecycle information from a CSV file, patching only changed fields.
+
+    DESCRIPTION
+    Rows are read and validated one at a time and handed to a bounded pool of workers. Each
+    worker fetches the device's current lifecycle info, computes the minimal PATCH body and
+    sends it if it is not empty. Outcomes are journaled to the checkpoint file as they complete.
+
+    ARGUMENTS
+    csv_path : str
+        The CSV file, with a deviceId column and any of LIFECYCLE_FIELDS.
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    checkpoint_path : str, optional
+        A JSON Lines journal of per-row outcomes; devices recorded as "updated" or "unchanged"
+        in it are skipped on a rerun.
+    max_workers : int, optional
+        The maximum number of devices processed concurrently. Defaults to 8.
+    rate : float, optional
+        The maximum requests per second across all workers. Defaults to no limit.
+    date_formats : tuple, optional
+        strptime formats accepted for date fields. Defaults to ("%Y-%m-%d",).
+    dry_run : bool, optional
+        Compute the PATCH bodies without sending them (status "planned").
+
+    OUTPUTS
+    dict
+        {"counts": {status: rows}, "resumed": rows skipped, "errors": [(line, deviceId, message)]}
+
+    USAGE_EXAMPLE
+    summary = import_lifecycle_csv("leases.csv", base_uri, access_token, dry_run=True)
+    print(summary["counts"])
+    """
+    limiter = RateLimiter(rate=rate, burst=max_workers) if rate else None
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path and not dry_run else None
+    counts = {}
+    errors = []
+    resumed = 0
+
+    def report(line, device_id, result):
+        nonlocal resumed
+        if result is None:
+            resumed += 1
+            return
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if result.get("error"):
+            errors.append((line, device_id, result["error"]))
+        if checkpoint is not None and result["status"] != STATUS_INVALID:
+            checkpoint.record(device_id, dict(result, line=line))
+
+    def process(task):
+        _, device_id, fields = task
+        if limiter is not None:
+            limiter.acquire()
+        current = get_device_asset_lifecycle_info(device_id, base_uri, access_token)
+        if current is None:
+            raise RuntimeError("could not read the current lifecycle info")
+        if isinstance(current, dict) and isinstance(current.get("data"), dict):
+            current = current["data"]
+
+        body = minimal_patch(current, fields)
+        if not body:
+            return {"status": STATUS_UNCHANGED, "fields": []}
+        if dry_run:
+            return {"status": STATUS_PLANNED, "fields": sorted(body), "patch": body}
+        if limiter is not None:
+            limiter.acquire()
+        patch_device_asset_lifecycle_info(device_id, body, base_uri, access_token)
+        return {"status": STATUS_UPDATED, "fields": sorted(body)}
+
+    try:
+        tasks = _rows(csv_path, date_formats, checkpoint, report)
+        for (line, device_id, _), result, error in imap_unordered(process, tasks, max_workers=max_workers):
+            if error is not None:
+                result = {"status": STATUS_FAILED, "error": str(error) or type(error).__name__}
+            report(line, device_id, result)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    print(f"Lifecycle import of {csv_path}: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+          + f" ({resumed} already imported)")
+    for line, device_id, message in errors[:20]:
+        print(f"  line {line}, device {device_id}: {message}")
+    if len(errors) > 20:
+        print(f"  ... and {len(errors) - 20} more")
+    return {"counts": counts, "resumed": resumed, "errors": errors}
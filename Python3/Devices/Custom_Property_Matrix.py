@@ -0,0 +1,266 @@
+"""
+Device Custom Property Matrix
+
+This module fetches the custom properties of many devices concurrently and keeps them as a
+device x property matrix in memory, so audits such as "which devices have property P = V" or
+"how are the values of P distributed per customer" are answered without further API calls and
+without joining per-device results by hand.
+
+Key Features:
+- Built concurrently from get_device_custom_properties over the shared pooled HTTP client
+- Columnar storage: one typed array of value codes per property, one row per device
+- Dictionary encoding: property IDs map to column numbers, and each column maps its distinct
+  values to small integer codes, so repeated values (e.g. contract tiers) are stored once
+- Queries: devices_where(), value_distribution() per customer (or any other device field),
+  value(), and row-wise iteration for export
+
+Usage:
+    from Devices.Custom_Property_Matrix import CustomPropertyMatrix
+
+    matrix = CustomPropertyMatrix.build(iter_devices(base_uri, access_token), base_uri, access_token)
+    print(matrix.devices_where("Contract Tier", "Gold"))
+    print(matrix.value_distribution("Contract Tier"))
+
+Notes:
+- Properties can be referred to by propertyId or by propertyName.
+- Devices whose properties could not be fetched are listed in matrix.errors and have no row.
+"""
+
+from array import array
+from collections import Counter
+
+from Devices.Get_Device_Custom_Properties import get_device_custom_properties
+from Utilities.Concurrency import imap_unordered
+
+# Code stored for a device that does not have the property
+MISSING = -1
+
+DEFAULT_MAX_WORKERS = 16
+
+# Device fields kept per row for grouping (dictionary-encoded like the property values)
+GROUP_FIELDS = ("customerId", "siteId", "orgUnitId")
+
+
+class _EncodedColumn:
+    """A column of dictionary-encoded values: distinct values plus one code per row."""
+
+    def __init__(self):
+        self.values = []
+        self.codes_by_value = {}
+        self.codes = array("l")
+
+    def encode(self, value):
+        key = _hashable(value)
+        code = self.codes_by_value.get(key)
+        if code is None:
+            code = self.codes_by_value[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def set(self, row, value):
+        if len(self.codes) <= row:
+            self.codes.extend([MISSING] * (row + 1 - len(self.codes)))
+        self.codes[row] = self.encode(value)
+
+    def code_at(self, row):
+        return self.codes[row] if row < len(self.codes) else MISSING
+
+    def value_at(self, row):
+        code = self.code_at(row)
+        return self.values[code] if code != MISSING else None
+
+
+def _hashable(value):
+    if isinstance(value, (list, dict)):
+        return repr(value)
+    return value
+
+
+def _property_items(response):
+    if isinstance(response, dict):
+        response = response.get("data")
+    return response if isinstance(response, list) else []
+
+
+class CustomPropertyMatrix:
+    """
+    SYNOPSIS
+    A device x custom property matrix with dictionary-encoded columns.
+
+    DESCRIPTION
+    Row i describes one device: its ID in device_ids[i], its grouping fields (customerId, siteId,
+    orgUnitId) in encoded columns, and for every property a code into that property's value
+    dictionary (or MISSING).
+
+    USAGE_EXAMPLE
+    matrix = CustomPropertyMatrix()
+    matrix.add_device({"deviceId": 1, "customerId": 100}, [{"propertyId": 7, "propertyName": "Tier", "value": "Gold"}])
+    print(matrix.devices_where(7, "Gold"))
+    """
+
+    def __init__(self):
+        self.device_ids = array("q")
+        self.errors = {}
+        self._rows = {}
+        self._group_columns = {field: _EncodedColumn() for field in GROUP_FIELDS}
+        self._property_ids = []
+        self._property_names = {}
+        self._columns = []
+        self._column_of = {}
+
+    @classmethod
+    def build(cls, devices, base_uri, access_token, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        SYNOPSIS
+        Fetch the custom properties of every device concurrently and build the matrix.
+
+        ARGUMENTS
+        devices : iterable
+            Device dicts (with deviceId and customerId, e.g. from iter_devices() or a DeviceIndex)
+            or plain device IDs. May be lazy.
+        base_uri : str
+            The base URI of the N-central server.
+        access_token : str
+            The access token for authentication.
+        max_workers : int, optional
+            The maximum number of concurrent requests. Defaults to 16.
+
+        OUTPUTS
+        CustomPropertyMatrix
+            The populated matrix; failed devices are in .errors.
+        """
+        matrix = cls()
+        devices = (device if isinstance(device, dict) else {"deviceId": device} for device in devices)
+
+        def fetch(device):
+            return get_device_custom_properties(device["deviceId"], base_uri, access_token)
+
+        for device, response, error in imap_unordered(fetch, devices, max_workers=max_workers):
+            if error is not None:
+                matrix.errors[device["deviceId"]] = str(error) or type(error).__name__
+                continue
+            matrix.add_device(device, _property_items(response))
+
+        print(f"Built custom property matrix: {len(matrix)} devices x {len(matrix._property_ids)} properties"
+              f" ({len(matrix.errors)} failed)")
+        return matrix
+
+    def __len__(self):
+        return len(self.device_ids)
+
+    def __contains__(self, device_id):
+        return device_id in self._rows
+
+    @property
+    def properties(self):
+        """{propertyId: propertyName} for every property seen."""
+        return {property_id: self._property_names.get(property_id) for property_id in self._property_ids}
+
+    def _column(self, property_id):
+        column = self._column_of.get(property_id)
+        if column is None:
+            column = self._column_of[property_id] = len(self._columns)
+            self._property_ids.append(property_id)
+            self._columns.append(_EncodedColumn())
+        return self._columns[column]
+
+    def _find_column(self, prop):
+        column = self._column_of.get(prop)
+        if column is None:
+            matches = [property_id for property_id, name in self._property_names.items() if name == prop]
+            if len(matches) > 1:
+                raise ValueError(f"Property name '{prop}' is ambiguous; use one of the propertyIds {matches}")
+            column = self._column_of.get(matches[0]) if matches else None
+        if column is None:
+            raise KeyError(f"Unknown custom property: {prop}")
+        return self._columns[column]
+
+    def add_device(self, device, properties):
+        """Add or replace one device's row from its device dict and custom property items."""
+        device_id = device["deviceId"]
+        row = self._rows.get(device_id)
+        if row is None:
+            row = self._rows[device_id] = len(self.device_ids)
+            self.device_ids.append(device_id)
+        else:
+            for column in self._columns:
+                if row < len(column.codes):
+                    column.codes[row] = MISSING
+
+        for field, column in self._group_columns.items():
+            column.set(row, device.get(field))
+        for item in properties:
+            property_id = item.get("propertyId")
+            if property_id is None:
+                continue
+            if item.get("propertyName") is not None:
+                self._property_names[property_id] = item["propertyName"]
+            self._column(property_id).set(row, item.get("value"))
+
+    def value(self, device_id, prop):
+        """Return a device's value for a property, or None."""
+        row = self._rows.get(device_id)
+        return self._find_column(prop).value_at(row) if row is not None else None
+
+    def devices_where(self, prop, value):
+        """
+        SYNOPSIS
+        Return the IDs of devices whose property equals value.
+
+        ARGUMENTS
+        prop : int or str
+            The propertyId or propertyName.
+        value
+            The value to match; None matches devices without the property.
+
+        OUTPUTS
+        list
+            Device IDs, in row order.
+        """
+        column = self._find_column(prop)
+        if value is None:
+            return [device_id for row, device_id in enumerate(self.device_ids) if column.code_at(row) == MISSING]
+        code = column.codes_by_value.get(_hashable(value))
+        if code is None:
+            return []
+        return [self.device_ids[row] for row, row_code in enumerate(column.codes) if row_code == code]
+
+    def value_distribution(self, prop, by="customerId"):
+        """
+        SYNOPSIS
+        Count the values of a property per group.
+
+        ARGUMENTS
+        prop : int or str
+            The propertyId or propertyName.
+        by : str, optional
+            One of GROUP_FIELDS. Defaults to "customerId".
+
+        OUTPUTS
+        dict
+            {group value: {property value: device count}}; devices without the property are
+            counted under None.
+        """
+        if by not in self._group_columns:
+            raise ValueError(f"Cannot group by '{by}'; expected one of {list(GROUP_FIELDS)}")
+        column = self._find_column(prop)
+        group = self._group_columns[by]
+        counts = Counter((group.code_at(row), column.code_at(row)) for row in range(len(self.device_ids)))
+
+        distribution = {}
+        for (group_code, value_code), count in counts.items():
+            group_value = group.values[group_code] if group_code != MISSING else None
+            value = column.values[value_code] if value_code != MISSING else None
+            distribution.setdefault(group_value, {})[value] = count
+        return distribution
+
+    def rows(self):
+        """Yield one dict per device: deviceId, grouping fields and {propertyId: value}."""
+        for row, device_id in enumerate(self.device_ids):
+            record = {"deviceId": device_id}
+            for field, column in self._group_columns.items():
+                record[field] = column.value_at(row)
+            record["properties"] = {property_id: self._columns[index].value_at(row)
+                                    for index, property_id in enumerate(self._property_ids)
+                                    if self._columns[index].code_at(row) != MISSING}
+            yield record
@@ -0,0 +1,314 @@
+"""
+In-Memory Device Index
+
+This module keeps the device list in memory with hash indexes, so lookups such as "find the device
+named X" or "all devices at site Y" are dictionary lookups instead of a new get_devices crawl or a
+linear scan of a list.
+
+Key Features:
+- Built from one paginated crawl with iter_devices(), decoding devices as they arrive
+- Hash indexes on deviceId, discoveredName, longName, customerId, siteId and orgUnitId
+- Compact storage: each device is one tuple in a slot list, laid out by a shared field list, and
+  the non-unique indexes hold slot numbers in typed arrays instead of references to dicts
+- Incremental refresh: update() upserts changed devices only, refresh() recrawls and also drops
+  devices that no longer exist
+- Name lookups are case-insensitive
+
+Usage:
+    from Devices.Device_Index import DeviceIndex
+
+    index = DeviceIndex.build(base_uri, access_token)
+    device = index.get(12345)
+    matches = index.find_by_name("FILESERVER01")
+    site_devices = index.lookup("siteId", 42)
+
+    index.refresh(base_uri, access_token)  # later, pick up changes
+
+Notes:
+- Records are returned as new dicts; changing them does not change the index. Fields whose
+  value is null are omitted from returned records.
+- Devices without a deviceId are ignored.
+"""
+
+from array import array
+
+from Devices.Get_Devices import iter_devices
+
+# Fields with a hash index; deviceId is unique, the others map a value to many devices
+INDEXED_FIELDS = ("deviceId", "discoveredName", "longName", "customerId", "siteId", "orgUnitId")
+
+# Indexed fields whose values are compared case-insensitively
+NAME_FIELDS = ("discoveredName", "longName")
+
+DEFAULT_PAGE_SIZE = 1000
+
+# Compact the slot list once more than this fraction of it is free
+_COMPACT_RATIO = 0.5
+
+
+def _index_key(field, value):
+    if field in NAME_FIELDS and isinstance(value, str):
+        return value.casefold()
+    return value
+
+
+class DeviceIndex:
+    """
+    SYNOPSIS
+    An in-memory device store with hash indexes on the common lookup fields.
+
+    DESCRIPTION
+    Devices are stored as tuples in a list of slots; the field list shared by all tuples grows
+    when a device carries a field not seen before (older tuples are simply shorter). deviceId
+    maps to a slot, and each other indexed field maps a value to an array of slots.
+
+    ARGUMENTS
+    devices : iterable of dict, optional
+        Devices to load initially.
+
+    USAGE_EXAMPLE
+    index = DeviceIndex(get_devices(base_uri, access_token, page_size=1000)["data"])
+    print(len(index), index.lookup("customerId", 100))
+    """
+
+    def __init__(self, devices=()):
+        self._fields = []
+        self._positions = {}
+        self._rows = []
+        self._free = []
+        self._by_id = {}
+        self._indexes = {field: {} for field in INDEXED_FIELDS if field != "deviceId"}
+        self.update(devices)
+
+    @classmethod
+    def build(cls, base_uri, access_token, filter_id=None, page_size=DEFAULT_PAGE_SIZE, select=None):
+        """
+        SYNOPSIS
+        Create an index from one paginated crawl of GET /api/devices.
+
+        ARGUMENTS
+        base_uri : str
+            The base URI of the N-central server.
+        access_token : str
+            The access token for authentication.
+        filter_id : int, optional
+            The ID of a device filter to restrict the crawl.
+        page_size : int, optional
+            The number of devices per page. Defaults to 1000.
+        select : str, optional
+            The select expression for field selection. Must include the indexed fields.
+
+        OUTPUTS
+        DeviceIndex
+            The populated index.
+
+        NOTES
+        - Raises requests.exceptions.RequestException if a page cannot be fetched.
+        """
+        index = cls()
+        index.update(iter_devices(base_uri, access_token, filter_id=filter_id, page_size=page_size,
+                                  select=select, sort_by="deviceId", sort_order="asc"))
+        return index
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, device_id):
+        return device_id in self._by_id
+
+    def __iter__(self):
+        for slot in self._by_id.values():
+            yield self._record(slot)
+
+    def _encode(self, device):
+        for field in device:
+            if field not in self._positions:
+                self._positions[field] = len(self._fields)
+                self._fields.append(field)
+        row = [None] * len(self._fields)
+        for field, value in device.items():
+            row[self._positions[field]] = value
+        return tuple(row)
+
+    def _value(self, row, field):
+        position = self._positions.get(field)
+        return row[position] if position is not None and position < len(row) else None
+
+    def _record(self, slot):
+        row = self._rows[slot]
+        return {field: value for field, value in zip(self._fields, row) if value is not None}
+
+    def _link(self, slot, row):
+        for field, entries in self._indexes.items():
+            value = self._value(row, field)
+            if value is not None:
+                entries.setdefault(_index_key(field, value), array("L")).append(slot)
+
+    def _unlink(self, slot, row):
+        for field, entries in self._indexes.items():
+            value = self._value(row, field)
+            if value is None:
+                continue
+            key = _index_key(field, value)
+            slots = entries[key]
+            slots.remove(slot)
+            if not slots:
+                del entries[key]
+
+    def _upsert(self, device):
+        device_id = device.get("deviceId")
+        if device_id is None:
+            return None
+        row = self._encode(device)
+        slot = self._by_id.get(device_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else len(self._rows)
+            if slot == len(self._rows):
+                self._rows.append(row)
+            else:
+                self._rows[slot] = row
+            self._by_id[device_id] = slot
+            self._link(slot, row)
+            return "added"
+
+        old_row = self._rows[slot]
+        if old_row + (None,) * (len(row) - len(old_row)) == row:
+            return "unchanged"
+        self._unlink(slot, old_row)
+        self._rows[slot] = row
+        self._link(slot, row)
+        return "updated"
+
+    def update(self, devices):
+        """
+        SYNOPSIS
+        Add new devices and replace changed ones.
+
+        ARGUMENTS
+        devices : iterable of dict
+            Full device records, e.g. from iter_devices() or an incremental sync.
+
+        OUTPUTS
+        dict
+            {"added": count, "updated": count, "unchanged": count}
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0}
+        for device in devices:
+            outcome = self._upsert(device)
+            if outcome is not None:
+                counts[outcome] += 1
+        return counts
+
+    def remove(self, device_id):
+        """Remove a device from the index. Returns True if it was present."""
+        slot = self._by_id.pop(device_id, None)
+        if slot is None:
+            return False
+        self._unlink(slot, self._rows[slot])
+        self._rows[slot] = None
+        self._free.append(slot)
+        if len(self._free) > len(self._rows) * _COMPACT_RATIO:
+            self.compact()
+        return True
+
+    def refresh(self, base_uri, access_token, filter_id=None, page_size=DEFAULT_PAGE_SIZE, select=None):
+        """
+        SYNOPSIS
+        Recrawl GET /api/devices and bring the index up to date.
+
+        DESCRIPTION
+        New and changed devices are upserted as pages arrive; unchanged devices keep their slot
+        and index entries untouched. Once the crawl has completed, devices that were not returned
+        are removed. If the crawl fails part-way nothing is removed.
+
+        ARGUMENTS
+        base_uri : str
+            The base URI of the N-central server.
+        access_token : str
+            The access token for authentication.
+        filter_id : int, optional
+            The device filter the index was built with.
+        page_size : int, optional
+            The number of devices per page. Defaults to 1000.
+        select : str, optional
+            The select expression the index was built with.
+
+        OUTPUTS
+        dict
+            {"added": count, "updated": count, "unchanged": count, "removed": count}
+        """
+        seen = set()
+
+        def tracked(devices):
+            for device in devices:
+                seen.add(device.get("deviceId"))
+                yield device
+
+        counts = self.update(tracked(iter_devices(base_uri, access_token, filter_id=filter_id, page_size=page_size,
+                                                  select=select, sort_by="deviceId", sort_order="asc")))
+        gone = [device_id for device_id in self._by_id if device_id not in seen]
+        for device_id in gone:
+            self.remove(device_id)
+        counts["removed"] = len(gone)
+        return counts
+
+    def compact(self):
+        """Rebuild the slot list without free slots and trim the field list to fields in use."""
+        used = sorted({position for slot in self._by_id.values()
+                       for position, value in enumerate(self._rows[slot]) if value is not None})
+        self._fields = [self._fields[position] for position in used]
+        self._positions = {field: position for position, field in enumerate(self._fields)}
+        rows, by_id = [], {}
+        for device_id, slot in self._by_id.items():
+            row = self._rows[slot]
+            by_id[device_id] = len(rows)
+            rows.append(tuple(row[position] if position < len(row) else None for position in used))
+        self._rows, self._by_id, self._free = rows, by_id, []
+        self._indexes = {field: {} for field in self._indexes}
+        for slot, row in enumerate(self._rows):
+            self._link(slot, row)
+
+    def get(self, device_id):
+        """Return the device with this deviceId, or None."""
+        slot = self._by_id.get(device_id)
+        return self._record(slot) if slot is not None else None
+
+    def lookup(self, field, value):
+        """
+        SYNOPSIS
+        Return every device whose indexed field equals value.
+
+        ARGUMENTS
+        field : str
+            One of INDEXED_FIELDS.
+        value
+            The value to match. Names (discoveredName, longName) match case-insensitively.
+
+        OUTPUTS
+        list
+            The matching devices, in insertion order.
+        """
+        if field == "deviceId":
+            device = self.get(value)
+            return [device] if device is not None else []
+        if field not in self._indexes:
+            raise ValueError(f"'{field}' is not indexed; expected one of {list(INDEXED_FIELDS)}")
+        return [self._record(slot) for slot in self._indexes[field].get(_index_key(field, value), ())]
+
+    def find_by_name(self, name):
+        """Return devices whose discoveredName or longName equals name (case-insensitive)."""
+        slots = []
+        for field in NAME_FIELDS:
+            for slot in self._indexes[field].get(_index_key(field, name), ()):
+                if slot not in slots:
+                    slots.append(slot)
+        return [self._record(slot) for slot in slots]
+
+    def ids(self, field, value):
+        """Return the deviceIds of devices whose indexed field equals value, without building records."""
+        if field == "deviceId":
+            return [value] if value in self._by_id else []
+        if field not in self._indexes:
+            raise ValueError(f"'{field}' is not indexed; expected one of {list(INDEXED_FIELDS)}")
+        return [self._value(self._rows[slot], "deviceId")
+                for slot in self._indexes[field].get(_index_key(field, value), ())]
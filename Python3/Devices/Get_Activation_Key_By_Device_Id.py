@@ -0,0 +1,77 @@
+def get_device_activation_key(device_id, base_uri, access_token):
+    """
+    SYNOPSIS
+    Retrieve the activation key of a device.
+
+    DESCRIPTION
+    This function calls the GET /api/devices/{deviceId}/activation-key endpoint to retrieve the
+    activation key for a device with a specific ID.
+
+    ARGUMENTS
+    device_id : str
+        The ID of the device for which to retrieve the activation key.
+    base_uri : str
+        The base URI of the API endpoint.
+    access_token : str
+        The access token for authentication.
+
+    OUTPUTS
+    dict
+        A dictionary containing the device's activation key information, or None if the
+        request fails.
+
+    NOTES
+    - This function requires valid authentication credentials.
+    - Errors are logged; 401, 404 and 500 responses get a specific message.
+
+    USAGE_EXAMPLE
+    activation_key = get_device_activation_key("123456", "https://api.example.com", "your_access_token_here")
+    print(activation_key)
+
+    PROMPT
+    Read the OpenAPI Spec and using the details and parameters for the GET /api/devices/{deviceId}/activation-key endpoint, write a helper function that would accept those parameters as arguments and returns the output as a JSON object.
+    """
+    import requests
+    import logging
+    from Utilities import Http_Client
+
+    # Set up logging
+    logging.basicConfig(level=logging.DEBUG)
+    logger = logging.getLogger(__name__)
+
+    # Construct the full URL
+    url = f"{base_uri}/api/devices/{device_id}/activation-key"
+
+    # Set up the headers
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json"
+    }
+
+    try:
+        # Make the GET request
+        logger.debug(f"Sending GET request to {url}")
+        response = Http_Client.get(url, headers=headers)
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Parse and return the JSON response
+        logger.debug(f"Successfully retrieved activation key for device {device_id}")
+        return response.json()
+
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to retrieve activation key for device {device_id}: {e}")
+        if hasattr(e, 'response') and e.response is not None:
+            status_code = e.response.status_code
+            if status_code == 401:
+                logger.error("Authentication failed. Please check your access token.")
+            elif status_code == 404:
+                logger.error(f"Device with ID {device_id} not found.")
+            elif status_code == 500:
+                logger.error("Internal server error occurred. Please try again later or contact support.")
+        return None
+
+    except ValueError as e:
+        logger.error(f"Error parsing JSON response: {e}")
+        return None
@@ -32,6 +32,7 @@ def get_device_asset_info(device_id, base_uri, access_token):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -51,7 +52,7 @@ def get_device_asset_info(device_id, base_uri, access_token):
 
     try:
         # Send the GET request
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check for successful response
         response.raise_for_status()
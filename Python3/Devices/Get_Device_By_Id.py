@@ -29,6 +29,7 @@ def get_device_by_id(device_id, base_uri, access_token):
     """
     import requests
     import json
+    from Utilities import Http_Client
 
     # Construct the full URL
     url = f"{base_uri}/api/devices/{device_id}"
@@ -41,7 +42,7 @@ def get_device_by_id(device_id, base_uri, access_token):
 
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1,5 +1,6 @@
 import requests
 import logging
+from Utilities import Http_Client
 
 def get_device_custom_property(deviceId, propertyId, BaseURI, AccessToken):
     """
@@ -49,7 +50,7 @@ def get_device_custom_property(deviceId, propertyId, BaseURI, AccessToken):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
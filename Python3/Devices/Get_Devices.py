@@ -1,4 +1,4 @@
-def get_devices(base_uri, access_token, filter_id=None, page_number=None, page_size=None, select=None, sort_by=None, sort_order=None):
+def get_devices(base_uri, access_token, filter_id=None, page_number=None, page_size=None, select=None, sort_by=None, sort_order=None, sink=None):
     """
     SYNOPSIS
     Retrieve a list of devices from N-central.
@@ -16,14 +16,19 @@ def get_devices(base_uri, access_token, filter_id=None, page_number=None, page_s
     select (str, optional): The select expression for field selection.
     sort_by (str, optional): The name of a field to sort the result by.
     sort_order (str, optional): The order in which to sort (asc or desc).
+    sink (file or callable, optional): When provided, the raw response body is streamed into this
+        binary file object (or callable accepting bytes) instead of being parsed.
 
     OUTPUTS
     dict: A JSON object containing the list of devices and pagination information.
+          When a sink is provided, a page summary from Utilities.Streaming_Export.stream_body_to_sink
+          (bytes written and pagination fields) is returned instead.
 
     NOTES
     - This function requires the 'requests' library to be installed.
     - Error handling is implemented for common HTTP status codes.
     - The function uses debug logging to provide additional information during execution.
+    - Use the sink argument for full exports so memory stays flat regardless of page size.
 
     USAGE_EXAMPLE
     devices = get_devices(
@@ -40,6 +45,8 @@ def get_devices(base_uri, access_token, filter_id=None, page_number=None, page_s
     """
     import requests
     import logging
+    from Utilities import Http_Client
+    from Utilities.Streaming_Export import stream_body_to_sink
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -69,38 +76,99 @@ def get_devices(base_uri, access_token, filter_id=None, page_number=None, page_s
     if sort_order is not None:
         params["sortOrder"] = sort_order
 
-    # Use the New-HttpQueryString function to create the query string
-    query_string = New-HttpQueryString(Parameters=params)
-
     # Log the request details
     logger.debug(f"Sending GET request to {url}")
     logger.debug(f"Headers: {headers}")
-    logger.debug(f"Query parameters: {query_string}")
+    logger.debug(f"Query parameters: {params}")
 
+    response = None
     try:
-        # Send the GET request
-        response = requests.get(url, headers=headers, params=query_string)
+        # Send the GET request (streamed when the body goes straight to a sink)
+        response = Http_Client.get(url, headers=headers, params=params, stream=sink is not None)
 
         # Check for successful response
         response.raise_for_status()
 
+        # Stream the raw body to the sink instead of parsing it
+        if sink is not None:
+            return stream_body_to_sink(response, sink)
+
         # Parse and return the JSON response
         return response.json()
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Error occurred while fetching devices: {str(e)}")
         
-        # Handle specific HTTP status codes
-        if response.status_code == 400:
+        # Handle specific HTTP status codes (no response if the request never completed)
+        status_code = response.status_code if response is not None else None
+        if status_code == 400:
             logger.error("Bad Request: The server cannot process the request due to a client error.")
-        elif response.status_code == 401:
+        elif status_code == 401:
             logger.error("Unauthorized: Authentication has failed or has not been provided.")
-        elif response.status_code == 403:
+        elif status_code == 403:
             logger.error("Forbidden: The server understood the request but refuses to authorize it.")
-        elif response.status_code == 404:
+        elif status_code == 404:
             logger.error("Not Found: The requested resource could not be found.")
-        elif response.status_code == 500:
+        elif status_code == 500:
             logger.error("Internal Server Error: The server encountered an unexpected condition that prevented it from fulfilling the request.")
-        
+
         # Return None or raise an exception based on your error handling strategy
-        return None
\ No newline at end of file
+        return None
+
+    finally:
+        # A streamed response holds its pooled connection until it is closed, including when
+        # writing to the sink fails part-way
+        if response is not None:
+            response.close()
+
+def iter_devices(base_uri, access_token, filter_id=None, page_size=1000, select=None, sort_by=None, sort_order=None, start_page=1):
+    """
+    SYNOPSIS
+    Incrementally iterate over every device in N-central.
+
+    DESCRIPTION
+    This function pages through the GET /api/devices endpoint and yields each device as soon as it
+    has been decoded from the response stream, instead of parsing each page into one large JSON
+    object first. Network transfer and processing overlap, and peak memory no longer grows with
+    the page size.
+
+    ARGUMENTS
+    base_uri (str): The base URI of the API endpoint.
+    access_token (str): The access token for authentication.
+    filter_id (int, optional): The ID of the filter to apply for this device list.
+    page_size (int, optional): The number of devices to request per page. Defaults to 1000.
+    select (str, optional): The select expression for field selection.
+    sort_by (str, optional): The name of a field to sort the result by.
+    sort_order (str, optional): The order in which to sort (asc or desc).
+    start_page (int, optional): The first page to request. Defaults to 1.
+
+    OUTPUTS
+    generator: Each device as a dict, across all pages.
+
+    NOTES
+    - Unlike get_devices, errors are raised as requests.exceptions.RequestException rather than
+      returning None, since a generator cannot signal failure through its return value.
+
+    USAGE_EXAMPLE
+    for device in iter_devices("https://api.example.com", "your_access_token", sort_by="deviceId"):
+        print(device["deviceId"], device["longName"])
+    """
+    from Utilities.Json_Stream import iter_paginated_items
+
+    url = f"{base_uri}/api/devices"
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json"
+    }
+
+    params = {}
+    if filter_id is not None:
+        params["filterId"] = filter_id
+    if select is not None:
+        params["select"] = select
+    if sort_by is not None:
+        params["sortBy"] = sort_by
+    if sort_order is not None:
+        params["sortOrder"] = sort_order
+
+    return iter_paginated_items(url, headers, params, page_size=page_size, start_page=start_page)
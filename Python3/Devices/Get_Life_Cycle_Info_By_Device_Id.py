@@ -1,5 +1,6 @@
 import requests
 import logging
+from Utilities import Http_Client
 
 def get_device_asset_lifecycle_info(device_id, base_uri, access_token):
     """
@@ -48,7 +49,7 @@ def get_device_asset_lifecycle_info(device_id, base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to: {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -35,6 +35,7 @@ def get_device_maintenance_windows(deviceId, BaseURI, AccessToken):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -52,7 +53,7 @@ def get_device_maintenance_windows(deviceId, BaseURI, AccessToken):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check for HTTP errors
         response.raise_for_status()
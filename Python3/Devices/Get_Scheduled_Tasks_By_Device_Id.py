@@ -28,6 +28,7 @@ def get_device_scheduled_tasks(device_id, base_uri, access_token):
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -45,7 +46,7 @@ def get_device_scheduled_tasks(device_id, base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to: {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -0,0 +1,110 @@
+"""
+Bulk Device Hydrator
+
+This module builds full device records by calling the per-device endpoints concurrently for many
+devices, instead of calling each helper serially device after device.
+
+Key Features:
+- Facets map to the existing helpers: get_device_by_id, get_device_asset_info,
+  get_device_asset_lifecycle_info, get_device_custom_properties, get_device_maintenance_windows,
+  get_device_scheduled_tasks and get_device_service_monitor_status
+- The caller chooses which facets to fetch
+- Bounded parallelism over the shared pooled HTTP client; device IDs may be a lazy iterable
+- Yields each merged record as soon as all of its facets have completed
+
+Usage:
+    from Devices.Hydrate_Devices import hydrate_devices
+
+    for record in hydrate_devices(device_ids, base_uri, access_token,
+                                  facets=["device", "customProperties"], max_workers=16):
+        print(record["deviceId"], record["device"], record["errors"])
+"""
+
+from Devices.Get_Device_By_Id import get_device_by_id
+from Devices.Get_Assets_By_Device_Id import get_device_asset_info
+from Devices.Get_Life_Cycle_Info_By_Device_Id import get_device_asset_lifecycle_info
+from Devices.Get_Device_Custom_Properties import get_device_custom_properties
+from Devices.Get_Maintenance_Windows_By_Id import get_device_maintenance_windows
+from Devices.Get_Scheduled_Tasks_By_Device_Id import get_device_scheduled_tasks
+from Devices.Get_Service_Monitor_Status_By_Device_Id import get_device_service_monitor_status
+from Utilities.Concurrency import imap_unordered
+
+# Facet name (key in the merged record) -> helper taking (device_id, base_uri, access_token)
+DEVICE_FACETS = {
+    "device": get_device_by_id,
+    "assets": get_device_asset_info,
+    "lifecycle": get_device_asset_lifecycle_info,
+    "customProperties": get_device_custom_properties,
+    "maintenanceWindows": get_device_maintenance_windows,
+    "scheduledTasks": get_device_scheduled_tasks,
+    "serviceMonitorStatus": get_device_service_monitor_status,
+}
+
+DEFAULT_MAX_WORKERS = 16
+
+
+def _unwrap(response):
+    """Return the payload of an N-central response ({"data": ..., "_links": ...} -> data)."""
+    if isinstance(response, dict) and "data" in response:
+        return response["data"]
+    return response
+
+
+def hydrate_devices(device_ids, base_uri, access_token, facets=None, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    SYNOPSIS
+    Fetch the selected per-device facets for many devices concurrently.
+
+    DESCRIPTION
+    Every (device, facet) call is run on a thread pool with at most max_workers requests in flight.
+    Calls are issued device by device, so only a handful of devices are partially fetched at any
+    time, and a device's merged record is yielded as soon as its last facet completes.
+
+    ARGUMENTS
+    device_ids : iterable of int
+        The devices to hydrate. May be a generator (e.g. IDs streamed from iter_devices()).
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    facets : list, optional
+        Names from DEVICE_FACETS. Defaults to all of them.
+    max_workers : int, optional
+        The maximum number of concurrent requests. Defaults to 16.
+
+    OUTPUTS
+    generator
+        One dict per device, in completion order:
+        {"deviceId": id, <facet>: payload or None, ..., "errors": {facet: message}}
+        Payloads are unwrapped from the response's "data" field. A facet whose helper raised or
+        returned nothing is None and has an entry in "errors".
+
+    USAGE_EXAMPLE
+    ids = (device["deviceId"] for device in iter_devices(base_uri, access_token))
+    for record in hydrate_devices(ids, base_uri, access_token, facets=["device", "lifecycle"]):
+        save(record)
+    """
+    facets = list(facets or DEVICE_FACETS)
+    unknown = [name for name in facets if name not in DEVICE_FACETS]
+    if unknown:
+        raise ValueError(f"Unknown facets {unknown}; expected names from {list(DEVICE_FACETS)}")
+
+    def fetch(task):
+        device_id, facet = task
+        return DEVICE_FACETS[facet](device_id, base_uri, access_token)
+
+    tasks = ((device_id, facet) for device_id in device_ids for facet in facets)
+    partial = {}
+    for (device_id, facet), response, error in imap_unordered(fetch, tasks, max_workers=max_workers):
+        record = partial.setdefault(device_id, {"deviceId": device_id, "errors": {}, "_remaining": len(facets)})
+        record[facet] = _unwrap(response)
+        if error is not None:
+            record["errors"][facet] = str(error) or type(error).__name__
+        elif response is None:
+            record["errors"][facet] = "No data returned"
+
+        record["_remaining"] -= 1
+        if record["_remaining"] == 0:
+            del partial[device_id]
+            del record["_remaining"]
+            yield record
@@ -0,0 +1,194 @@
+"""
+Incremental Device Sync
+
+This module pulls only the devices that checked in since the previous sync, instead of the whole
+device list on every run, and periodically falls back to a full crawl to catch deleted devices.
+
+Key Features:
+- Keeps a per-device watermark (the lastApplianceCheckinTime seen for each device) and a global
+  watermark (the latest check-in seen) in a small JSON state file
+- Incremental runs request GET /api/devices sorted by lastApplianceCheckinTime descending and stop
+  paging as soon as devices older than the global watermark appear
+- Only devices whose check-in time moved past their own watermark are reported as changed
+- A full reconciliation runs when the last one is older than full_sync_interval_hours (or when
+  there is no state yet); it reports every device and the IDs of devices that have disappeared
+
+Usage:
+    from Devices.Incremental_Sync import load_sync_state, save_sync_state, sync_devices
+
+    state = load_sync_state("device_sync_state.json")
+    result = sync_devices(base_uri, access_token, state)
+    index.update(result["devices"])           # e.g. a Devices.Device_Index.DeviceIndex
+    for device_id in result["deleted"]:
+        index.remove(device_id)
+    save_sync_state("device_sync_state.json", state)
+
+Notes:
+- Save the state only after the result has been processed, so a failed consumer sees the same
+  changes again on the next run.
+- Devices that have never checked in carry no lastApplianceCheckinTime; they are picked up by the
+  full reconciliation.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from Devices.Get_Devices import iter_devices
+
+CHECKIN_FIELD = "lastApplianceCheckinTime"
+
+DEFAULT_FULL_SYNC_INTERVAL_HOURS = 24
+DEFAULT_PAGE_SIZE = 500
+
+# Keep paging this far past the global watermark, to tolerate check-ins recorded out of order
+DEFAULT_OVERLAP_SECONDS = 300
+
+MODE_INCREMENTAL = "incremental"
+MODE_FULL = "full"
+
+
+def _parse_time(value):
+    """Parse an N-central timestamp into an aware datetime; None if absent or unparseable."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def new_sync_state():
+    """Return an empty sync state (the next sync will be a full reconciliation)."""
+    return {"watermark": None, "lastFullSync": None, "devices": {}}
+
+
+def load_sync_state(path):
+    """Load the sync state from a JSON file, or return an empty state if the file does not exist."""
+    if not os.path.exists(path):
+        return new_sync_state()
+    with open(path, "r", encoding="utf-8") as state_file:
+        state = json.load(state_file)
+    return {**new_sync_state(), **state}
+
+
+def save_sync_state(path, state):
+    """Write the sync state atomically (a temporary file is renamed over the previous state)."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def _full_sync_due(state, now, interval_hours):
+    last_full = _parse_time(state.get("lastFullSync"))
+    return last_full is None or state.get("watermark") is None or now - last_full >= timedelta(hours=interval_hours)
+
+
+def sync_devices(base_uri, access_token, state, filter_id=None, page_size=DEFAULT_PAGE_SIZE,
+                 full_sync_interval_hours=DEFAULT_FULL_SYNC_INTERVAL_HOURS, overlap_seconds=DEFAULT_OVERLAP_SECONDS,
+                 force_full=False, now=None):
+    """
+    SYNOPSIS
+    Fetch the devices that changed since the previous sync and update the sync state.
+
+    DESCRIPTION
+    An incremental run pages through GET /api/devices sorted by lastApplianceCheckinTime in
+    descending order and stops once a device's check-in is older than the global watermark (less
+    overlap_seconds). Devices whose check-in differs from their stored watermark are returned.
+
+    A full reconciliation pages through every device, returns all of them, and lists the devices
+    in the state that were not returned as deleted.
+
+    The state dict is updated in place; persist it with save_sync_state() after processing.
+
+    ARGUMENTS
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    state : dict
+        The state from load_sync_state() or new_sync_state().
+    filter_id : int, optional
+        The ID of a device filter to restrict the sync. Use the same filter on every run.
+    page_size : int, optional
+        The number of devices per page. Defaults to 500.
+    full_sync_interval_hours : float, optional
+        Run a full reconciliation when the last one is at least this old. Defaults to 24.
+    overlap_seconds : int, optional
+        How far past the global watermark to keep paging. Defaults to 300.
+    force_full : bool, optional
+        Run a full reconciliation regardless of the interval.
+    now : datetime, optional
+        The current time (UTC). Defaults to datetime.now(timezone.utc).
+
+    OUTPUTS
+    dict
+        {"mode": "incremental" or "full", "devices": [changed devices, or every device on a full
+        run], "deleted": [device IDs], "scanned": devices read from the API}
+
+    NOTES
+    - Raises requests.exceptions.RequestException if a page cannot be fetched; the state is not
+      modified in that case.
+
+    USAGE_EXAMPLE
+    state = load_sync_state("device_sync_state.json")
+    result = sync_devices(base_uri, access_token, state)
+    print(result["mode"], len(result["devices"]), "changed,", len(result["deleted"]), "deleted")
+    save_sync_state("device_sync_state.json", state)
+    """
+    now = now or datetime.now(timezone.utc)
+    full = force_full or _full_sync_due(state, now, full_sync_interval_hours)
+    known = state["devices"]
+
+    if full:
+        crawl = iter_devices(base_uri, access_token, filter_id=filter_id, page_size=page_size,
+                             sort_by="deviceId", sort_order="asc")
+        stop_before = None
+    else:
+        crawl = iter_devices(base_uri, access_token, filter_id=filter_id, page_size=page_size,
+                             sort_by=CHECKIN_FIELD, sort_order="desc")
+        stop_before = _parse_time(state["watermark"]) - timedelta(seconds=overlap_seconds)
+
+    changed = {}
+    seen = set()
+    scanned = 0
+    for device in crawl:
+        scanned += 1
+        device_id = device.get("deviceId")
+        if device_id is None:
+            continue
+        checkin = device.get(CHECKIN_FIELD)
+        if not full:
+            checkin_time = _parse_time(checkin)
+            # Sorted newest first: everything after this checked in before the watermark. Devices
+            # without a check-in may be sorted first, so they never end the crawl
+            if checkin_time is not None and checkin_time < stop_before:
+                break
+        seen.add(str(device_id))
+        if full or known.get(str(device_id)) != checkin:
+            # A device listed twice (it checked in while we paged) keeps its latest copy
+            changed[device_id] = device
+
+    deleted = []
+    if full:
+        deleted = [int(device_id) if device_id.isdigit() else device_id
+                   for device_id in known if device_id not in seen]
+
+    # Commit the new watermarks only after the crawl has completed
+    if full:
+        state["devices"] = {str(device_id): device.get(CHECKIN_FIELD) for device_id, device in changed.items()}
+        state["lastFullSync"] = now.isoformat()
+    else:
+        for device_id, device in changed.items():
+            known[str(device_id)] = device.get(CHECKIN_FIELD)
+    checkins = [_parse_time(device.get(CHECKIN_FIELD)) for device in changed.values()]
+    if not full and state["watermark"] is not None:
+        checkins.append(_parse_time(state["watermark"]))
+    checkins = [time for time in checkins if time is not None]
+    if checkins:
+        state["watermark"] = max(checkins).isoformat()
+
+    return {"mode": MODE_FULL if full else MODE_INCREMENTAL, "devices": list(changed.values()),
+            "deleted": deleted, "scanned": scanned}
@@ -0,0 +1,271 @@
+"""
+Maintenance Window Audit
+
+This module collects the maintenance windows of every device into a compact table and analyzes
+coverage across the fleet: overlapping windows on a device, long gaps without any window, and
+devices without a (patch) window at all.
+
+Key Features:
+- export_maintenance_windows(): calls get_device_maintenance_windows for many devices
+  concurrently over the shared pooled HTTP client
+- MaintenanceWindowTable: one row per (device, window) in typed arrays, with window definitions
+  dictionary-encoded, since most devices share the same few windows; writes CSV
+- analyze_maintenance_windows(): expands each distinct Quartz cron schedule over the horizon
+  once (Utilities/Quartz_Cron.py) into a minute bitmap held in a Python integer, then combines
+  bitmaps with bitwise AND/OR per device. Devices with the same set of windows share one result,
+  so a 30k-device fleet is analyzed in well under a second once the data is fetched
+- Reports overlaps (with the first overlapping start), the longest uncovered gap, and devices
+  without any enabled window or without a patch window
+
+Usage:
+    from Devices.Maintenance_Window_Audit import export_maintenance_windows, analyze_maintenance_windows
+
+    table = export_maintenance_windows(device_ids, base_uri, access_token)
+    table.to_csv("maintenance_windows.csv")
+    report = analyze_maintenance_windows(table, horizon_days=31, max_gap_hours=8 * 24)
+    print(report["summary"])
+
+Notes:
+- Disabled windows are exported but ignored by the analysis.
+- A window is a patch window when one of its applicableAction entries has type "Patch".
+- Windows whose cron cannot be parsed are listed in report["invalid_crons"] and ignored.
+"""
+
+import csv
+import json
+import re
+from array import array
+from datetime import datetime, timedelta
+
+from Devices.Get_Maintenance_Windows_By_Id import get_device_maintenance_windows
+from Devices.Maintenance_Window_Planner import maintenance_window_items
+from Utilities.Concurrency import imap_unordered
+from Utilities.Quartz_Cron import parse_cron
+
+# Window fields kept in the table (the dictionary-encoded window definition)
+WINDOW_FIELDS = ("name", "type", "cron", "duration", "enabled")
+
+# Row value for a device that has no windows
+NO_WINDOW = -1
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_HORIZON_DAYS = 31
+DEFAULT_RESOLUTION_MINUTES = 1
+
+_ZERO_RUNS = re.compile("0+")
+
+
+def is_patch_window(window):
+    """Return True if any of the window's applicable actions is a patch action."""
+    actions = window.get("applicableAction") or []
+    return any(isinstance(action, dict) and str(action.get("type", "")).lower() == "patch" for action in actions)
+
+
+class MaintenanceWindowTable:
+    """
+    SYNOPSIS
+    The maintenance windows of many devices, stored compactly.
+
+    DESCRIPTION
+    device_ids and window_codes are parallel typed arrays with one row per (device, window); a
+    device without windows has a single row with code NO_WINDOW. window_codes index into windows,
+    the list of distinct window definitions (WINDOW_FIELDS plus "patch").
+    """
+
+    def __init__(self):
+        self.device_ids = array("q")
+        self.window_codes = array("l")
+        self.windows = []
+        self.errors = {}
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.device_ids)
+
+    def add_device(self, device_id, windows):
+        """Append one device's windows."""
+        if not windows:
+            self.device_ids.append(device_id)
+            self.window_codes.append(NO_WINDOW)
+            return
+        for window in windows:
+            definition = {field: window.get(field) for field in WINDOW_FIELDS}
+            definition["patch"] = is_patch_window(window)
+            key = json.dumps(definition, sort_keys=True, default=str)
+            code = self._codes.get(key)
+            if code is None:
+                code = self._codes[key] = len(self.windows)
+                self.windows.append(definition)
+            self.device_ids.append(device_id)
+            self.window_codes.append(code)
+
+    def by_device(self):
+        """Return {device ID: tuple of window codes} (an empty tuple for devices without windows)."""
+        devices = {}
+        for device_id, code in zip(self.device_ids, self.window_codes):
+            codes = devices.setdefault(device_id, [])
+            if code != NO_WINDOW:
+                codes.append(code)
+        return {device_id: tuple(codes) for device_id, codes in devices.items()}
+
+    def to_csv(self, path):
+        """Write one row per (device, window) with the window fields; returns the row count."""
+        with open(path, "w", encoding="utf-8", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(("deviceId",) + WINDOW_FIELDS + ("patch",))
+            for device_id, code in zip(self.device_ids, self.window_codes):
+                window = self.windows[code] if code != NO_WINDOW else {}
+                writer.writerow((device_id,) + tuple(window.get(field) for field in WINDOW_FIELDS + ("patch",)))
+        return len(self.device_ids)
+
+
+def export_maintenance_windows(device_ids, base_uri, access_token, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    SYNOPSIS
+    Fetch the maintenance windows of many devices concurrently into a MaintenanceWindowTable.
+
+    ARGUMENTS
+    device_ids : iterable of int
+        The devices to export. May be lazy (e.g. IDs streamed from iter_devices()).
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    max_workers : int, optional
+        The maximum number of concurrent requests. Defaults to 16.
+
+    OUTPUTS
+    MaintenanceWindowTable
+        The collected windows; devices that could not be read are in .errors.
+    """
+    table = MaintenanceWindowTable()
+
+    def fetch(device_id):
+        return get_device_maintenance_windows(device_id, base_uri, access_token)
+
+    for device_id, response, error in imap_unordered(fetch, device_ids, max_workers=max_workers):
+        if error is not None or response is None:
+            table.errors[device_id] = str(error) if error is not None else "could not read maintenance windows"
+            continue
+        table.add_device(device_id, maintenance_window_items(response))
+
+    devices = len(set(table.device_ids))
+    print(f"Exported {len(table.windows)} distinct maintenance windows across {devices} devices "
+          f"({len(table.errors)} failed)")
+    return table
+
+
+def _window_bitmap(window, start, slots, resolution, cache, invalid):
+    """Return the coverage bitmap of one window: bit i is set if slot i falls inside a run."""
+    key = (window.get("cron"), window.get("duration"))
+    if key in cache:
+        return cache[key]
+    bitmap = 0
+    try:
+        schedule = parse_cron(str(window.get("cron") or ""))
+        duration_slots = max(-(-int(window.get("duration") or 0) // resolution), 1)
+    except (TypeError, ValueError) as e:
+        invalid[window.get("cron")] = str(e)
+        cache[key] = None
+        return None
+    run = (1 << duration_slots) - 1
+    # Include runs that started before the horizon but are still open at its start
+    lookback = timedelta(minutes=duration_slots * resolution)
+    for moment in schedule.occurrences(start - lookback, start + timedelta(minutes=slots * resolution)):
+        offset = int((moment - start).total_seconds() // 60) // resolution
+        bitmap |= run << offset if offset >= 0 else run >> -offset
+    bitmap &= (1 << slots) - 1
+    cache[key] = bitmap
+    return bitmap
+
+
+def analyze_maintenance_windows(table, start=None, horizon_days=DEFAULT_HORIZON_DAYS,
+                                resolution_minutes=DEFAULT_RESOLUTION_MINUTES, max_gap_hours=None):
+    """
+    SYNOPSIS
+    Find overlapping windows, coverage gaps and devices without windows across the fleet.
+
+    DESCRIPTION
+    Each distinct (cron, duration) pair is expanded over the horizon once into a bitmap with one
+    bit per resolution_minutes slot. For each distinct set of windows held by some device, the
+    bitmaps are combined with bitwise operations: pairwise AND finds overlaps, OR gives the
+    coverage whose zero runs are the gaps. The result is shared by every device with that set.
+
+    ARGUMENTS
+    table : MaintenanceWindowTable
+        The windows, from export_maintenance_windows().
+    start : datetime, optional
+        The beginning of the horizon. Defaults to the start of the current day.
+    horizon_days : int, optional
+        The number of days to analyze. Defaults to 31, enough for monthly schedules.
+    resolution_minutes : int, optional
+        The bitmap slot size in minutes. Defaults to 1.
+    max_gap_hours : float, optional
+        Devices whose longest uncovered gap exceeds this are listed in "long_gaps".
+
+    OUTPUTS
+    dict
+        {"devices": {device ID: {"windows", "enabled_windows", "overlaps": [(name a, name b, first overlap start)],
+                                 "longest_gap_hours", "longest_gap_start", "patch_window"}},
+         "no_window": [device IDs without an enabled window], "no_patch_window": [device IDs], "overlapping": [device IDs],
+         "long_gaps": [device IDs], "invalid_crons": {cron: error}, "summary": {counts}}
+
+    USAGE_EXAMPLE
+    report = analyze_maintenance_windows(table, max_gap_hours=8 * 24)
+    for device_id in report["no_patch_window"]:
+        print("No patch window:", device_id)
+    """
+    start = start or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    resolution = max(int(resolution_minutes), 1)
+    slots = horizon_days * 24 * 60 // resolution
+    bitmaps, invalid, combinations = {}, {}, {}
+
+    def analyze(codes):
+        enabled = [code for code in codes if table.windows[code].get("enabled") is not False]
+        maps = [(code, _window_bitmap(table.windows[code], start, slots, resolution, bitmaps, invalid))
+                for code in enabled]
+        maps = [(code, bitmap) for code, bitmap in maps if bitmap is not None]
+
+        overlaps = []
+        for index, (code_a, bitmap_a) in enumerate(maps):
+            for code_b, bitmap_b in maps[index + 1:]:
+                common = bitmap_a & bitmap_b
+                if common:
+                    first = (common & -common).bit_length() - 1
+                    overlaps.append((table.windows[code_a]["name"], table.windows[code_b]["name"],
+                                     (start + timedelta(minutes=first * resolution)).isoformat()))
+
+        coverage = 0
+        for _, bitmap in maps:
+            coverage |= bitmap
+        # Bit i of coverage is slot i; reverse the binary string so string index i is slot i
+        bits = format(coverage, f"0{slots}b")[::-1]
+        gap = max(_ZERO_RUNS.finditer(bits), key=lambda match: match.end() - match.start(), default=None)
+        gap_slots = gap.end() - gap.start() if gap else 0
+        return {
+            "windows": [table.windows[code]["name"] for code in codes],
+            "enabled_windows": len(enabled),
+            "overlaps": overlaps,
+            "longest_gap_hours": gap_slots * resolution / 60,
+            "longest_gap_start": (start + timedelta(minutes=gap.start() * resolution)).isoformat() if gap else None,
+            "patch_window": any(table.windows[code].get("patch") for code in enabled),
+        }
+
+    devices = {}
+    for device_id, codes in table.by_device().items():
+        key = tuple(sorted(set(codes)))
+        if key not in combinations:
+            combinations[key] = analyze(key)
+        devices[device_id] = combinations[key]
+
+    no_window = [device_id for device_id, result in devices.items() if not result["enabled_windows"]]
+    no_patch = [device_id for device_id, result in devices.items() if not result["patch_window"]]
+    overlapping = [device_id for device_id, result in devices.items() if result["overlaps"]]
+    long_gaps = [] if max_gap_hours is None else [
+        device_id for device_id, result in devices.items() if result["longest_gap_hours"] > max_gap_hours]
+
+    summary = {"devices": len(devices), "distinct_window_sets": len(combinations), "no_window": len(no_window),
+               "no_patch_window": len(no_patch), "overlapping": len(overlapping), "long_gaps": len(long_gaps),
+               "invalid_crons": len(invalid)}
+    return {"devices": devices, "no_window": no_window, "no_patch_window": no_patch, "overlapping": overlapping,
+            "long_gaps": long_gaps, "invalid_crons": invalid, "summary": summary}
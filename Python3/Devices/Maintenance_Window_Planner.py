@@ -0,0 +1,374 @@
+"""
+Maintenance Window Batch Planner
+
+This module adds maintenance windows to large device sets by splitting the device list into
+requests whose size adapts to how the server responds, instead of one add_maintenance_windows
+POST with every device ID (which times out for tens of thousands of devices).
+
+Key Features:
+- Dedupes first: each device's existing windows are read concurrently with
+  get_device_maintenance_windows, and a device only receives the windows it does not have yet
+- AdaptiveChunker sizes requests with additive increase / multiplicative decrease: chunks grow
+  while requests finish under the target latency, shrink in proportion when they are slow, and
+  halve on errors
+- Several chunks run concurrently (bounded by max_workers) over the shared pooled HTTP client
+- Only failed chunks are retried, split in half each time, so one bad device ID or one slow
+  request does not resend the whole set; single devices are retried up to max_attempts times
+- A chunk that timed out or got a 5xx may still have been applied by the server, so its devices'
+  windows are read again before the retry and only the windows still missing are sent
+
+Usage:
+    from Devices.Maintenance_Window_Planner import plan_and_add_maintenance_windows
+
+    summary = plan_and_add_maintenance_windows(base_uri, access_token, device_ids, maintenance_windows,
+                                               max_workers=4)
+    print(summary["added"], summary["skipped"], summary["failed"])
+
+Notes:
+- Windows are considered equal when the fields in WINDOW_MATCH_FIELDS match.
+- A device whose existing windows cannot be read is reported as failed rather than risking a
+  duplicate window.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from Devices.Get_Maintenance_Windows_By_Id import get_device_maintenance_windows
+from Devices.Post_Maintenance_Windows import add_maintenance_windows
+from Utilities.Concurrency import imap_unordered
+from Utilities.Http_Client import run_in_context
+
+# Fields that identify a maintenance window when deduping against existing windows
+WINDOW_MATCH_FIELDS = ("name", "type", "cron", "duration")
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_READ_WORKERS = 16
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Chunk sizing (device IDs per POST)
+DEFAULT_INITIAL_CHUNK = 250
+DEFAULT_MIN_CHUNK = 1
+DEFAULT_MAX_CHUNK = 5000
+DEFAULT_TARGET_LATENCY = 15.0  # Seconds per request the chunk size aims for
+
+
+def maintenance_window_items(response):
+    """
+    Return the list of windows from a get_device_maintenance_windows response, flattening
+    responses that group windows per device ({"data": [{"deviceId", "maintenanceWindows": [...]}]}).
+    """
+    if isinstance(response, dict):
+        response = response.get("data")
+    if not isinstance(response, list):
+        return []
+    windows = []
+    for item in response:
+        if isinstance(item, dict) and isinstance(item.get("maintenanceWindows"), list):
+            windows.extend(item["maintenanceWindows"])
+        elif isinstance(item, dict):
+            windows.append(item)
+    return windows
+
+
+def window_signature(window, match_fields=WINDOW_MATCH_FIELDS):
+    """Return the tuple of fields that identifies a window for deduplication."""
+    return tuple(str(window.get(field)) if window.get(field) is not None else None for field in match_fields)
+
+
+class AdaptiveChunker:
+    """
+    SYNOPSIS
+    Thread-safe chunk size controller driven by request latency and errors.
+
+    DESCRIPTION
+    After a successful request faster than target_latency the size grows by a fixed step
+    (additive increase); after a slow request it is scaled by target_latency / latency; after a
+    failed request it is halved (multiplicative decrease). The size stays within [minimum, maximum].
+
+    ARGUMENTS
+    initial : int, optional
+        The starting chunk size. Defaults to 250.
+    minimum : int, optional
+        The smallest chunk size. Defaults to 1.
+    maximum : int, optional
+        The largest chunk size. Defaults to 5000.
+    target_latency : float, optional
+        The request duration in seconds to aim for. Defaults to 15.
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_CHUNK, minimum=DEFAULT_MIN_CHUNK, maximum=DEFAULT_MAX_CHUNK,
+                 target_latency=DEFAULT_TARGET_LATENCY):
+        self.minimum = max(int(minimum), 1)
+        self.maximum = max(int(maximum), self.minimum)
+        self.target_latency = target_latency
+        self.step = max(int(initial) // 2, 1)
+        self._size = min(max(int(initial), self.minimum), self.maximum)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self._size
+
+    def _clamp(self, size):
+        return min(max(int(size), self.minimum), self.maximum)
+
+    def record_success(self, chunk_size, latency):
+        """Adjust the size after a request of chunk_size devices succeeded in latency seconds."""
+        with self._lock:
+            if latency > self.target_latency:
+                self._size = self._clamp(min(self._size, chunk_size * self.target_latency / latency))
+            elif chunk_size >= self._size:
+                # Only grow on evidence from a full-size chunk
+                self._size = self._clamp(self._size + self.step)
+
+    def record_failure(self, chunk_size):
+        """Halve the size after a request of chunk_size devices failed."""
+        with self._lock:
+            self._size = self._clamp(min(self._size, chunk_size) // 2)
+
+
+def _request_error(response):
+    """Return an error message if an add_maintenance_windows response reports a failure."""
+    if response is None:
+        return "no response"
+    if isinstance(response, dict) and "error" in response:
+        details = response.get("details")
+        return f"{response['error']}: {str(details)[:200]}" if details else str(response["error"])
+    return None
+
+
+def _may_have_applied(response):
+    """Return True if a failed add_maintenance_windows request may still have been applied (timeout or 5xx)."""
+    status_code = response.get("status_code") if isinstance(response, dict) else None
+    return status_code is None or status_code >= 500
+
+
+def missing_windows(device_ids, maintenance_windows, base_uri, access_token, max_workers=DEFAULT_READ_WORKERS,
+                    match_fields=WINDOW_MATCH_FIELDS):
+    """
+    SYNOPSIS
+    Work out which of the desired windows each device is missing.
+
+    ARGUMENTS
+    device_ids : iterable of int
+        The target devices.
+    maintenance_windows : list of dict
+        The desired windows.
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    max_workers : int, optional
+        The maximum number of concurrent reads. Defaults to 16.
+    match_fields : tuple, optional
+        The fields compared to decide whether a window already exists.
+
+    OUTPUTS
+    tuple
+        ({tuple of window indexes: [device IDs missing exactly those windows]},
+         [device IDs that already have every window],
+         {device ID: error message} for devices whose windows could not be read)
+    """
+    wanted = [window_signature(window, match_fields) for window in maintenance_windows]
+    groups = {}
+    complete = []
+    errors = {}
+
+    def fetch(device_id):
+        return get_device_maintenance_windows(device_id, base_uri, access_token)
+
+    for device_id, response, error in imap_unordered(fetch, device_ids, max_workers=max_workers):
+        if error is not None or response is None:
+            errors[device_id] = str(error) if error is not None else "could not read existing maintenance windows"
+            continue
+        existing = {window_signature(window, match_fields) for window in maintenance_window_items(response)}
+        missing = tuple(index for index, signature in enumerate(wanted) if signature not in existing)
+        if missing:
+            groups.setdefault(missing, []).append(device_id)
+        else:
+            complete.append(device_id)
+    return groups, complete, errors
+
+
+def add_windows_in_chunks(base_uri, access_token, device_ids, maintenance_windows, chunker=None,
+                          max_workers=DEFAULT_MAX_WORKERS, max_attempts=DEFAULT_MAX_ATTEMPTS, recheck=True,
+                          read_workers=DEFAULT_READ_WORKERS, match_fields=WINDOW_MATCH_FIELDS):
+    """
+    SYNOPSIS
+    POST the same windows to many devices in adaptively sized, concurrent chunks.
+
+    DESCRIPTION
+    Chunks are cut from the device list at the chunker's current size as workers become free,
+    so later chunks benefit from what earlier ones revealed about the server. A failed chunk is
+    split in half and both halves are queued ahead of new work; a failed single device is
+    retried until it has been attempted max_attempts times.
+
+    add_maintenance_windows is not idempotent, and a request that timed out on the client (or
+    got a 5xx) may still have been applied. With recheck enabled, the windows of such a chunk's
+    devices are read again first: devices that now have every window count as added, devices
+    that cannot be read are reported as failed, and the rest are retried with only the windows
+    they are still missing.
+
+    ARGUMENTS
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    device_ids : list of int
+        The devices to add the windows to.
+    maintenance_windows : list of dict
+        The windows to add.
+    chunker : AdaptiveChunker, optional
+        The chunk size controller; shared across calls to carry what was learned. Defaults to a
+        new AdaptiveChunker().
+    max_workers : int, optional
+        The maximum number of concurrent POST requests. Defaults to 4.
+    max_attempts : int, optional
+        How many times a single device is attempted before it is reported as failed. Defaults to 3.
+    recheck : bool, optional
+        Read the devices' windows again before retrying a request that may have been applied.
+        Defaults to True.
+    read_workers : int, optional
+        The maximum number of concurrent reads when rechecking. Defaults to 16.
+    match_fields : tuple, optional
+        The fields compared to decide whether a window already exists.
+
+    OUTPUTS
+    dict
+        {"added": [device IDs], "failed": {device ID: error}, "requests": count}
+    """
+    chunker = chunker or AdaptiveChunker()
+    remaining = list(device_ids)
+    position = 0
+    retries = []  # (device IDs, windows to add, attempts so far)
+    added, failed = [], {}
+    requests = 0
+
+    def post(chunk, windows):
+        started = time.monotonic()
+        response = add_maintenance_windows(base_uri, access_token, chunk, windows)
+        return response, time.monotonic() - started
+
+    call = run_in_context(post)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="maintenance")
+    running = {}
+    try:
+        while running or retries or position < len(remaining):
+            while len(running) < max_workers and (retries or position < len(remaining)):
+                if retries:
+                    chunk, windows, attempts = retries.pop(0)
+                else:
+                    chunk = remaining[position:position + chunker.size]
+                    position += len(chunk)
+                    windows, attempts = maintenance_windows, 0
+                running[executor.submit(call, chunk, windows)] = (chunk, windows, attempts + 1)
+                requests += 1
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk, windows, attempts = running.pop(future)
+                try:
+                    response, latency = future.result()
+                    error, applied = _request_error(response), _may_have_applied(response)
+                except Exception as e:
+                    error, latency, applied = str(e) or type(e).__name__, None, True
+
+                if error is None:
+                    chunker.record_success(len(chunk), latency)
+                    added.extend(chunk)
+                    continue
+
+                chunker.record_failure(len(chunk))
+                pending = [(chunk, windows)]
+                if recheck and applied:
+                    # The server may have added the windows anyway; resend only what is still missing
+                    groups, complete, read_errors = missing_windows(chunk, windows, base_uri, access_token,
+                                                                    max_workers=read_workers,
+                                                                    match_fields=match_fields)
+                    added.extend(complete)
+                    for device_id, read_error in read_errors.items():
+                        failed[device_id] = f"{error} (windows could not be re-read: {read_error})"
+                    pending = [(group, [windows[index] for index in indexes]) for indexes, group in groups.items()]
+
+                split = []
+                for part, part_windows in pending:
+                    if len(part) > 1:
+                        middle = len(part) // 2
+                        split += [(part[:middle], part_windows, attempts), (part[middle:], part_windows, attempts)]
+                    elif attempts < max_attempts:
+                        retries.append((part, part_windows, attempts))
+                    else:
+                        failed[part[0]] = error
+                retries[:0] = split
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {"added": added, "failed": failed, "requests": requests}
+
+
+def plan_and_add_maintenance_windows(base_uri, access_token, device_ids, maintenance_windows, dedupe=True,
+                                     chunker=None, max_workers=DEFAULT_MAX_WORKERS, read_workers=DEFAULT_READ_WORKERS,
+                                     max_attempts=DEFAULT_MAX_ATTEMPTS, match_fields=WINDOW_MATCH_FIELDS):
+    """
+    SYNOPSIS
+    Add maintenance windows to a large device set, skipping windows that already exist.
+
+    DESCRIPTION
+    With dedupe enabled, each device's existing windows are read concurrently first and devices
+    are grouped by the set of windows they are missing. Each group is then added with
+    add_windows_in_chunks(), sharing one AdaptiveChunker so the chunk size learned by one group
+    carries over to the next.
+
+    ARGUMENTS
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    device_ids : iterable of int
+        The target devices.
+    maintenance_windows : list of dict
+        The windows to add, in the format accepted by add_maintenance_windows.
+    dedupe : bool, optional
+        Read existing windows and skip those already present. Defaults to True.
+    chunker : AdaptiveChunker, optional
+        The chunk size controller. Defaults to a new AdaptiveChunker().
+    max_workers : int, optional
+        The maximum number of concurrent POST requests. Defaults to 4.
+    read_workers : int, optional
+        The maximum number of concurrent reads while deduping. Defaults to 16.
+    max_attempts : int, optional
+        How many times a single device is attempted. Defaults to 3.
+    match_fields : tuple, optional
+        The fields compared to decide whether a window already exists.
+
+    OUTPUTS
+    dict
+        {"added": [device IDs], "skipped": [device IDs that had every window],
+         "failed": {device ID: error}, "requests": POST requests sent, "chunk_size": final size}
+
+    USAGE_EXAMPLE
+    summary = plan_and_add_maintenance_windows(base_uri, access_token, device_ids, windows)
+    print(f"{len(summary['added'])} added, {len(summary['failed'])} failed in {summary['requests']} requests")
+    """
+    chunker = chunker or AdaptiveChunker()
+    device_ids = list(dict.fromkeys(device_ids))
+    if dedupe:
+        groups, skipped, failed = missing_windows(device_ids, maintenance_windows, base_uri, access_token,
+                                                  max_workers=read_workers, match_fields=match_fields)
+    else:
+        groups, skipped, failed = {tuple(range(len(maintenance_windows))): device_ids}, [], {}
+
+    added = []
+    requests = 0
+    for window_indexes, group in groups.items():
+        windows = [maintenance_windows[index] for index in window_indexes]
+        result = add_windows_in_chunks(base_uri, access_token, group, windows, chunker=chunker,
+                                       max_workers=max_workers, max_attempts=max_attempts,
+                                       read_workers=read_workers, match_fields=match_fields)
+        added.extend(result["added"])
+        failed.update(result["failed"])
+        requests += result["requests"]
+
+    print(f"Maintenance windows: {len(added)} devices updated, {len(skipped)} already up to date, "
+          f"{len(failed)} failed ({requests} requests, final chunk size {chunker.size})")
+    return {"added": added, "skipped": skipped, "failed": failed, "requests": requests, "chunk_size": chunker.size}
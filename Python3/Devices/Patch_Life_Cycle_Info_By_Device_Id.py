@@ -35,6 +35,7 @@ def patch_device_asset_lifecycle_info(device_id, asset_lifecycle_info, base_uri,
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -56,7 +57,7 @@ def patch_device_asset_lifecycle_info(device_id, asset_lifecycle_info, base_uri,
 
     try:
         # Send the PATCH request
-        response = requests.patch(url, headers=headers, json=asset_lifecycle_info)
+        response = Http_Client.patch(url, headers=headers, json=asset_lifecycle_info)
 
         # Check if the request was successful
         response.raise_for_status()
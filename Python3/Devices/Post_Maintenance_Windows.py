@@ -55,6 +55,7 @@ def add_maintenance_windows(base_uri, access_token, device_ids, maintenance_wind
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -81,7 +82,7 @@ def add_maintenance_windows(base_uri, access_token, device_ids, maintenance_wind
 
     try:
         # Send the POST request
-        response = requests.post(url, headers=headers, json=payload)
+        response = Http_Client.post(url, headers=headers, json=payload)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -1,4 +1,4 @@
-def update_device_custom_property(device_id, property_id, value, base_uri, access_token):
+def update_device_custom_property(device_id, property_id, value, base_uri, access_token, raise_on_error=False):
     """
     SYNOPSIS
     Update a device custom property
@@ -18,10 +18,15 @@ def update_device_custom_property(device_id, property_id, value, base_uri, acces
         The base URI of the API endpoint
     access_token : str
         The access token for authentication
+    raise_on_error : bool, optional
+        Raise the requests exception when the request fails or the server answers with a non-2xx
+        status, instead of returning the error details. Defaults to False.
 
     OUTPUTS
     dict
-        A dictionary containing the response from the API, including any warnings
+        A dictionary containing the response from the API, including any warnings. Unless
+        raise_on_error is set, a failed request returns the server's error body (or a dictionary
+        with "error" and "details"), which callers cannot tell apart from a success by shape alone.
 
     NOTES
     - This function requires the requests library to be installed
@@ -37,6 +42,7 @@ def update_device_custom_property(device_id, property_id, value, base_uri, acces
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -59,9 +65,10 @@ def update_device_custom_property(device_id, property_id, value, base_uri, acces
     logger.debug(f"Sending PUT request to {url}")
     logger.debug(f"Request body: {body}")
 
+    response = None
     try:
         # Send the PUT request
-        response = requests.put(url, headers=headers, json=body)
+        response = Http_Client.put(url, headers=headers, json=body)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -75,6 +82,9 @@ def update_device_custom_property(device_id, property_id, value, base_uri, acces
 
     except requests.exceptions.RequestException as e:
         logger.error(f"An error occurred: {e}")
+        if raise_on_error and (response is None or not response.ok):
+            # A 2xx whose body is not JSON still counts as a success
+            raise
         if hasattr(e, 'response') and e.response is not None:
             try:
                 error_detail = e.response.json()
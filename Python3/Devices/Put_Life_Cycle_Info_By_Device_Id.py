@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def update_device_asset_lifecycle_info(BaseURI, AccessToken, deviceId, assetTag, cost, description, expectedReplacementDate, leaseExpiryDate, location, purchaseDate, warrantyExpiryDate):
     """
@@ -93,7 +94,7 @@ def update_device_asset_lifecycle_info(BaseURI, AccessToken, deviceId, assetTag,
 
     try:
         # Send the PUT request
-        response = requests.put(url, headers=headers, json=payload)
+        response = Http_Client.put(url, headers=headers, json=payload)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -0,0 +1,282 @@
+"""
+Service Monitor Status Sweeper
+
+This module polls get_device_service_monitor_status for every device on a fixed interval and
+emits only the state transitions (e.g. Normal -> Failed), so downstream alerting handles deltas
+instead of full status dumps.
+
+Key Features:
+- Spreads the requests of each sweep evenly over the interval with a token bucket
+  (Utilities/Rate_Limiter.py) instead of bursting every device at the start
+- Bounded parallelism over the shared pooled HTTP client, for slow responses
+- ServiceMonitorStateStore keeps the last state of every device/monitor pair compactly: state
+  names are interned to small integers, and the store can be saved to and loaded from JSON so a
+  restart does not replay every monitor as a transition
+- Events are yielded as they are detected, so the consumer can forward them immediately
+
+Usage:
+    from Devices.Service_Monitor_Sweeper import ServiceMonitorStateStore, run_sweeper
+
+    store = ServiceMonitorStateStore.load("monitor_state.json")
+    for event in run_sweeper(lambda: list(index.ids("customerId", 100)), base_uri, get_access_token, store,
+                             interval_seconds=300, state_path="monitor_state.json"):
+        print(event["deviceId"], event["name"], event["previous"], "->", event["current"])
+
+Notes:
+- A device whose status could not be fetched keeps its previous states; no events are emitted
+  for it in that sweep.
+- A monitor that disappears from a device is reported with current None.
+- run_sweeper() runs indefinitely, longer than an access token lives: pass it a callable that
+  returns a valid token (e.g. one that calls Authentication/Post_Auth_Refresh.py when the token
+  is close to expiry); it is called at the start of every sweep.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from Devices.Get_Service_Monitor_Status_By_Device_Id import get_device_service_monitor_status
+from Utilities.Concurrency import imap_unordered
+from Utilities.Rate_Limiter import RateLimiter
+
+# Fields identifying a monitor on a device, in order of preference
+MONITOR_KEY_FIELDS = ("taskId", "serviceId", "moduleName")
+
+# Fields holding the monitor's state and display name, in order of preference
+STATE_FIELDS = ("stateStatus", "status")
+NAME_FIELDS = ("moduleName", "serviceName")
+
+DEFAULT_INTERVAL_SECONDS = 300
+DEFAULT_MAX_WORKERS = 8
+
+
+def _first(item, fields):
+    for field in fields:
+        value = item.get(field)
+        if value is not None:
+            return value
+    return None
+
+
+class ServiceMonitorStateStore:
+    """
+    SYNOPSIS
+    The last known state of every device/monitor pair.
+
+    DESCRIPTION
+    States are stored as indexes into a shared list of state names, per device and monitor key.
+    apply() compares a device's current statuses with the stored states, updates the store and
+    returns the transitions.
+
+    ARGUMENTS
+    emit_initial : bool, optional
+        Whether a monitor seen for the first time produces an event (previous None). Defaults
+        to False, so the first sweep only records the baseline.
+    """
+
+    def __init__(self, emit_initial=False):
+        self.emit_initial = emit_initial
+        self._state_names = []
+        self._state_codes = {}
+        self._devices = {}
+
+    def __len__(self):
+        return sum(len(monitors) for monitors in self._devices.values())
+
+    def _code(self, state):
+        code = self._state_codes.get(state)
+        if code is None:
+            code = self._state_codes[state] = len(self._state_names)
+            self._state_names.append(state)
+        return code
+
+    def state(self, device_id, monitor_key):
+        """Return the last known state of a monitor, or None."""
+        code = self._devices.get(str(device_id), {}).get(str(monitor_key))
+        return self._state_names[code] if code is not None else None
+
+    def apply(self, device_id, statuses, observed_at=None):
+        """
+        SYNOPSIS
+        Record a device's current monitor statuses and return the transitions.
+
+        ARGUMENTS
+        device_id : int
+            The device the statuses belong to.
+        statuses : list of dict
+            The monitor status items from get_device_service_monitor_status.
+        observed_at : str, optional
+            The ISO timestamp recorded in the events. Defaults to now (UTC).
+
+        OUTPUTS
+        list
+            Events: {"time", "deviceId", "monitor", "name", "previous", "current", "status"}
+        """
+        observed_at = observed_at or datetime.now(timezone.utc).isoformat()
+        device_key = str(device_id)
+        known = self._devices.get(device_key, {})
+        first_sweep = device_key not in self._devices
+        current = {}
+        events = []
+
+        for item in statuses:
+            monitor = _first(item, MONITOR_KEY_FIELDS)
+            if monitor is None:
+                continue
+            monitor = str(monitor)
+            state = _first(item, STATE_FIELDS)
+            code = self._code(state)
+            current[monitor] = code
+            previous = known.get(monitor)
+            if previous == code or (previous is None and first_sweep and not self.emit_initial):
+                continue
+            events.append({
+                "time": observed_at, "deviceId": device_id, "monitor": monitor,
+                "name": _first(item, NAME_FIELDS),
+                "previous": self._state_names[previous] if previous is not None else None,
+                "current": state, "status": item,
+            })
+
+        for monitor, previous in known.items():
+            if monitor not in current:
+                events.append({
+                    "time": observed_at, "deviceId": device_id, "monitor": monitor, "name": None,
+                    "previous": self._state_names[previous], "current": None, "status": None,
+                })
+
+        self._devices[device_key] = current
+        return events
+
+    def forget(self, device_ids):
+        """Drop the states of devices that no longer exist (IDs not in device_ids)."""
+        keep = {str(device_id) for device_id in device_ids}
+        for device_key in [key for key in self._devices if key not in keep]:
+            del self._devices[device_key]
+
+    def save(self, path):
+        """Write the store to a JSON file atomically."""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump({"states": self._state_names, "devices": self._devices}, state_file, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, emit_initial=False):
+        """Load a store saved with save(), or return an empty store if the file does not exist."""
+        store = cls(emit_initial=emit_initial)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as state_file:
+                saved = json.load(state_file)
+            store._state_names = saved.get("states", [])
+            store._state_codes = {state: code for code, state in enumerate(store._state_names)}
+            store._devices = saved.get("devices", {})
+        return store
+
+
+def _status_items(response):
+    if isinstance(response, dict):
+        response = response.get("data")
+    return response if isinstance(response, list) else []
+
+
+def sweep_service_monitors(device_ids, base_uri, access_token, store, interval_seconds=DEFAULT_INTERVAL_SECONDS,
+                           max_workers=DEFAULT_MAX_WORKERS):
+    """
+    SYNOPSIS
+    Fetch the service monitor status of every device once, at a steady rate, and yield transitions.
+
+    DESCRIPTION
+    Requests are paced so the whole sweep takes about interval_seconds: the rate is the number of
+    devices divided by the interval. Up to max_workers requests may be in flight, so a slow
+    response does not delay the requests behind it.
+
+    ARGUMENTS
+    device_ids : iterable of int
+        The devices to sweep.
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    store : ServiceMonitorStateStore
+        The last known states; updated in place.
+    interval_seconds : float, optional
+        The time to spread the sweep over. Defaults to 300.
+    max_workers : int, optional
+        The maximum number of concurrent requests. Defaults to 8.
+
+    OUTPUTS
+    generator
+        Transition events (see ServiceMonitorStateStore.apply), in detection order.
+    """
+    device_ids = list(device_ids)
+    if not device_ids:
+        return
+    limiter = RateLimiter(rate=len(device_ids) / max(interval_seconds, 1))
+
+    def fetch(device_id):
+        limiter.acquire()
+        return get_device_service_monitor_status(device_id, base_uri, access_token)
+
+    started = time.monotonic()
+    failed = 0
+    transitions = 0
+    for device_id, response, error in imap_unordered(fetch, device_ids, max_workers=max_workers):
+        if error is not None or response is None:
+            failed += 1
+            continue
+        for event in store.apply(device_id, _status_items(response)):
+            transitions += 1
+            yield event
+
+    print(f"Swept {len(device_ids)} devices in {time.monotonic() - started:.0f}s: "
+          f"{transitions} transitions, {failed} failed")
+
+
+def run_sweeper(get_device_ids, base_uri, access_token, store, interval_seconds=DEFAULT_INTERVAL_SECONDS,
+                max_workers=DEFAULT_MAX_WORKERS, cycles=None, state_path=None):
+    """
+    SYNOPSIS
+    Sweep all devices every interval_seconds and yield the transitions as an event stream.
+
+    ARGUMENTS
+    get_device_ids : callable
+        Returns the device IDs to sweep; called at the start of every cycle so new and deleted
+        devices are picked up (e.g. from a Devices.Device_Index.DeviceIndex kept up to date).
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str or callable
+        The access token for authentication, or a callable returning a current one. A callable
+        is called at the start of every sweep, so a token refreshed in the meantime is used.
+    store : ServiceMonitorStateStore
+        The last known states; updated in place.
+    interval_seconds : float, optional
+        The sweep interval. Defaults to 300.
+    max_workers : int, optional
+        The maximum number of concurrent requests. Defaults to 8.
+    cycles : int, optional
+        Stop after this many sweeps. Defaults to running until the consumer stops.
+    state_path : str, optional
+        Save the store to this file after every sweep.
+
+    OUTPUTS
+    generator
+        Transition events, across sweeps.
+
+    USAGE_EXAMPLE
+    for event in run_sweeper(lambda: device_ids, base_uri, get_access_token, ServiceMonitorStateStore()):
+        forward_to_alerting(event)
+    """
+    cycle = 0
+    while cycles is None or cycle < cycles:
+        started = time.monotonic()
+        device_ids = list(get_device_ids())
+        store.forget(device_ids)
+        token = access_token() if callable(access_token) else access_token
+        yield from sweep_service_monitors(device_ids, base_uri, token, store,
+                                          interval_seconds=interval_seconds, max_workers=max_workers)
+        if state_path:
+            store.save(state_path)
+        cycle += 1
+        if cycles is None or cycle < cycles:
+            time.sleep(max(interval_seconds - (time.monotonic() - started), 0))
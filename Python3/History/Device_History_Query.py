@@ -0,0 +1,265 @@
+"""
+Device History Query
+
+This module answers point-in-time questions about the device history database written by
+History/Device_History_Store.py, using indexes instead of full table scans.
+
+Key Features:
+- Adds indexes on (deviceId, date), (customerId, date), (siteId, date) and (date, deviceId)
+  for snapshot storage, and the equivalent valid_from indexes for scd2 storage
+- device_state_as_of(): a device's row as of any date
+- devices_as_of(): the fleet (optionally one customer or site) as of any date
+- diff_snapshots(): devices added, removed and changed (field by field) between two dates
+- first_last_seen(): the first and last snapshot date each device appeared in
+
+Usage:
+    from History.Device_History_Store import connect_history_db
+    from History.Device_History_Query import ensure_history_indexes, diff_snapshots
+
+    conn = connect_history_db("ncentral_device_history.db")
+    ensure_history_indexes(conn)
+    diff = diff_snapshots(conn, "2024-05-01", "2024-06-01")
+    print(len(diff["added"]), len(diff["removed"]), len(diff["changed"]))
+
+Notes:
+- Dates are ISO strings (YYYY-MM-DD). A date between runs resolves to the latest snapshot taken
+  on or before it, so "as of" questions work for any calendar date.
+- All functions work with both storage modes.
+"""
+
+from History.Device_History_Store import OVERFLOW_COLUMN, device_columns, quote_identifier, quoted_columns
+
+# Indexes for snapshot storage (the 'devices' table)
+SNAPSHOT_INDEXES = {
+    "devices_device_date": '"deviceId", date',
+    "devices_customer_date": '"customerId", date',
+    "devices_site_date": '"siteId", date',
+    # Lets single-day reads (diffs, reruns) avoid scanning every snapshot
+    "devices_date_device": 'date, "deviceId"',
+}
+
+# Indexes for scd2 storage (the 'device_versions' table; ("deviceId", valid_from) is its primary key)
+SCD2_INDEXES = {
+    "device_versions_customer": '"customerId", valid_from',
+    "device_versions_site": '"siteId", valid_from',
+    "device_versions_from": 'valid_from',
+}
+
+
+def _is_scd2(conn):
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'devices'").fetchone()
+    return row is not None and row[0] == "view"
+
+
+def ensure_history_indexes(conn):
+    """
+    SYNOPSIS
+    Create the time-travel indexes on the history database if they are missing.
+
+    ARGUMENTS
+    conn : sqlite3.Connection
+        An open connection to the history database.
+
+    NOTES
+    - Safe to call on every run; existing indexes are left untouched.
+    - Planner statistics are rebuilt with a full ANALYZE only when an index was created; otherwise
+      PRAGMA optimize refreshes them only if they have gone stale.
+    """
+    if _is_scd2(conn):
+        table, indexes = "device_versions", SCD2_INDEXES
+    else:
+        table, indexes = "devices", SNAPSHOT_INDEXES
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    missing = [name for name in indexes if name not in existing]
+    with conn:
+        for name in missing:
+            conn.execute(f"CREATE INDEX {name} ON {table} ({indexes[name]})")
+        if missing:
+            conn.execute("ANALYZE")
+    if not missing:
+        conn.execute("PRAGMA optimize")
+
+
+def snapshot_date_as_of(conn, as_of):
+    """Return the latest snapshot date on or before as_of, or None if there is none."""
+    if _is_scd2(conn):
+        row = conn.execute("SELECT MAX(date) FROM snapshot_dates WHERE date <= ?", (as_of,)).fetchone()
+    else:
+        row = conn.execute("SELECT MAX(date) FROM devices WHERE date <= ?", (as_of,)).fetchone()
+    return row[0]
+
+
+def _snapshot_columns(conn):
+    """The columns returned for a device row: the same in both storage modes."""
+    return quoted_columns(["date"] + device_columns(conn) + [OVERFLOW_COLUMN])
+
+
+def _rows_as_dicts(cursor):
+    names = [description[0] for description in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+
+def device_state_as_of(conn, device_id, as_of):
+    """
+    SYNOPSIS
+    Return a device's recorded state as of a date.
+
+    ARGUMENTS
+    conn : sqlite3.Connection
+        An open connection to the history database.
+    device_id : int
+        The device ID.
+    as_of : str
+        An ISO date (YYYY-MM-DD).
+
+    OUTPUTS
+    dict or None
+        The device row (date plus every device column) from the latest snapshot on or before as_of,
+        or None if the device was not part of that snapshot.
+
+    USAGE_EXAMPLE
+    state = device_state_as_of(conn, 123456, "2024-06-01")
+    """
+    snapshot_date = snapshot_date_as_of(conn, as_of)
+    if snapshot_date is None:
+        return None
+    cursor = conn.execute(f'SELECT {_snapshot_columns(conn)} FROM devices WHERE "deviceId" = ? AND date = ?',
+                          (device_id, snapshot_date))
+    rows = _rows_as_dicts(cursor)
+    return rows[0] if rows else None
+
+
+def devices_as_of(conn, as_of, customer_id=None, site_id=None):
+    """
+    SYNOPSIS
+    Return every device as of a date, optionally for one customer or site.
+
+    ARGUMENTS
+    conn : sqlite3.Connection
+        An open connection to the history database.
+    as_of : str
+        An ISO date (YYYY-MM-DD).
+    customer_id : int, optional
+        Only return devices of this customer.
+    site_id : int, optional
+        Only return devices of this site.
+
+    OUTPUTS
+    list
+        Device rows (dicts) from the latest snapshot on or before as_of, ordered by deviceId.
+    """
+    snapshot_date = snapshot_date_as_of(conn, as_of)
+    if snapshot_date is None:
+        return []
+
+    sql = f"SELECT {_snapshot_columns(conn)} FROM devices WHERE date = ?"
+    params = [snapshot_date]
+    if customer_id is not None:
+        sql += ' AND "customerId" = ?'
+        params.append(customer_id)
+    if site_id is not None:
+        sql += ' AND "siteId" = ?'
+        params.append(site_id)
+    sql += ' ORDER BY "deviceId"'
+    return _rows_as_dicts(conn.execute(sql, params))
+
+
+def diff_snapshots(conn, date_a, date_b):
+    """
+    SYNOPSIS
+    Compare the fleet between two dates.
+
+    DESCRIPTION
+    Resolves both dates to their snapshots and compares them in SQL, so only the devices that
+    were added, removed or changed are read back into Python.
+
+    ARGUMENTS
+    conn : sqlite3.Connection
+        An open connection to the history database.
+    date_a : str
+        The earlier ISO date.
+    date_b : str
+        The later ISO date.
+
+    OUTPUTS
+    dict
+        {"date_a": resolved date, "date_b": resolved date,
+         "added": [deviceId, ...], "removed": [deviceId, ...],
+         "changed": {deviceId: {field: (value_at_a, value_at_b), ...}, ...}}
+
+    USAGE_EXAMPLE
+    diff = diff_snapshots(conn, "2024-05-01", "2024-06-01")
+    for device_id, fields in diff["changed"].items():
+        print(device_id, fields)
+    """
+    snapshot_a = snapshot_date_as_of(conn, date_a)
+    snapshot_b = snapshot_date_as_of(conn, date_b)
+    diff = {"date_a": snapshot_a, "date_b": snapshot_b, "added": [], "removed": [], "changed": {}}
+
+    present_sql = 'SELECT "deviceId" FROM devices WHERE date = ?'
+    diff["added"] = [row[0] for row in conn.execute(
+        f'{present_sql} EXCEPT {present_sql} ORDER BY 1', (snapshot_b, snapshot_a))]
+    diff["removed"] = [row[0] for row in conn.execute(
+        f'{present_sql} EXCEPT {present_sql} ORDER BY 1', (snapshot_a, snapshot_b))]
+
+    compared_columns = [c for c in device_columns(conn) if c != "deviceId"] + [OVERFLOW_COLUMN]
+    selected = ", ".join(f"a.{quote_identifier(c)}, b.{quote_identifier(c)}" for c in ["deviceId"] + compared_columns)
+    if _is_scd2(conn):
+        # Versions are immutable, so a device changed exactly when a different version is current
+        differs = "a.content_hash IS NOT b.content_hash"
+        source = '''(SELECT v.* FROM device_versions v
+                     WHERE v.valid_from <= :day AND (v.valid_to IS NULL OR :day < v.valid_to))'''
+        sql = f'''
+            SELECT {selected}
+            FROM {source.replace(":day", ":a")} a
+            JOIN {source.replace(":day", ":b")} b ON a."deviceId" = b."deviceId"
+            WHERE {differs}
+        '''
+    else:
+        differs = " OR ".join(f"a.{quote_identifier(c)} IS NOT b.{quote_identifier(c)}" for c in compared_columns)
+        sql = f'''
+            SELECT {selected}
+            FROM devices a
+            JOIN devices b ON a."deviceId" = b."deviceId" AND b.date = :b
+            WHERE a.date = :a AND ({differs})
+        '''
+
+    if snapshot_a is None or snapshot_b is None:
+        return diff
+
+    for row in conn.execute(sql, {"a": snapshot_a, "b": snapshot_b}):
+        fields = {}
+        for index, column in enumerate(compared_columns, start=1):
+            old, new = row[2 * index], row[2 * index + 1]
+            if old != new:
+                fields[column] = (old, new)
+        if fields:
+            diff["changed"][row[0]] = fields
+    return diff
+
+
+def first_last_seen(conn):
+    """
+    SYNOPSIS
+    Return the first and last snapshot date in which each device appeared.
+
+    OUTPUTS
+    dict
+        {deviceId: (first_seen, last_seen), ...}
+
+    NOTES
+    - Snapshot storage reads only the (deviceId, date) index; scd2 storage reads one row per
+      device version instead of expanding every daily snapshot.
+    """
+    if _is_scd2(conn):
+        sql = '''
+            SELECT "deviceId", first_seen,
+                   CASE WHEN open_versions > 0 THEN (SELECT MAX(date) FROM snapshot_dates)
+                        ELSE (SELECT MAX(date) FROM snapshot_dates s WHERE s.date < last_closed) END
+            FROM (SELECT "deviceId", MIN(valid_from) AS first_seen,
+                         SUM(valid_to IS NULL) AS open_versions, MAX(valid_to) AS last_closed
+                  FROM device_versions GROUP BY "deviceId")
+        '''
+    else:
+        sql = 'SELECT "deviceId", MIN(date), MAX(date) FROM devices GROUP BY "deviceId"'
+    return {device_id: (first_seen, last_seen) for device_id, first_seen, last_seen in conn.execute(sql)}
@@ -0,0 +1,742 @@
+"""
+Device History Store
+
+This module stores daily snapshots of the N-central device list in a local SQLite database.
+It is used by examples/All_Devices_History.py and can be reused by other scripts that need a
+device history.
+
+Key Features:
+- Two storage modes:
+  - "snapshot": one full row per device per day in the 'devices' table (the original layout)
+  - "scd2": change-only storage (slowly changing dimension, type 2). A row is written to
+    'device_versions' only when a device's content hash changes, with valid_from/valid_to
+    date ranges. A 'devices' view reconstructs the full daily snapshot, so queries written
+    against the snapshot table keep working unchanged.
+- Batched inserts in WAL mode with pragmas tuned for bulk loads
+- Page-by-page staging in a scratch database, swapped in atomically at the end of a run
+- Same-day reruns in snapshot mode compare the staged rows with the earlier run's column by
+  column: only changed devices are rewritten and only vanished devices deleted, so a rerun on a
+  quiet day writes almost nothing
+- Change detection leaves out VOLATILE_FIELDS (fields such as lastApplianceCheckinTime that change
+  on every check-in), so a device whose only change is a new check-in is not a changed device;
+  their current values are still stored
+- Schema evolution: new scalar fields in the payload get their own column (ALTER TABLE ADD
+  COLUMN) the first time they appear; object/array fields are kept as compact JSON in the
+  'extra_fields' column. The 'device_fields' table records when each field was first and last seen.
+
+Usage:
+    from History.Device_History_Store import save_devices_to_db, save_device_pages_to_db
+
+    save_devices_to_db("ncentral_device_history.db", devices)
+    save_device_pages_to_db("ncentral_device_history.db", pages, storage="scd2")
+
+Notes:
+- A database uses one storage mode for its lifetime; 'devices' is a table in snapshot mode
+  and a view in scd2 mode.
+- Content hashes are computed only where change detection relies on them (scd2 versions); the
+  content_hash column of the snapshot table is left NULL.
+- valid_to is exclusive: a version is part of every snapshot date d with
+  valid_from <= d < valid_to (or valid_to IS NULL for the current version).
+- Columns are never dropped: a field N-central stops sending keeps its column (and its history),
+  and its last_seen date in 'device_fields' stops advancing.
+- Volatile fields still read as of each snapshot date: a same-day rerun updates them in place, and
+  in scd2 mode the 'device_volatile' side table holds each day's values that differ from the
+  version's, joined into the devices view. Pass volatile_fields=() to the save functions to hash
+  (and so version) every field.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import date
+from functools import partial
+from itertools import islice
+
+STORAGE_SNAPSHOT = "snapshot"
+STORAGE_SCD2 = "scd2"
+STORAGE_MODES = (STORAGE_SNAPSHOT, STORAGE_SCD2)
+
+# Initial schema for the devices table; columns for new fields are added as they appear
+DEVICES_TABLE_SCHEMA = '''
+CREATE TABLE devices (
+    date TEXT NOT NULL,
+    content_hash TEXT,
+    "applianceId" INTEGER,
+    "customerId" INTEGER,
+    "customerName" TEXT,
+    "description" TEXT,
+    "deviceClass" TEXT,
+    "deviceClassLabel" TEXT,
+    "deviceId" INTEGER,
+    "discoveredName" TEXT,
+    "isProbe" INTEGER,
+    "lastApplianceCheckinTime" TEXT,
+    "lastLoggedInUser" TEXT,
+    "licenseMode" TEXT,
+    "longName" TEXT,
+    "orgUnitId" INTEGER,
+    "osId" TEXT,
+    "remoteControlUri" TEXT,
+    "siteId" INTEGER,
+    "siteName" TEXT,
+    "soId" INTEGER,
+    "soName" TEXT,
+    "sourceUri" TEXT,
+    "stillLoggedIn" TEXT,
+    "supportedOs" TEXT,
+    "supportedOsLabel" TEXT,
+    "uri" TEXT,
+    "extra_fields" TEXT
+)
+'''
+
+# Initial schema for the change-only (scd2) device versions table
+DEVICE_VERSIONS_TABLE_SCHEMA = '''
+CREATE TABLE device_versions (
+    valid_from TEXT NOT NULL,
+    valid_to TEXT,
+    content_hash TEXT NOT NULL,
+    "applianceId" INTEGER,
+    "customerId" INTEGER,
+    "customerName" TEXT,
+    "description" TEXT,
+    "deviceClass" TEXT,
+    "deviceClassLabel" TEXT,
+    "deviceId" INTEGER NOT NULL,
+    "discoveredName" TEXT,
+    "isProbe" INTEGER,
+    "lastApplianceCheckinTime" TEXT,
+    "lastLoggedInUser" TEXT,
+    "licenseMode" TEXT,
+    "longName" TEXT,
+    "orgUnitId" INTEGER,
+    "osId" TEXT,
+    "remoteControlUri" TEXT,
+    "siteId" INTEGER,
+    "siteName" TEXT,
+    "soId" INTEGER,
+    "soName" TEXT,
+    "sourceUri" TEXT,
+    "stillLoggedIn" TEXT,
+    "supportedOs" TEXT,
+    "supportedOsLabel" TEXT,
+    "uri" TEXT,
+    "extra_fields" TEXT,
+    PRIMARY KEY ("deviceId", valid_from)
+)
+'''
+
+# Per-date values of the volatile fields in scd2 mode, for devices whose value that day differs from
+# their version's; volatile columns are added as they are first stored
+DEVICE_VOLATILE_TABLE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS device_volatile (
+    date TEXT NOT NULL,
+    "deviceId" INTEGER NOT NULL,
+    PRIMARY KEY (date, "deviceId")
+) WITHOUT ROWID
+'''
+
+# Tracks every payload field: whether it has its own column, lives in the overflow column, or has
+# only been null so far (no column yet)
+DEVICE_FIELDS_TABLE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS device_fields (
+    name TEXT PRIMARY KEY,
+    storage TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+)
+'''
+
+# Initial device column names in order (excluding date)
+DEVICE_COLUMNS = [
+    "applianceId", "customerId", "customerName", "description", "deviceClass",
+    "deviceClassLabel", "deviceId", "discoveredName", "isProbe",
+    "lastApplianceCheckinTime", "lastLoggedInUser", "licenseMode", "longName",
+    "orgUnitId", "osId", "remoteControlUri", "siteId", "siteName", "soId",
+    "soName", "sourceUri", "stillLoggedIn", "supportedOs", "supportedOsLabel", "uri"
+]
+
+# Column holding the fields that have no column of their own, as compact JSON
+OVERFLOW_COLUMN = "extra_fields"
+
+# Bookkeeping columns that precede the device columns in each table
+SNAPSHOT_PREFIX_COLUMNS = ("date", "content_hash")
+VERSION_PREFIX_COLUMNS = ("valid_from", "valid_to", "content_hash")
+
+# New scalar fields get their own column until a table has this many device columns; after that
+# they go to the overflow column (SQLite allows 2000 columns per table by default)
+MAX_DEVICE_COLUMNS = 500
+
+FIELD_COLUMN = "column"
+FIELD_OVERFLOW = "overflow"
+# A field that has only ever been null, so it has no column yet
+FIELD_DEFERRED = "deferred"
+
+# Fields left out of content hashes: they change on nearly every run without the device changing,
+# and would otherwise open a new scd2 version (or rewrite the row on a rerun) for almost every device
+VOLATILE_FIELDS = frozenset({"lastApplianceCheckinTime"})
+
+# Rows per batched insert when saving devices
+INSERT_CHUNK_SIZE = 10000
+
+
+def quote_identifier(name):
+    """Return a column or table name quoted for use in SQL (SQLite and DuckDB alike)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quoted_columns(columns, alias=None):
+    """Return a comma-separated list of quoted column names, each prefixed with alias if given."""
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(prefix + quote_identifier(c) for c in columns)
+
+
+def _scd2_view_sql(columns, volatile_columns=()):
+    """Return the backward-compatible daily snapshot view over the scd2 tables."""
+    if not volatile_columns:
+        return f'''
+CREATE VIEW main.devices AS
+SELECT d.date AS date, {quoted_columns(columns, "v")}
+FROM main.snapshot_dates d
+JOIN main.device_versions v
+  ON v.valid_from <= d.date AND (v.valid_to IS NULL OR d.date < v.valid_to)
+'''
+    # A volatile column reads that day's stored value, or the version's when none was stored
+    selected = ", ".join(
+        f"CASE WHEN x.\"deviceId\" IS NULL THEN v.{quote_identifier(c)} ELSE x.{quote_identifier(c)} END "
+        f"AS {quote_identifier(c)}" if c in volatile_columns else f"v.{quote_identifier(c)}"
+        for c in columns
+    )
+    return f'''
+CREATE VIEW main.devices AS
+SELECT d.date AS date, {selected}
+FROM main.snapshot_dates d
+JOIN main.device_versions v
+  ON v.valid_from <= d.date AND (v.valid_to IS NULL OR d.date < v.valid_to)
+LEFT JOIN main.device_volatile x
+  ON x.date = d.date AND x."deviceId" = v."deviceId"
+'''
+
+
+def _column_type(value):
+    """Return the declared type for a new column, based on a sample value."""
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if isinstance(value, str):
+        return "TEXT"
+    return ""
+
+
+def connect_history_db(db_path):
+    """Open the history database with WAL journaling and pragmas tuned for bulk inserts."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")  # Readers are not blocked while a snapshot is written
+    conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; skips an fsync per transaction
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _object_type(conn, name, schema="main"):
+    row = conn.execute(f"SELECT type FROM {schema}.sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def table_columns(conn, table, schema="main"):
+    """Return {column name: declared type} for a table or view, in column order."""
+    return {row[1]: row[2] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+
+
+def device_columns(conn, table="devices", schema="main"):
+    """Return the device columns of a history table: every column except bookkeeping ones."""
+    bookkeeping = set(SNAPSHOT_PREFIX_COLUMNS + VERSION_PREFIX_COLUMNS) | {OVERFLOW_COLUMN}
+    return [c for c in table_columns(conn, table, schema) if c not in bookkeeping]
+
+
+def add_missing_columns(conn, table, columns, schema="main"):
+    """Add the columns ({name: declared type}) a table lacks. Returns the added names."""
+    existing = table_columns(conn, table, schema)
+    added = [name for name in columns if name not in existing]
+    for name in added:
+        conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {quote_identifier(name)} {columns[name]}")
+    return added
+
+
+def _volatile_columns(conn):
+    """Return the volatile columns stored per date in device_volatile."""
+    return [c for c in table_columns(conn, "device_volatile") if c not in ("date", "deviceId")]
+
+
+def _refresh_scd2_view(conn):
+    conn.execute("DROP VIEW IF EXISTS main.devices")
+    conn.execute(_scd2_view_sql(device_columns(conn, "device_versions") + [OVERFLOW_COLUMN],
+                                _volatile_columns(conn)))
+
+
+def load_device_fields(conn):
+    """Return {field name: FIELD_COLUMN, FIELD_OVERFLOW or FIELD_DEFERRED} for every field recorded so far."""
+    return dict(conn.execute("SELECT name, storage FROM main.device_fields"))
+
+
+def _field_storage(schema, field):
+    if field in schema.overflow:
+        return FIELD_OVERFLOW
+    if field in schema.columns:
+        return FIELD_COLUMN
+    return FIELD_DEFERRED
+
+
+def _record_device_fields(conn, schema, snapshot_date):
+    conn.executemany('''
+        INSERT INTO main.device_fields (name, storage, first_seen, last_seen) VALUES (?, ?, ?, ?)
+        ON CONFLICT (name) DO UPDATE SET storage = excluded.storage, last_seen = excluded.last_seen
+    ''', [(field, _field_storage(schema, field), snapshot_date, snapshot_date) for field in sorted(schema.seen)])
+
+
+class DeviceSchema:
+    """
+    The evolving column layout of one history table.
+
+    observe() is called with each page before it is written: fields seen with a value for the first
+    time get a new column (or, for objects and arrays, a slot in the overflow column). A field that
+    is null in every device so far gets no column yet, so its type comes from its first real value.
+    insert() writes the page; once a column has received an object or array (a field that was
+    scalar when its column was added), the schema switches to JSON-encoding such values. insert_sql() only
+    changes when a column is added, so each schema version is a single prepared statement.
+    """
+
+    def __init__(self, conn, table, prefix_columns, schema="main", fields=None, verb="INSERT"):
+        self.conn = conn
+        self.table = table
+        self.schema = schema
+        self.prefix_columns = prefix_columns
+        self.verb = verb
+        self.columns = device_columns(conn, table, schema)
+        self.overflow = [name for name, storage in (fields or {}).items()
+                         if storage == FIELD_OVERFLOW and name not in self.columns]
+        self.seen = set()
+        self.encode_objects = False
+        self._known = set(self.columns) | set(self.overflow)
+        self._insert_sql = None
+
+    def observe(self, devices):
+        """Extend the schema for fields not seen before. Returns True if columns were added."""
+        new_fields = {}
+        previous_keys = None
+        for device in devices:
+            keys = device.keys()
+            # Devices from one endpoint almost always share a key set, so compare against the last one
+            if keys == previous_keys:
+                continue
+            previous_keys = keys
+            self.seen.update(keys)
+            if not self._known.issuperset(keys):
+                new_fields.update(dict.fromkeys(keys - self._known))
+
+        added = False
+        for field in new_fields:
+            sample = next((d[field] for d in devices if d.get(field) is not None), None)
+            if sample is None:
+                # Null everywhere so far: the column's type is decided by the first page with a value
+                continue
+            self._known.add(field)
+            if isinstance(sample, (dict, list)) or len(self.columns) >= MAX_DEVICE_COLUMNS:
+                self.overflow.append(field)
+                self._insert_sql = None
+            else:
+                self.add_column(field, _column_type(sample))
+                added = True
+        return added
+
+    def add_column(self, field, declared_type=""):
+        """Add a column for a field, e.g. an identity field that must exist before any payload has it."""
+        if field in self.columns:
+            return
+        self.conn.execute(f"ALTER TABLE {self.schema}.{self.table} "
+                          f"ADD COLUMN {quote_identifier(field)} {declared_type}")
+        self.columns.append(field)
+        self._known.add(field)
+        self._insert_sql = None
+
+    def insert_sql(self):
+        """Return the INSERT statement for the current schema version."""
+        if self._insert_sql is None:
+            column_names = list(self.prefix_columns) + self.columns + [OVERFLOW_COLUMN]
+            placeholders = ", ".join(["?"] * len(column_names))
+            self._insert_sql = (f"{self.verb} INTO {self.schema}.{self.table} ({quoted_columns(column_names)}) "
+                                f"VALUES ({placeholders})")
+        return self._insert_sql
+
+    def insert(self, build_rows, devices, *args, **kwargs):
+        """
+        Insert the rows of build_rows(devices, *args, self, **kwargs); returns the row count.
+
+        Rows are first bound as they are. If a value cannot be bound (an object or array in a
+        scalar column), the partial insert is rolled back and the rows are rebuilt with such values
+        as JSON, as they will be for every later page of this schema.
+        """
+        if not self.encode_objects:
+            self.conn.execute("SAVEPOINT device_rows")
+            try:
+                return self.conn.executemany(self.insert_sql(), build_rows(devices, *args, self, **kwargs)).rowcount
+            except (sqlite3.InterfaceError, sqlite3.ProgrammingError):
+                self.conn.execute("ROLLBACK TO device_rows")
+                self.encode_objects = True
+            finally:
+                self.conn.execute("RELEASE device_rows")
+        return self.conn.executemany(self.insert_sql(), build_rows(devices, *args, self, **kwargs)).rowcount
+
+    def overflow_json(self, device):
+        """Return the device's overflow fields as compact JSON, or None if it has none."""
+        extra = {field: device[field] for field in self.overflow if device.get(field) is not None}
+        return json.dumps(extra, separators=(",", ":"), default=str) if extra else None
+
+
+def ensure_devices_table(conn):
+    """Create the devices table if it doesn't exist."""
+    devices_type = _object_type(conn, "devices")
+    if devices_type == "view":
+        raise ValueError("This history database uses scd2 storage; save it with storage='scd2'.")
+    with conn:
+        if devices_type is None:
+            conn.execute(DEVICES_TABLE_SCHEMA)
+            print("Created table 'devices'")
+        else:
+            # Databases created before schema evolution and content hashes lack these columns
+            add_missing_columns(conn, "devices", {"content_hash": "TEXT", OVERFLOW_COLUMN: "TEXT"})
+        # Lets a rerun find the day's rows per device
+        conn.execute('CREATE INDEX IF NOT EXISTS devices_date_device ON devices (date, "deviceId")')
+        conn.execute(DEVICE_FIELDS_TABLE_SCHEMA)
+
+
+def ensure_scd2_tables(conn):
+    """Create the device_versions and snapshot_dates tables and the devices view if they don't exist."""
+    devices_type = _object_type(conn, "devices")
+    if devices_type == "table":
+        raise ValueError("This history database uses snapshot storage; save it with storage='snapshot'.")
+    with conn:
+        if devices_type is None:
+            conn.execute(DEVICE_VERSIONS_TABLE_SCHEMA)
+            conn.execute('CREATE INDEX device_versions_open ON device_versions ("deviceId", valid_to)')
+            conn.execute("CREATE TABLE snapshot_dates (date TEXT PRIMARY KEY)")
+            conn.execute(DEVICE_VOLATILE_TABLE_SCHEMA)
+            _refresh_scd2_view(conn)
+            print("Created tables 'device_versions', 'snapshot_dates', 'device_volatile' and view 'devices'")
+        else:
+            # Databases created before per-date volatile values lack device_volatile
+            conn.execute(DEVICE_VOLATILE_TABLE_SCHEMA)
+            if add_missing_columns(conn, "device_versions", {OVERFLOW_COLUMN: "TEXT"}):
+                _refresh_scd2_view(conn)
+        conn.execute(DEVICE_FIELDS_TABLE_SCHEMA)
+
+
+def _encoded_values(device, columns):
+    """Return the device's values for the given columns, with objects and arrays as compact JSON."""
+    values = tuple(map(device.get, columns))
+    for value in values:
+        if isinstance(value, (dict, list)):
+            return tuple(json.dumps(v, separators=(",", ":"), default=str) if isinstance(v, (dict, list)) else v
+                         for v in values)
+    return values
+
+
+def _values_getter(schema):
+    """Return a function building a device's column values for the schema's current columns."""
+    columns = schema.columns
+    if schema.encode_objects:
+        return partial(_encoded_values, columns=columns)
+    return lambda device: tuple(map(device.get, columns))
+
+
+def device_rows(devices, snapshot_date, schema, volatile_fields=VOLATILE_FIELDS, hashed=True):
+    """
+    Lazily build insert rows (date, content hash, the schema's columns, overflow) from device dicts.
+    With hashed=False the content hash is left NULL; snapshot tables compare columns instead.
+    """
+    values = _values_getter(schema)
+    if not hashed:
+        if not schema.overflow:
+            return ((snapshot_date, None) + values(device) + (None,) for device in devices)
+        return ((snapshot_date, None) + values(device) + (schema.overflow_json(device),) for device in devices)
+    if not schema.overflow:
+        return ((snapshot_date, content_hash(device, volatile_fields)) + values(device) + (None,)
+                for device in devices)
+    return ((snapshot_date, content_hash(device, volatile_fields)) + values(device) + (schema.overflow_json(device),)
+            for device in devices)
+
+
+# Reused by content_hash(); json.dumps() with options builds a new encoder on every call
+_hash_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str)
+
+
+def content_hash(device, volatile_fields=VOLATILE_FIELDS):
+    """Return a stable hash of a device's fields except volatile_fields, used to detect changed devices."""
+    if volatile_fields and not device.keys().isdisjoint(volatile_fields):
+        device = {field: value for field, value in device.items() if field not in volatile_fields}
+    encoded = _hash_encoder.encode(device).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+def _version_rows(devices, snapshot_date, schema, volatile_fields=VOLATILE_FIELDS):
+    values = _values_getter(schema)
+    for device in devices:
+        yield ((snapshot_date, None, content_hash(device, volatile_fields)) + values(device)
+               + (schema.overflow_json(device),))
+
+
+def print_history_summary(conn):
+    """Show summary of historical data."""
+    history = conn.execute("SELECT date, COUNT(*) FROM devices GROUP BY date ORDER BY date").fetchall()
+    print("\nDatabase history:")
+    for record_date, count in history:
+        print(f"  {record_date}: {count} devices")
+    if _object_type(conn, "device_versions") == "table":
+        versions = conn.execute("SELECT COUNT(*) FROM device_versions").fetchone()[0]
+        print(f"  ({versions} stored device versions)")
+
+
+def _has_snapshot(conn, snapshot_date):
+    return conn.execute("SELECT 1 FROM main.devices WHERE date = ? LIMIT 1", (snapshot_date,)).fetchone() is not None
+
+
+def save_devices_to_db(db_path, devices, storage=STORAGE_SNAPSHOT, volatile_fields=VOLATILE_FIELDS):
+    """Save devices to SQLite database with date tracking."""
+    if storage == STORAGE_SCD2:
+        save_device_pages_to_db(db_path, [devices], storage=storage, volatile_fields=volatile_fields)
+        return
+
+    today = date.today().isoformat()
+
+    conn = connect_history_db(db_path)
+    try:
+        ensure_devices_table(conn)
+
+        # A rerun merges with today's earlier snapshot through the staging path
+        if _has_snapshot(conn, today):
+            conn.close()
+            save_device_pages_to_db(db_path, [devices], storage=storage, volatile_fields=volatile_fields)
+            return
+
+        # Insert in batches within a single transaction, so a failure part-way leaves no partial
+        # snapshot; each chunk first extends the schema with any fields it introduces
+        schema = DeviceSchema(conn, "devices", SNAPSHOT_PREFIX_COLUMNS, fields=load_device_fields(conn))
+        remaining = iter(devices)
+        saved_count = 0
+        with conn:
+            conn.execute("BEGIN")
+            while True:
+                chunk = list(islice(remaining, INSERT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                schema.observe(chunk)
+                saved_count += schema.insert(device_rows, chunk, today, hashed=False)
+            _record_device_fields(conn, schema, today)
+
+        print(f"Successfully saved {saved_count} devices to database for {today}")
+        print_history_summary(conn)
+
+    finally:
+        conn.close()
+
+
+def _apply_scd2_snapshot(conn, snapshot_date):
+    """Merge the staged snapshot into device_versions, writing rows only for changed devices."""
+    # A rerun on the same day first undoes that day's earlier run
+    conn.execute("DELETE FROM main.device_versions WHERE valid_from = ?", (snapshot_date,))
+    conn.execute("UPDATE main.device_versions SET valid_to = NULL WHERE valid_to = ?", (snapshot_date,))
+
+    # Close current versions of devices that changed or disappeared
+    closed = conn.execute('''
+        UPDATE main.device_versions SET valid_to = ?
+        WHERE valid_to IS NULL AND NOT EXISTS (
+            SELECT 1 FROM staging.devices s
+            WHERE s."deviceId" = device_versions."deviceId" AND s.content_hash = device_versions.content_hash
+        )
+    ''', (snapshot_date,)).rowcount
+
+    # Open new versions for devices that are new or changed
+    column_names = quoted_columns(table_columns(conn, "devices", "staging"))
+    opened = conn.execute(f'''
+        INSERT INTO main.device_versions ({column_names})
+        SELECT {column_names} FROM staging.devices s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM main.device_versions v
+            WHERE v."deviceId" = s."deviceId" AND v.valid_to IS NULL
+        )
+    ''').rowcount
+
+    conn.execute("INSERT OR IGNORE INTO main.snapshot_dates (date) VALUES (?)", (snapshot_date,))
+    return closed, opened
+
+
+def _store_volatile_values(conn, snapshot_date, volatile_fields=VOLATILE_FIELDS):
+    """
+    Record the day's volatile values that differ from the devices' current versions.
+
+    Returns the volatile columns added to device_volatile, after which the view must be refreshed.
+    """
+    staged_columns = table_columns(conn, "devices", "staging")
+    volatile = [column for column in staged_columns if column in volatile_fields]
+    conn.execute("DELETE FROM main.device_volatile WHERE date = ?", (snapshot_date,))
+    if not volatile:
+        return []
+    added = add_missing_columns(conn, "device_volatile", {column: staged_columns[column] for column in volatile})
+    same_values = " AND ".join(f"s.{quote_identifier(column)} IS v.{quote_identifier(column)}"
+                               for column in volatile)
+    conn.execute(f'''
+        INSERT INTO main.device_volatile (date, "deviceId", {quoted_columns(volatile)})
+        SELECT ?, s."deviceId", {quoted_columns(volatile, "s")}
+        FROM staging.devices s
+        JOIN main.device_versions v ON v."deviceId" = s."deviceId" AND v.valid_to IS NULL
+        WHERE NOT ({same_values})
+    ''', (snapshot_date,))
+    return added
+
+
+def _merge_snapshot(conn, snapshot_date, volatile_fields=VOLATILE_FIELDS):
+    """
+    Merge the staged snapshot into today's rows, touching only changed, new and vanished devices.
+
+    Unchanged rows whose volatile fields moved on get just those columns updated in place.
+    """
+    staged_columns = table_columns(conn, "devices", "staging")
+    compared = [column for column in staged_columns
+                if column not in SNAPSHOT_PREFIX_COLUMNS and column not in volatile_fields]
+    same_content = " AND ".join(f"s.{quote_identifier(column)} IS devices.{quote_identifier(column)}"
+                                for column in compared)
+
+    # Devices that vanished since the earlier run, or whose content changed
+    deleted = conn.execute(f'''
+        DELETE FROM main.devices
+        WHERE date = ? AND NOT EXISTS (
+            SELECT 1 FROM staging.devices s
+            WHERE s."deviceId" = devices."deviceId" AND {same_content}
+        )
+    ''', (snapshot_date,)).rowcount
+
+    # Devices that are new or changed
+    column_names = quoted_columns(staged_columns)
+    inserted = conn.execute(f'''
+        INSERT INTO main.devices ({column_names})
+        SELECT {column_names} FROM staging.devices s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM main.devices m WHERE m.date = s.date AND m."deviceId" = s."deviceId"
+        )
+    ''').rowcount
+
+    # Unchanged devices whose volatile values differ from the earlier run's
+    volatile = [column for column in staged_columns if column in volatile_fields]
+    refreshed = 0
+    if volatile:
+        same_values = " AND ".join(f"s.{quote_identifier(column)} IS devices.{quote_identifier(column)}"
+                                   for column in volatile)
+        refreshed = conn.execute(f'''
+            UPDATE main.devices SET ({quoted_columns(volatile)}) = (
+                SELECT {quoted_columns(volatile, "s")} FROM staging.devices s
+                WHERE s."deviceId" = devices."deviceId"
+            )
+            WHERE date = ? AND EXISTS (
+                SELECT 1 FROM staging.devices s
+                WHERE s."deviceId" = devices."deviceId" AND NOT ({same_values})
+            )
+        ''', (snapshot_date,)).rowcount
+    return deleted, inserted, refreshed
+
+
+def save_device_pages_to_db(db_path, pages, storage=STORAGE_SNAPSHOT, volatile_fields=VOLATILE_FIELDS):
+    """
+    Save pages of devices to the SQLite database as they arrive.
+
+    Each page is written to a scratch staging database (<db_path>.staging) as soon as it is
+    received, so memory stays bounded by one page and database writes overlap with fetching.
+    When the last page has been staged, today's snapshot is replaced in a single short
+    transaction. If fetching fails part-way (pages raises), the staged rows are discarded and
+    the history database is left unchanged.
+
+    If today's snapshot already exists (a rerun), rows are compared by content hash and only
+    changed, new and vanished devices are written.
+
+    With storage="scd2", only devices whose content changed since the previous snapshot get a
+    new row in device_versions; unchanged devices just remain valid.
+
+    Changes to volatile_fields (default VOLATILE_FIELDS) alone do not count as a content change,
+    but their values are still kept current: a rerun updates them in place, and in scd2 mode each
+    day's values are stored in device_volatile (for devices whose value differs from their
+    version's), where the devices view picks them up.
+    """
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"Unknown storage mode '{storage}'; expected one of {STORAGE_MODES}")
+
+    today = date.today().isoformat()
+    staging_path = db_path + ".staging"
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+
+    conn = connect_history_db(db_path)
+    try:
+        # The staging database is scratch space, so it skips journaling and fsyncs entirely
+        conn.execute("ATTACH DATABASE ? AS staging", (staging_path,))
+        conn.execute("PRAGMA staging.journal_mode=OFF")
+        conn.execute("PRAGMA staging.synchronous=OFF")
+
+        if storage == STORAGE_SCD2:
+            ensure_scd2_tables(conn)
+            main_table = "device_versions"
+            conn.execute("CREATE TABLE staging.devices AS SELECT * FROM main.device_versions WHERE 0")
+            # One staged row per device; a device repeated across pages keeps its last copy
+            conn.execute('CREATE UNIQUE INDEX staging.devices_device ON devices ("deviceId")')
+            schema = DeviceSchema(conn, "devices", VERSION_PREFIX_COLUMNS, "staging", load_device_fields(conn),
+                                  verb="INSERT OR REPLACE")
+            build_rows = _version_rows
+        else:
+            ensure_devices_table(conn)
+            main_table = "devices"
+            conn.execute("CREATE TABLE staging.devices AS SELECT * FROM main.devices WHERE 0")
+            conn.execute('CREATE UNIQUE INDEX staging.devices_device ON devices ("deviceId")')
+            schema = DeviceSchema(conn, "devices", SNAPSHOT_PREFIX_COLUMNS, "staging", load_device_fields(conn),
+                                  verb="INSERT OR REPLACE")
+            build_rows = partial(device_rows, hashed=False)
+
+        # New fields only alter the staging table here; the history table gains them in the swap
+        staged_count = 0
+        for devices in pages:
+            with conn:
+                schema.observe(devices)
+                schema.insert(build_rows, devices, today, volatile_fields=volatile_fields)
+            staged_count += len(devices)
+
+        if staged_count == 0:
+            print("No devices found.")
+            return
+
+        # Swap the staged snapshot in atomically, adding any new columns in the same transaction
+        with conn:
+            conn.execute("BEGIN")
+            added = add_missing_columns(conn, main_table, table_columns(conn, "devices", "staging"))
+            if added:
+                print(f"Added column(s) for new field(s): {', '.join(added)}")
+            if storage == STORAGE_SCD2:
+                closed, opened = _apply_scd2_snapshot(conn, today)
+                if _store_volatile_values(conn, today, volatile_fields) or added:
+                    _refresh_scd2_view(conn)
+                print(f"Recorded {opened} new or changed and {closed} changed or removed device versions")
+            elif _has_snapshot(conn, today):
+                deleted, inserted, refreshed = _merge_snapshot(conn, today, volatile_fields)
+                print(f"Merged rerun for {today}: {deleted} changed or removed and {inserted} new or changed "
+                      f"device rows written, {refreshed} updated with new volatile values")
+            else:
+                column_names = quoted_columns(table_columns(conn, "devices", "staging"))
+                conn.execute(f"INSERT INTO main.devices ({column_names}) SELECT {column_names} FROM staging.devices")
+            _record_device_fields(conn, schema, today)
+
+        print(f"Successfully saved {staged_count} devices to database for {today}")
+        print_history_summary(conn)
+
+    finally:
+        conn.close()
+        for path in (staging_path, staging_path + "-journal"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,419 @@
+"""
+Device History DuckDB Backend
+
+This module stores the daily device snapshots in a DuckDB database instead of SQLite, or queries
+the Parquet exports written by History/Parquet_Export.py, so trend queries over months of history
+run as vectorized, multi-threaded column scans.
+
+Key Features:
+- save_devices_to_duckdb() / save_device_pages_to_duckdb(): the same ingestion API as
+  save_devices_to_db() / save_device_pages_to_db() in History/Device_History_Store.py
+- Pages are staged in a temporary JSON Lines file and loaded in bulk with DuckDB's JSON reader;
+  the day's snapshot is replaced in a single transaction at the end
+- New payload fields become new columns automatically; nested objects and arrays keep their
+  structure as STRUCT/LIST columns, and struct fields that appear later are added to the column.
+  A field that is null everywhere gets a VARCHAR column, and a column whose values no longer
+  convert to its type is widened to VARCHAR
+- connect_analytics(): one connection exposing a 'devices' relation over a DuckDB history file
+  or over the Parquet export directory
+- Ready-made trend queries: device counts and OS distribution per customer over time
+
+Usage:
+    from History.DuckDB_Backend import save_device_pages_to_duckdb, connect_analytics, os_distribution_over_time
+
+    save_device_pages_to_duckdb("ncentral_device_history.duckdb", pages)
+
+    conn = connect_analytics(parquet_dir="exports/device_history")
+    for row in os_distribution_over_time(conn, since="2024-01-01"):
+        print(row)
+
+Notes:
+- Requires the optional duckdb package (pip install duckdb). The SQLite store does not depend on it.
+- DuckDB stores every daily snapshot in full ("snapshot" storage); its columnar compression keeps
+  repeated values cheap, so change-only storage is not needed.
+"""
+
+import json
+import os
+from datetime import date
+
+try:
+    import duckdb
+except ImportError:  # Optional dependency; checked when the backend is used
+    duckdb = None
+
+from History.Device_History_Store import STORAGE_SNAPSHOT, quote_identifier
+
+
+def _require_duckdb():
+    if duckdb is None:
+        raise RuntimeError("The DuckDB backend requires the duckdb package (pip install duckdb).")
+
+
+# Numeric types in widening order; two numeric types merge into the wider one
+_NUMERIC_TYPES = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "FLOAT", "DOUBLE")
+
+
+def _split_top_level(text):
+    """Split a comma-separated type list, ignoring commas inside parentheses and quoted names."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for index, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and char == "," and depth == 0:
+            parts.append(text[start:index].strip())
+            start = index + 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def _parse_type(type_text):
+    """
+    Parse a DuckDB type name into ("struct", ((field, type), ...)), ("list", type),
+    ("map", key type, value type) or ("scalar", name).
+    """
+    type_text = type_text.strip()
+    if type_text.endswith("[]"):
+        return ("list", _parse_type(type_text[:-2]))
+    if type_text.startswith("STRUCT(") and type_text.endswith(")"):
+        fields = []
+        for field in _split_top_level(type_text[len("STRUCT("):-1]):
+            if field.startswith('"'):
+                end = 1
+                while True:
+                    end = field.index('"', end)
+                    if field[end + 1:end + 2] != '"':
+                        break
+                    end += 2
+                name, rest = field[1:end].replace('""', '"'), field[end + 1:]
+            else:
+                name, _, rest = field.partition(" ")
+            fields.append((name, _parse_type(rest)))
+        return ("struct", tuple(fields))
+    if type_text.startswith("MAP(") and type_text.endswith(")"):
+        key_type, value_type = _split_top_level(type_text[len("MAP("):-1])
+        return ("map", _parse_type(key_type), _parse_type(value_type))
+    return ("scalar", type_text)
+
+
+def _render_type(parsed):
+    kind = parsed[0]
+    if kind == "struct":
+        return "STRUCT(" + ", ".join(f"{quote_identifier(name)} {_render_type(field_type)}"
+                                     for name, field_type in parsed[1]) + ")"
+    if kind == "list":
+        return _render_type(parsed[1]) + "[]"
+    if kind == "map":
+        return f"MAP({_render_type(parsed[1])}, {_render_type(parsed[2])})"
+    return parsed[1]
+
+
+def _storage_type(parsed):
+    """Replace the NULL and JSON types inferred for all-null or mixed values with VARCHAR, at any depth."""
+    kind = parsed[0]
+    if kind == "struct":
+        return ("struct", tuple((name, _storage_type(field_type)) for name, field_type in parsed[1]))
+    if kind == "list":
+        return ("list", _storage_type(parsed[1]))
+    if kind == "map":
+        return ("map", _storage_type(parsed[1]), _storage_type(parsed[2]))
+    return ("scalar", "VARCHAR") if parsed[1] in ("NULL", "JSON") else parsed
+
+
+def _merge_types(table_type, staged_type):
+    """
+    Return the parsed type that holds both the column's values and the staged values without loss,
+    or None if there is none short of VARCHAR. Struct fields missing from the column are appended.
+    """
+    if table_type == staged_type:
+        return table_type
+    if staged_type[0] == "scalar" and staged_type[1] in ("NULL", "JSON"):
+        return table_type
+    if table_type[0] != staged_type[0]:
+        return None
+    kind = table_type[0]
+    if kind == "struct":
+        fields = dict(table_type[1])
+        for name, field_type in staged_type[1]:
+            if name not in fields:
+                fields[name] = _storage_type(field_type)
+                continue
+            fields[name] = _merge_types(fields[name], field_type)
+            if fields[name] is None:
+                return None
+        return ("struct", tuple(fields.items()))
+    if kind == "list":
+        element_type = _merge_types(table_type[1], staged_type[1])
+        return ("list", element_type) if element_type is not None else None
+    if kind == "map":
+        key_type, value_type = _merge_types(table_type[1], staged_type[1]), _merge_types(table_type[2], staged_type[2])
+        return ("map", key_type, value_type) if key_type is not None and value_type is not None else None
+    if table_type[1] == "VARCHAR":
+        return table_type
+    if table_type[1] in _NUMERIC_TYPES and staged_type[1] in _NUMERIC_TYPES:
+        return max(table_type, staged_type, key=lambda parsed: _NUMERIC_TYPES.index(parsed[1]))
+    return None
+
+
+def _column_type(inferred_type):
+    """Return the column type for an inferred type; all-null fields (NULL) and untyped JSON become VARCHAR."""
+    return _render_type(_storage_type(_parse_type(inferred_type)))
+
+
+def _is_nested(column_type):
+    return column_type.startswith(("STRUCT", "MAP", "UNION")) or column_type.endswith("]")
+
+
+def _as_varchar(expression, column_type):
+    """Return SQL converting a value to VARCHAR; nested values become JSON text rather than DuckDB's notation."""
+    if _is_nested(column_type) or column_type == "JSON":
+        return f"CAST(to_json({expression}) AS VARCHAR)"
+    return f"CAST({expression} AS VARCHAR)"
+
+
+def _widen_to_varchar(conn, name, table_type, staged_type, existing):
+    """Change a column to VARCHAR (nested values as JSON text); returns the staged value expression."""
+    column = quote_identifier(name)
+    conn.execute(f"ALTER TABLE devices ALTER COLUMN {column} SET DATA TYPE VARCHAR "
+                 f"USING {_as_varchar(column, table_type)}")
+    existing[name] = "VARCHAR"
+    print(f"Widened column {name} from {table_type} to VARCHAR for {staged_type} values")
+    return f"{_as_varchar(column, staged_type)} AS {column}"
+
+
+def _staged_select(conn, staged, params, staged_columns, existing):
+    """
+    Return a SELECT over the staged rows whose columns match the devices table's types.
+
+    A field whose type changed since its column was created (a string where a number was stored,
+    a value where every earlier one was null) is cast to the column's type when every value
+    converts; otherwise the column is widened to VARCHAR first. Nested types are compared
+    structurally: a struct that gained fields has them added to the column, and a conflict
+    between nested types widens the column to VARCHAR holding JSON text.
+    """
+    expressions = []
+    for name, staged_type, *_ in staged_columns:
+        column = quote_identifier(name)
+        table_type = existing[name]
+        if staged_type == table_type:
+            expressions.append(column)
+        elif staged_type == "NULL":
+            expressions.append(f"CAST(NULL AS {table_type}) AS {column}")
+        elif table_type == "VARCHAR":
+            expressions.append(f"{_as_varchar(column, staged_type)} AS {column}")
+        elif _is_nested(staged_type) or _is_nested(table_type):
+            merged = _merge_types(_parse_type(table_type), _parse_type(staged_type))
+            if merged is None:
+                expressions.append(_widen_to_varchar(conn, name, table_type, staged_type, existing))
+                continue
+            if merged != _parse_type(table_type):
+                existing[name] = _render_type(merged)
+                conn.execute(f"ALTER TABLE devices ALTER COLUMN {column} SET DATA TYPE {existing[name]}")
+                print(f"Extended column {name} from {table_type} to {existing[name]}")
+            expressions.append(f"CAST({column} AS {existing[name]}) AS {column}")
+        else:
+            lost = conn.execute(f"SELECT COUNT(*) FROM ({staged}) WHERE {column} IS NOT NULL "
+                                f"AND TRY_CAST({column} AS {table_type}) IS NULL", params).fetchone()[0]
+            if lost:
+                expressions.append(_widen_to_varchar(conn, name, table_type, staged_type, existing))
+            else:
+                expressions.append(f"CAST({column} AS {table_type}) AS {column}")
+    return f"SELECT {', '.join(expressions)} FROM ({staged})"
+
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [name]).fetchone()[0] > 0
+
+
+def _stage_pages(pages, staging_path):
+    """Write pages of devices to a JSON Lines file. Returns the number of devices written."""
+    count = 0
+    with open(staging_path, "w", encoding="utf-8") as staging_file:
+        for devices in pages:
+            for device in devices:
+                staging_file.write(json.dumps(device, separators=(",", ":"), default=str))
+                staging_file.write("\n")
+            count += len(devices)
+    return count
+
+
+def save_device_pages_to_duckdb(db_path, pages, storage=STORAGE_SNAPSHOT):
+    """
+    Save pages of devices to a DuckDB history database.
+
+    Each page is appended to a temporary JSON Lines file (<db_path>.staging.jsonl) as it arrives,
+    so memory stays bounded by one page. When the last page has been staged, the file is read in
+    bulk and today's snapshot is replaced in a single transaction. If fetching fails part-way,
+    the database is left unchanged.
+    """
+    _require_duckdb()
+    if storage != STORAGE_SNAPSHOT:
+        raise ValueError("The DuckDB backend supports storage='snapshot' only.")
+
+    today = date.today().isoformat()
+    staging_path = db_path + ".staging.jsonl"
+    try:
+        staged_count = _stage_pages(pages, staging_path)
+        if staged_count == 0:
+            print("No devices found.")
+            return
+
+        conn = duckdb.connect(db_path)
+        try:
+            staged = f"SELECT CAST(? AS DATE) AS date, * FROM read_json_auto(?, format='newline_delimited', sample_size=-1)"
+            params = [today, staging_path]
+            staged_columns = conn.execute(f"DESCRIBE {staged}", params).fetchall()
+            if not _table_exists(conn, "devices"):
+                columns = ", ".join(f"{quote_identifier(name)} {_column_type(column_type)}"
+                                    for name, column_type, *_ in staged_columns)
+                conn.execute(f"CREATE TABLE devices ({columns})")
+                print("Created table 'devices'")
+
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                # Add columns for fields that appear for the first time
+                existing = {row[0]: row[1] for row in conn.execute("DESCRIBE devices").fetchall()}
+                for name, column_type, *_ in staged_columns:
+                    if name not in existing:
+                        existing[name] = _column_type(column_type)
+                        conn.execute(f"ALTER TABLE devices ADD COLUMN {quote_identifier(name)} {existing[name]}")
+                        print(f"Added column for new field: {name}")
+
+                deleted_count = conn.execute("DELETE FROM devices WHERE date = CAST(? AS DATE)", [today]).fetchone()[0]
+                insert = _staged_select(conn, staged, params, staged_columns, existing)
+                conn.execute(f"INSERT INTO devices BY NAME {insert}", params)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            if deleted_count:
+                print(f"Replaced {deleted_count} existing records for {today}")
+            print(f"Successfully saved {staged_count} devices to database for {today}")
+        finally:
+            conn.close()
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+
+def save_devices_to_duckdb(db_path, devices, storage=STORAGE_SNAPSHOT):
+    """Save devices to a DuckDB history database with date tracking."""
+    save_device_pages_to_duckdb(db_path, [devices], storage=storage)
+
+
+def connect_analytics(db_path=None, parquet_dir=None, threads=None):
+    """
+    SYNOPSIS
+    Open a DuckDB connection with a 'devices' relation for analytical queries.
+
+    ARGUMENTS
+    db_path : str, optional
+        A DuckDB history database written by save_device_pages_to_duckdb(). Opened read-only.
+    parquet_dir : str, optional
+        The root of a Parquet export (History/Parquet_Export.py); exposed as a 'devices' view with
+        the date taken from the date=YYYY-MM-DD partition directories.
+    threads : int, optional
+        The number of DuckDB worker threads. Defaults to one per core.
+
+    OUTPUTS
+    duckdb.DuckDBPyConnection
+        A connection on which 'devices' can be queried.
+
+    NOTES
+    - Exactly one of db_path and parquet_dir must be given.
+    """
+    _require_duckdb()
+    if (db_path is None) == (parquet_dir is None):
+        raise ValueError("Pass exactly one of db_path and parquet_dir.")
+
+    if db_path is not None:
+        conn = duckdb.connect(db_path, read_only=True)
+    else:
+        conn = duckdb.connect()
+        pattern = os.path.join(parquet_dir, "date=*", "*.parquet").replace("'", "''")
+        conn.execute(f"CREATE VIEW devices AS SELECT * REPLACE (CAST(date AS DATE) AS date) "
+                     f"FROM read_parquet('{pattern}', hive_partitioning=true, union_by_name=true)")
+    if threads:
+        conn.execute(f"SET threads = {int(threads)}")
+    return conn
+
+
+def device_counts_over_time(conn, group_by="customerName", since=None, until=None):
+    """
+    SYNOPSIS
+    Return the number of devices per snapshot date and group.
+
+    ARGUMENTS
+    conn : duckdb.DuckDBPyConnection
+        A connection from connect_analytics().
+    group_by : str, optional
+        The column to group by. Defaults to "customerName".
+    since : str, optional
+        The first ISO date to include.
+    until : str, optional
+        The last ISO date to include.
+
+    OUTPUTS
+    list
+        (date, group value, device count) tuples, ordered by date and group.
+    """
+    where, params = _date_range(since, until)
+    return conn.execute(f'''
+        SELECT date, {quote_identifier(group_by)}, COUNT(*) AS devices
+        FROM devices {where}
+        GROUP BY ALL ORDER BY ALL
+    ''', params).fetchall()
+
+
+def os_distribution_over_time(conn, since=None, until=None, interval="month"):
+    """
+    SYNOPSIS
+    Return the operating system distribution per customer over time.
+
+    ARGUMENTS
+    conn : duckdb.DuckDBPyConnection
+        A connection from connect_analytics().
+    since : str, optional
+        The first ISO date to include.
+    until : str, optional
+        The last ISO date to include.
+    interval : str, optional
+        "day", "week" or "month" (default). Each period uses its last snapshot.
+
+    OUTPUTS
+    list
+        (period start, customerName, supportedOsLabel, device count) tuples.
+
+    USAGE_EXAMPLE
+    for period, customer, os_label, count in os_distribution_over_time(conn, since="2024-01-01"):
+        print(period, customer, os_label, count)
+    """
+    if interval not in ("day", "week", "month"):
+        raise ValueError("interval must be 'day', 'week' or 'month'")
+    where, params = _date_range(since, until)
+    return conn.execute(f'''
+        WITH ranged AS (SELECT * FROM devices {where}),
+        period_ends AS (
+            SELECT CAST(date_trunc('{interval}', date) AS DATE) AS period, MAX(date) AS date
+            FROM (SELECT DISTINCT date FROM ranged) GROUP BY 1
+        )
+        SELECT p.period, d."customerName", d."supportedOsLabel", COUNT(*) AS devices
+        FROM ranged d JOIN period_ends p USING (date)
+        GROUP BY ALL ORDER BY ALL
+    ''', params).fetchall()
+
+
+def _date_range(since, until):
+    conditions, params = [], []
+    if since is not None:
+        conditions.append("date >= CAST(? AS DATE)")
+        params.append(since)
+    if until is not None:
+        conditions.append("date <= CAST(? AS DATE)")
+        params.append(until)
+    return ("WHERE " + " AND ".join(conditions) if conditions else ""), params
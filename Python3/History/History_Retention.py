@@ -0,0 +1,325 @@
+"""
+Device History Retention
+
+This module keeps the device history database (History/Device_History_Store.py) small by
+downsampling old snapshots and reclaiming the freed space.
+
+Key Features:
+- Retention policy: every daily snapshot for the last N days, one snapshot per ISO week for the
+  last M months, and one snapshot per calendar month forever (the last snapshot of each period)
+- Optional archiving: snapshots removed from the main database are first copied to per-month
+  database files (devices_YYYY_MM.db) that can be attached for queries when needed
+- Works with both storage modes; in scd2 mode versions no longer visible at any kept date are removed
+- Compaction: an incremental vacuum after every prune, and a full VACUUM when the database has
+  not been vacuumed for a while or too much of it is free space
+
+Usage:
+    from History.History_Retention import apply_retention, compact_history_db
+
+    apply_retention("ncentral_device_history.db", daily_days=35, weekly_months=12,
+                    archive_dir="history_archive")
+    compact_history_db("ncentral_device_history.db")
+
+Notes:
+- Use dry_run=True to see which dates would be removed without changing anything.
+- Archive files use the snapshot layout (a 'devices' table with a date column) in both modes.
+"""
+
+import os
+import sqlite3
+from datetime import date, timedelta
+
+from History.Device_History_Store import (
+    add_missing_columns, connect_history_db, quoted_columns, table_columns,
+)
+
+DEFAULT_DAILY_DAYS = 35
+DEFAULT_WEEKLY_MONTHS = 12
+
+# A full VACUUM runs when the last one is older than this many days...
+FULL_VACUUM_INTERVAL_DAYS = 30
+# ...or when more than this fraction of the database file is free pages
+FULL_VACUUM_FREE_RATIO = 0.25
+
+MAINTENANCE_TABLE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS history_maintenance (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+)
+'''
+
+
+def _months_before(day, months):
+    month_index = day.year * 12 + (day.month - 1) - months
+    year, month = divmod(month_index, 12)
+    # Clamp the day for shorter months (e.g. 31 March -> 28/29 February)
+    for candidate_day in (day.day, 30, 29, 28):
+        try:
+            return date(year, month + 1, candidate_day)
+        except ValueError:
+            continue
+
+
+def retained_dates(snapshot_dates, today=None, daily_days=DEFAULT_DAILY_DAYS, weekly_months=DEFAULT_WEEKLY_MONTHS):
+    """
+    SYNOPSIS
+    Return the snapshot dates a retention policy keeps.
+
+    ARGUMENTS
+    snapshot_dates : iterable of str
+        The ISO dates (YYYY-MM-DD) of every stored snapshot.
+    today : datetime.date, optional
+        The reference date. Defaults to today.
+    daily_days : int, optional
+        Keep every snapshot from the last daily_days days.
+    weekly_months : int, optional
+        Keep the last snapshot of each ISO week from the last weekly_months months.
+
+    OUTPUTS
+    set
+        The dates to keep. The last snapshot of every calendar month and the most recent
+        snapshot are always kept.
+    """
+    today = today or date.today()
+    daily_cutoff = today - timedelta(days=daily_days)
+    weekly_cutoff = _months_before(today, weekly_months)
+
+    days = sorted(date.fromisoformat(d) for d in set(snapshot_dates))
+    last_of_week = {}
+    last_of_month = {}
+    for day in days:
+        last_of_week[day.isocalendar()[:2]] = day
+        last_of_month[(day.year, day.month)] = day
+
+    keep = set(last_of_month.values())
+    keep.update(day for day in days if day >= daily_cutoff)
+    keep.update(day for day in last_of_week.values() if day >= weekly_cutoff)
+    if days:
+        keep.add(days[-1])
+    return {day.isoformat() for day in keep}
+
+
+def _is_scd2(conn):
+    row = conn.execute("SELECT type FROM main.sqlite_master WHERE name = 'devices'").fetchone()
+    return row is not None and row[0] == "view"
+
+
+def _snapshot_dates(conn):
+    if _is_scd2(conn):
+        return [row[0] for row in conn.execute("SELECT date FROM main.snapshot_dates ORDER BY date")]
+    return [row[0] for row in conn.execute("SELECT DISTINCT date FROM main.devices ORDER BY date")]
+
+
+def month_archive_path(archive_dir, month):
+    """Return the archive file for a month ("YYYY-MM")."""
+    return os.path.join(archive_dir, f"devices_{month.replace('-', '_')}.db")
+
+
+def attach_month_archive(conn, archive_dir, month, name=None):
+    """
+    SYNOPSIS
+    Attach a month's archive database to a connection.
+
+    ARGUMENTS
+    conn : sqlite3.Connection
+        An open connection (e.g. to the history database).
+    archive_dir : str
+        The directory holding the archive files.
+    month : str
+        The month to attach, as "YYYY-MM".
+    name : str, optional
+        The schema name to attach under. Defaults to "archive_YYYY_MM".
+
+    OUTPUTS
+    str
+        The schema name; query it as <name>.devices.
+
+    NOTES
+    - SQLite attaches at most 10 databases per connection by default.
+    """
+    name = name or f"archive_{month.replace('-', '_')}"
+    conn.execute("ATTACH DATABASE ? AS " + name, (month_archive_path(archive_dir, month),))
+    return name
+
+
+def _archive_dates(conn, archive_dir, dates):
+    """Copy the snapshots of the given dates to their per-month archive databases."""
+    os.makedirs(archive_dir, exist_ok=True)
+    columns = table_columns(conn, "devices")
+    by_month = {}
+    for snapshot_date in dates:
+        by_month.setdefault(snapshot_date[:7], []).append(snapshot_date)
+
+    for month, month_dates in sorted(by_month.items()):
+        schema = attach_month_archive(conn, archive_dir, month, name="archive")
+        try:
+            with conn:
+                if not table_columns(conn, "devices", "archive"):
+                    conn.execute("CREATE TABLE archive.devices AS SELECT * FROM main.devices WHERE 0")
+                    conn.execute('CREATE INDEX archive.devices_date_device ON devices (date, "deviceId")')
+                else:
+                    add_missing_columns(conn, "devices", columns, schema)
+                column_names = quoted_columns(columns)
+                for snapshot_date in month_dates:
+                    # Re-archiving a date (e.g. after a restore) replaces the earlier copy
+                    conn.execute("DELETE FROM archive.devices WHERE date = ?", (snapshot_date,))
+                    conn.execute(f"INSERT INTO archive.devices ({column_names}) "
+                                 f"SELECT {column_names} FROM main.devices WHERE date = ?", (snapshot_date,))
+        finally:
+            conn.execute("DETACH DATABASE archive")
+
+
+def _prune_scd2(conn, dates):
+    conn.executemany("DELETE FROM main.snapshot_dates WHERE date = ?", [(d,) for d in dates])
+    if table_columns(conn, "device_volatile"):
+        conn.executemany("DELETE FROM main.device_volatile WHERE date = ?", [(d,) for d in dates])
+    # Versions not visible at any remaining snapshot date are no longer needed
+    removed = conn.execute('''
+        DELETE FROM main.device_versions
+        WHERE NOT EXISTS (
+            SELECT 1 FROM main.snapshot_dates d
+            WHERE d.date >= device_versions.valid_from
+              AND (device_versions.valid_to IS NULL OR d.date < device_versions.valid_to)
+        )
+    ''').rowcount
+    # Keep valid_from on a stored snapshot date, so it still reads as "first seen"
+    conn.execute('''
+        UPDATE main.device_versions
+        SET valid_from = (
+            SELECT MIN(d.date) FROM main.snapshot_dates d
+            WHERE d.date >= device_versions.valid_from
+              AND (device_versions.valid_to IS NULL OR d.date < device_versions.valid_to)
+        )
+        WHERE valid_from NOT IN (SELECT date FROM main.snapshot_dates)
+    ''')
+    return removed
+
+
+def apply_retention(db_path, daily_days=DEFAULT_DAILY_DAYS, weekly_months=DEFAULT_WEEKLY_MONTHS,
+                    archive_dir=None, dry_run=False, today=None):
+    """
+    SYNOPSIS
+    Remove the snapshots a retention policy does not keep.
+
+    DESCRIPTION
+    Keeps every snapshot from the last daily_days days, the last snapshot of each ISO week from the
+    last weekly_months months, and the last snapshot of every month forever. All other snapshots
+    are deleted in a single transaction, after being copied to per-month archive databases if
+    archive_dir is set. Freed pages are then returned to the file system by an incremental vacuum
+    (see compact_history_db()).
+
+    ARGUMENTS
+    db_path : str
+        The path to the history database.
+    daily_days : int, optional
+        Days of daily snapshots to keep. Defaults to 35.
+    weekly_months : int, optional
+        Months of weekly snapshots to keep. Defaults to 12.
+    archive_dir : str, optional
+        Directory for devices_YYYY_MM.db archive files. Removed snapshots are discarded if None.
+    dry_run : bool, optional
+        Only report what would be removed. Defaults to False.
+    today : datetime.date, optional
+        The reference date. Defaults to today.
+
+    OUTPUTS
+    dict
+        {"kept": [dates], "removed": [dates], "removedRows": rows or versions deleted}
+
+    USAGE_EXAMPLE
+    summary = apply_retention("ncentral_device_history.db", daily_days=35, weekly_months=12)
+    print(f"Removed {len(summary['removed'])} snapshot(s)")
+    """
+    conn = connect_history_db(db_path)
+    try:
+        dates = _snapshot_dates(conn)
+        keep = retained_dates(dates, today, daily_days, weekly_months)
+        removed = [d for d in dates if d not in keep]
+        summary = {"kept": sorted(keep), "removed": removed, "removedRows": 0}
+        if dry_run or not removed:
+            return summary
+
+        if archive_dir:
+            _archive_dates(conn, archive_dir, removed)
+
+        with conn:
+            if _is_scd2(conn):
+                summary["removedRows"] = _prune_scd2(conn, removed)
+            else:
+                cursor = conn.executemany("DELETE FROM main.devices WHERE date = ?", [(d,) for d in removed])
+                summary["removedRows"] = cursor.rowcount
+
+        print(f"Retention removed {len(removed)} snapshot(s) ({summary['removedRows']} rows); "
+              f"{len(keep)} snapshot(s) kept")
+    finally:
+        conn.close()
+
+    compact_history_db(db_path)
+    return summary
+
+
+def _maintenance_value(conn, key):
+    conn.execute(MAINTENANCE_TABLE_SCHEMA)
+    row = conn.execute("SELECT value FROM history_maintenance WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def compact_history_db(db_path, full_vacuum_days=FULL_VACUUM_INTERVAL_DAYS, free_ratio=FULL_VACUUM_FREE_RATIO,
+                       force_full=False):
+    """
+    SYNOPSIS
+    Reclaim free space in the history database.
+
+    DESCRIPTION
+    Runs an incremental vacuum, which releases free pages cheaply without rewriting the database.
+    A full VACUUM (which rewrites and defragments the file, and switches the database to
+    incremental auto-vacuum the first time) runs only when the last one is older than
+    full_vacuum_days, more than free_ratio of the file is free, or force_full is set.
+
+    ARGUMENTS
+    db_path : str
+        The path to the history database.
+    full_vacuum_days : int, optional
+        Days between full vacuums. Defaults to 30.
+    free_ratio : float, optional
+        Free-page fraction that triggers a full vacuum. Defaults to 0.25.
+    force_full : bool, optional
+        Always run a full VACUUM. Defaults to False.
+
+    OUTPUTS
+    dict
+        {"fullVacuum": bool, "sizeBefore": bytes, "sizeAfter": bytes}
+    """
+    size_before = os.path.getsize(db_path)
+    conn = connect_history_db(db_path)
+    try:
+        with conn:
+            last_full = _maintenance_value(conn, "last_full_vacuum")
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+        due = last_full is None or date.fromisoformat(last_full) <= date.today() - timedelta(days=full_vacuum_days)
+        full = force_full or due or auto_vacuum != 2 or (page_count and free_pages / page_count > free_ratio)
+        if full:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Takes effect with the VACUUM below
+            conn.execute("VACUUM")
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO history_maintenance (key, value) VALUES ('last_full_vacuum', ?)",
+                             (date.today().isoformat(),))
+        else:
+            conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA optimize")
+        # Fold the WAL back into the database so the file sizes reflect the result
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.OperationalError as e:
+        # Another connection is using the database; compaction is retried on the next run
+        print(f"Compaction skipped: {e}")
+        full = False
+    finally:
+        conn.close()
+
+    size_after = os.path.getsize(db_path)
+    if full:
+        print(f"Vacuumed history database: {size_before} -> {size_after} bytes")
+    return {"fullVacuum": bool(full), "sizeBefore": size_before, "sizeAfter": size_after}
@@ -0,0 +1,239 @@
+"""
+Device History Columnar Export
+
+This module exports daily device snapshots from the history database (History/Device_History_Store.py)
+as date-partitioned, compressed Parquet or Arrow IPC files, so analytics tools can read them with
+vectorized, column-selective scans instead of loading the SQLite tables through pandas.
+
+Key Features:
+- One file per snapshot date under a Hive-style partition directory: <output_dir>/date=YYYY-MM-DD/
+- Zstandard compression by default
+- Low-cardinality text columns (customerName, siteName, supportedOsLabel, ...) are
+  dictionary-encoded, and read back as categoricals in pandas
+- Column types follow the declared SQLite column types, so every partition shares one schema
+  (columns added later by schema evolution are simply missing, i.e. null, in older partitions)
+- Works with both storage modes, since it reads the 'devices' table or view
+
+Usage:
+    from History.Parquet_Export import export_snapshot, export_history
+
+    export_snapshot("ncentral_device_history.db", "2024-06-01", "exports/device_history")
+    export_history("ncentral_device_history.db", "exports/device_history")  # backfill missing days
+
+    # Reading a month back with only the needed columns:
+    import pyarrow.dataset as ds
+    dataset = ds.dataset("exports/device_history", format="parquet", partitioning="hive")
+    table = dataset.to_table(columns=["deviceId", "customerName"],
+                             filter=(ds.field("date") >= "2024-06-01") & (ds.field("date") < "2024-07-01"))
+
+Notes:
+- Requires the optional pyarrow package (pip install pyarrow). The rest of the history pipeline
+  does not depend on it.
+"""
+
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency; checked when an export is requested
+    pa = None
+    pq = None
+
+from History.Device_History_Store import connect_history_db, table_columns
+
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+EXPORT_FORMATS = (FORMAT_PARQUET, FORMAT_ARROW)
+
+# Text columns with few distinct values, stored dictionary-encoded
+DICTIONARY_COLUMNS = (
+    "customerName", "siteName", "soName", "supportedOsLabel", "supportedOs",
+    "deviceClass", "deviceClassLabel", "licenseMode", "osId",
+)
+
+# Rows read from SQLite and written per record batch (one Parquet row group each)
+EXPORT_BATCH_SIZE = 50000
+
+DEFAULT_COMPRESSION = "zstd"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Columnar export requires the pyarrow package (pip install pyarrow).")
+
+
+def _arrow_type(column, declared_type):
+    if column in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    declared_type = declared_type.upper()
+    if "INT" in declared_type:
+        return pa.int64()
+    if declared_type in ("REAL", "FLOAT", "DOUBLE"):
+        return pa.float64()
+    return pa.string()
+
+
+def snapshot_schema(conn):
+    """Return the Arrow schema of the exported snapshot files (every device column, without date or hash)."""
+    _require_pyarrow()
+    columns = table_columns(conn, "devices")
+    if not columns:
+        raise ValueError("The history database has no 'devices' table or view.")
+    return pa.schema([pa.field(name, _arrow_type(name, declared))
+                      for name, declared in columns.items() if name not in ("date", "content_hash")])
+
+
+def _column_array(values, field):
+    if pa.types.is_dictionary(field.type):
+        return pa.array([None if v is None else str(v) for v in values], pa.string()).dictionary_encode()
+    if pa.types.is_string(field.type):
+        # Untyped columns may hold numbers; text columns are exported as text
+        return pa.array([v if v is None or isinstance(v, str) else str(v) for v in values], pa.string())
+    try:
+        return pa.array(values, field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite columns accept any type; values that do not fit the declared type are exported as null
+        convert = int if pa.types.is_integer(field.type) else float
+        return pa.array([_coerce(convert, v) for v in values], field.type)
+
+
+def _coerce(convert, value):
+    try:
+        return None if value is None else convert(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_batches(conn, snapshot_date, schema):
+    column_names = ", ".join('"' + field.name.replace('"', '""') + '"' for field in schema)
+    cursor = conn.execute(f'SELECT {column_names} FROM devices WHERE date = ? ORDER BY "deviceId"', (snapshot_date,))
+    while True:
+        rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [_column_array(values, field) for values, field in zip(columns, schema)], schema=schema)
+
+
+def partition_path(output_dir, snapshot_date, export_format=FORMAT_PARQUET):
+    """Return the file a snapshot date is exported to."""
+    extension = "parquet" if export_format == FORMAT_PARQUET else "arrow"
+    return os.path.join(output_dir, f"date={snapshot_date}", f"devices.{extension}")
+
+
+def _write_snapshot(conn, snapshot_date, output_dir, export_format, compression):
+    schema = snapshot_schema(conn)
+    path = partition_path(output_dir, snapshot_date, export_format)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    row_count = 0
+    part_path = path + ".part"
+    try:
+        if export_format == FORMAT_PARQUET:
+            with pq.ParquetWriter(part_path, schema, compression=compression) as writer:
+                for batch in _record_batches(conn, snapshot_date, schema):
+                    writer.write_batch(batch)
+                    row_count += batch.num_rows
+        else:
+            # The IPC file format needs one dictionary per column, so batches are unified first
+            table = pa.Table.from_batches(list(_record_batches(conn, snapshot_date, schema)), schema=schema)
+            table = table.unify_dictionaries()
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            with pa.OSFile(part_path, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+                writer.write_table(table)
+            row_count = table.num_rows
+        os.replace(part_path, path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return path, row_count
+
+
+def export_snapshot(db_path, snapshot_date, output_dir, export_format=FORMAT_PARQUET,
+                    compression=DEFAULT_COMPRESSION):
+    """
+    SYNOPSIS
+    Export one day's device snapshot as a columnar file.
+
+    DESCRIPTION
+    Reads the snapshot from the history database in batches and writes it to
+    <output_dir>/date=<snapshot_date>/devices.parquet (or devices.arrow), replacing any earlier
+    export of that date. The file is written under a temporary name and renamed when complete.
+
+    ARGUMENTS
+    db_path : str
+        The path to the history database.
+    snapshot_date : str
+        The ISO date (YYYY-MM-DD) of the snapshot to export.
+    output_dir : str
+        The root directory of the partitioned dataset.
+    export_format : str, optional
+        "parquet" (default) or "arrow" (Arrow IPC file, for memory-mapped reads).
+    compression : str, optional
+        The compression codec. Defaults to "zstd".
+
+    OUTPUTS
+    dict
+        {"path": file written, "rows": number of devices exported}
+
+    NOTES
+    - Raises RuntimeError if pyarrow is not installed.
+    """
+    _require_pyarrow()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'; expected one of {EXPORT_FORMATS}")
+
+    conn = connect_history_db(db_path)
+    try:
+        path, row_count = _write_snapshot(conn, snapshot_date, output_dir, export_format, compression)
+    finally:
+        conn.close()
+
+    print(f"Exported {row_count} devices for {snapshot_date} to {path}")
+    return {"path": path, "rows": row_count}
+
+
+def export_history(db_path, output_dir, export_format=FORMAT_PARQUET, compression=DEFAULT_COMPRESSION,
+                   overwrite=False):
+    """
+    SYNOPSIS
+    Export every snapshot date that has no columnar file yet.
+
+    ARGUMENTS
+    db_path : str
+        The path to the history database.
+    output_dir : str
+        The root directory of the partitioned dataset.
+    export_format : str, optional
+        "parquet" (default) or "arrow".
+    compression : str, optional
+        The compression codec. Defaults to "zstd".
+    overwrite : bool, optional
+        Re-export dates that already have a file. Defaults to False.
+
+    OUTPUTS
+    list
+        One {"path", "rows"} dict per exported date.
+    """
+    _require_pyarrow()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'; expected one of {EXPORT_FORMATS}")
+
+    conn = connect_history_db(db_path)
+    exported = []
+    try:
+        if table_columns(conn, "snapshot_dates"):
+            dates = [row[0] for row in conn.execute("SELECT date FROM snapshot_dates ORDER BY date")]
+        else:
+            dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM devices ORDER BY date")]
+        for snapshot_date in dates:
+            if not overwrite and os.path.exists(partition_path(output_dir, snapshot_date, export_format)):
+                continue
+            path, row_count = _write_snapshot(conn, snapshot_date, output_dir, export_format, compression)
+            print(f"Exported {row_count} devices for {snapshot_date} to {path}")
+            exported.append({"path": path, "rows": row_count})
+    finally:
+        conn.close()
+    return exported
@@ -0,0 +1,267 @@
+"""
+Entity Snapshot Engine
+
+This module records daily snapshots of N-central entities other than devices (customers, sites,
+organization units, and the users and access groups of every organization unit) in the same
+kind of SQLite history database as History/Device_History_Store.py.
+
+Key Features:
+- Driven by the ENTITY_HELPERS mapping: each entity names the helper that lists it, the fields
+  that identify a row, and whether it is listed per organization unit
+- Every entity (and every organization unit, for per-org-unit entities) is fetched concurrently
+  over the shared pooled HTTP client
+- All entities are written in one transaction per run, so a failed run leaves the database unchanged
+- One table per entity with a date column, a per-row content hash and columns discovered from the
+  payload (objects and arrays go to the extra_fields JSON column)
+- Same-day reruns only rewrite rows whose content changed
+
+Usage:
+    from History.Snapshot_Engine import snapshot_entities
+
+    snapshot_entities("ncentral_history.db", base_uri, access_token)
+    snapshot_entities("ncentral_history.db", base_uri, access_token, entities=["customers", "sites"])
+
+Notes:
+- Rows of per-org-unit entities get a queriedOrgUnitId column holding the organization unit they
+  were listed under.
+- A per-org-unit listing that returns 404 (e.g. an organization unit deleted during the run) is
+  recorded as empty; any other failure aborts the run.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import requests
+
+from OrganizationUnits.Get_Customers import get_customers
+from OrganizationUnits.Get_Sites import get_sites
+from OrganizationUnits.Get_Org_Units import get_organization_units
+from Users.Get_Org_Unit_User_Roles import get_org_unit_users
+from AccessGroups.Get_Access_Groups_By_Org_Id import get_org_unit_access_groups
+from Utilities.Http_Client import run_in_context
+from History.Device_History_Store import (
+    OVERFLOW_COLUMN, SNAPSHOT_PREFIX_COLUMNS, DeviceSchema, connect_history_db, content_hash, device_rows,
+    quote_identifier,
+)
+
+# Entity name (also the table name) -> how to list it
+ENTITY_HELPERS = {
+    "customers": {"helper": get_customers, "key": ("customerId",)},
+    "sites": {"helper": get_sites, "key": ("siteId",)},
+    "org_units": {"helper": get_organization_units, "key": ("orgUnitId",)},
+    "org_unit_users": {"helper": get_org_unit_users, "key": ("queriedOrgUnitId", "userId"), "per_org_unit": True},
+    "org_unit_access_groups": {"helper": get_org_unit_access_groups, "key": ("queriedOrgUnitId", "accessGroupId"),
+                               "per_org_unit": True},
+}
+
+# The entity whose rows provide the organization unit IDs for per-org-unit entities
+ORG_UNIT_ENTITY = "org_units"
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_MAX_WORKERS = 8
+
+
+def fetch_all_items(helper, *args, base_uri, access_token, page_size=DEFAULT_PAGE_SIZE):
+    """
+    SYNOPSIS
+    Call a paginated list helper until every item has been retrieved.
+
+    ARGUMENTS
+    helper : callable
+        A list helper accepting base_uri, access_token, page_number and page_size keywords
+        (e.g. get_customers, or get_org_unit_users with the org unit ID as the first argument).
+    *args
+        Positional arguments passed before the keywords (e.g. the org unit ID).
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    page_size : int, optional
+        The number of items per page. Defaults to 500.
+
+    OUTPUTS
+    list
+        Every item across all pages.
+
+    NOTES
+    - Raises RuntimeError if the helper reports an error instead of a page.
+    """
+    items = []
+    page_number = 1
+    while True:
+        response = helper(*args, base_uri=base_uri, access_token=access_token,
+                          page_number=page_number, page_size=page_size)
+        if not isinstance(response, dict) or "error" in response:
+            error = response.get("error") if isinstance(response, dict) else "no response"
+            raise RuntimeError(f"{helper.__name__} failed on page {page_number}: {error}")
+
+        page = response.get("data") or []
+        items.extend(page)
+        total_pages = response.get("totalPages")
+        if not page or (total_pages is not None and page_number >= total_pages):
+            return items
+        if total_pages is None and len(page) < page_size:
+            return items
+        page_number += 1
+
+
+def _fetch_org_unit_items(helper, org_unit_id, base_uri, access_token, page_size):
+    try:
+        items = fetch_all_items(helper, org_unit_id, base_uri=base_uri, access_token=access_token, page_size=page_size)
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return []
+        raise
+    return [dict(item, queriedOrgUnitId=org_unit_id) for item in items]
+
+
+def fetch_entities(base_uri, access_token, entities=None, page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    SYNOPSIS
+    Fetch every item of the selected entities concurrently.
+
+    DESCRIPTION
+    Top-level entities are listed in parallel. Once the organization units are known, each
+    per-org-unit entity is listed for every organization unit, also in parallel. All requests
+    share the pooled HTTP client, and worker threads inherit the caller's workflow deadline.
+
+    ARGUMENTS
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    entities : list, optional
+        Names from ENTITY_HELPERS. Defaults to all of them.
+    page_size : int, optional
+        The number of items per page. Defaults to 500.
+    max_workers : int, optional
+        The maximum number of concurrent requests. Defaults to 8.
+
+    OUTPUTS
+    dict
+        {entity name: [items]}
+
+    NOTES
+    - Raises the first error encountered (RuntimeError or requests.exceptions.RequestException).
+    """
+    entities = list(entities or ENTITY_HELPERS)
+    unknown = [name for name in entities if name not in ENTITY_HELPERS]
+    if unknown:
+        raise ValueError(f"Unknown entities {unknown}; expected names from {list(ENTITY_HELPERS)}")
+
+    per_org_unit = [name for name in entities if ENTITY_HELPERS[name].get("per_org_unit")]
+    top_level = [name for name in entities if name not in per_org_unit]
+    if per_org_unit and ORG_UNIT_ENTITY not in top_level:
+        top_level.append(ORG_UNIT_ENTITY)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot")
+    try:
+        top_futures = {
+            name: executor.submit(run_in_context(fetch_all_items), ENTITY_HELPERS[name]["helper"],
+                                  base_uri=base_uri, access_token=access_token, page_size=page_size)
+            for name in top_level
+        }
+
+        org_unit_futures = {}
+        if per_org_unit:
+            org_unit_ids = [item["orgUnitId"] for item in top_futures[ORG_UNIT_ENTITY].result()
+                            if item.get("orgUnitId") is not None]
+            for name in per_org_unit:
+                helper = ENTITY_HELPERS[name]["helper"]
+                org_unit_futures[name] = [
+                    executor.submit(run_in_context(_fetch_org_unit_items), helper, org_unit_id,
+                                    base_uri, access_token, page_size)
+                    for org_unit_id in org_unit_ids
+                ]
+
+        results = {name: future.result() for name, future in top_futures.items() if name in entities}
+        for name, futures in org_unit_futures.items():
+            results[name] = [item for future in futures for item in future.result()]
+    except BaseException:
+        # Don't start queued requests once the run has failed
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return results
+
+
+def _write_entity(conn, name, items, snapshot_date):
+    """Write one entity's snapshot; a rerun on the same day only touches changed rows."""
+    key = ENTITY_HELPERS[name]["key"]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {name} "
+                 f"(date TEXT NOT NULL, content_hash TEXT, {quote_identifier(OVERFLOW_COLUMN)} TEXT)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_date ON {name} (date)")
+    schema = DeviceSchema(conn, name, SNAPSHOT_PREFIX_COLUMNS)
+    schema.observe(items)
+    # Identity columns must exist even if no item carried them
+    for column in key:
+        schema.add_column(column)
+
+    key_columns = ", ".join(quote_identifier(column) for column in key)
+    previous = {row[:-1]: row[-1] for row in conn.execute(
+        f"SELECT {key_columns}, content_hash FROM {name} WHERE date = ?", (snapshot_date,))}
+
+    # One row per identity; an item listed twice keeps its last copy
+    current = {tuple(item.get(column) for column in key): item for item in items}
+    hashes = {item_key: content_hash(item) for item_key, item in current.items()}
+    changed = [item for item_key, item in current.items() if previous.get(item_key) != hashes[item_key]]
+    stale = [item_key for item_key, item_hash in previous.items() if hashes.get(item_key) != item_hash]
+
+    key_match = " AND ".join(f"{quote_identifier(column)} IS ?" for column in key)
+    conn.executemany(f"DELETE FROM {name} WHERE date = ? AND {key_match}",
+                     [(snapshot_date,) + item_key for item_key in stale])
+    schema.insert(device_rows, changed, snapshot_date)
+    return {"rows": len(current), "written": len(changed),
+            "removed": sum(1 for item_key in previous if item_key not in current)}
+
+
+def snapshot_entities(db_path, base_uri, access_token, entities=None, page_size=DEFAULT_PAGE_SIZE,
+                      max_workers=DEFAULT_MAX_WORKERS):
+    """
+    SYNOPSIS
+    Fetch the selected entities and store today's snapshot of each in one transaction.
+
+    ARGUMENTS
+    db_path : str
+        The path to the history database.
+    base_uri : str
+        The base URI of the N-central server.
+    access_token : str
+        The access token for authentication.
+    entities : list, optional
+        Names from ENTITY_HELPERS. Defaults to all of them.
+    page_size : int, optional
+        The number of items per page. Defaults to 500.
+    max_workers : int, optional
+        The maximum number of concurrent requests. Defaults to 8.
+
+    OUTPUTS
+    dict
+        {entity name: {"rows": items in today's snapshot, "written": rows inserted,
+                       "removed": rows of vanished items deleted}}
+
+    NOTES
+    - Nothing is written unless every entity was fetched successfully.
+
+    USAGE_EXAMPLE
+    summary = snapshot_entities("ncentral_history.db", base_uri, access_token)
+    for name, counts in summary.items():
+        print(name, counts)
+    """
+    results = fetch_entities(base_uri, access_token, entities, page_size, max_workers)
+    today = date.today().isoformat()
+
+    conn = connect_history_db(db_path)
+    summary = {}
+    try:
+        with conn:
+            conn.execute("BEGIN")
+            for name, items in results.items():
+                summary[name] = _write_entity(conn, name, items, today)
+    finally:
+        conn.close()
+
+    for name, counts in summary.items():
+        print(f"{name}: {counts['rows']} in today's snapshot ({counts['written']} written, "
+              f"{counts['removed']} removed)")
+    return summary
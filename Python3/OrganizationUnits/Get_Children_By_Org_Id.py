@@ -32,6 +32,7 @@ def get_organization_unit_children(BaseURI, AccessToken, orgUnitId, pageNumber=N
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -66,7 +67,7 @@ def get_organization_unit_children(BaseURI, AccessToken, orgUnitId, pageNumber=N
 
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
 
         # Check for successful response
         response.raise_for_status()
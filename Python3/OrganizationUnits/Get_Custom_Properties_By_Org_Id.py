@@ -1,4 +1,4 @@
-def get_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_number=1, page_size=50, select=None, sort_by=None, sort_order="ASC"):
+def get_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_number=1, page_size=50, select=None, sort_by=None, sort_order="ASC", sink=None):
     """
     SYNOPSIS
     Retrieve custom properties for an organization unit.
@@ -15,14 +15,19 @@ def get_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_num
     select        - String. The select expression for filtering results (optional).
     sort_by       - String. The field to sort the results by (optional).
     sort_order    - String. The sort order, either "ASC" or "DESC" (default: "ASC").
+    sink          - Binary file object or callable. When provided, the raw response body is streamed
+                    into it instead of being parsed (optional).
 
     OUTPUTS
     Returns a JSON object containing the list of custom properties for the specified organization unit.
+    When a sink is provided, returns a page summary from Utilities.Streaming_Export.stream_body_to_sink
+    (bytes written and pagination fields) instead.
 
     NOTES
     - This function requires the 'requests' library to be installed.
     - Error handling is implemented for common HTTP errors.
     - The function uses extensive debug logging to track the API request and response.
+    - Use the sink argument for full exports so memory stays flat regardless of page size.
 
     USAGE_EXAMPLE
     properties = get_org_unit_custom_properties(123, "https://api.example.com", "your_access_token")
@@ -33,6 +38,8 @@ def get_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_num
     """
     import requests
     import logging
+    from Utilities import Http_Client
+    from Utilities.Streaming_Export import stream_body_to_sink
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -65,13 +72,19 @@ def get_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_num
     logger.debug(f"Headers: {headers}")
     logger.debug(f"Query parameters: {params}")
 
+    response = None
     try:
-        # Make the GET request
-        response = requests.get(url, headers=headers, params=params)
+        # Make the GET request (streamed when the body goes straight to a sink)
+        response = Http_Client.get(url, headers=headers, params=params, stream=sink is not None)
         
         # Check for successful response
         response.raise_for_status()
 
+        # Stream the raw body to the sink instead of parsing it
+        if sink is not None:
+            logger.debug(f"Response status code: {response.status_code}")
+            return stream_body_to_sink(response, sink)
+
         # Log the response
         logger.debug(f"Response status code: {response.status_code}")
         logger.debug(f"Response content: {response.text}")
@@ -87,4 +100,57 @@ def get_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_num
     except ValueError as e:
         # Log the error if JSON parsing fails
         logger.error(f"Error parsing JSON response: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+    finally:
+        # A streamed response holds its pooled connection until it is closed, including when
+        # writing to the sink fails part-way
+        if response is not None:
+            response.close()
+
+def iter_org_unit_custom_properties(org_unit_id, base_uri, access_token, page_size=1000, select=None, sort_by=None, sort_order="ASC"):
+    """
+    SYNOPSIS
+    Incrementally iterate over every custom property of an organization unit.
+
+    DESCRIPTION
+    This function pages through the GET /api/org-units/{orgUnitId}/custom-properties endpoint and
+    yields each custom property as soon as it has been decoded from the response stream, so large
+    property lists are processed with bounded memory.
+
+    ARGUMENTS
+    org_unit_id   - Integer. The ID of the organization unit.
+    base_uri      - String. The base URI of the API endpoint.
+    access_token  - String. The access token for authentication.
+    page_size     - Integer. The number of items to request per page (default: 1000).
+    select        - String. The select expression for filtering results (optional).
+    sort_by       - String. The field to sort the results by (optional).
+    sort_order    - String. The sort order, either "ASC" or "DESC" (default: "ASC").
+
+    OUTPUTS
+    Returns a generator of custom property dicts, across all pages.
+
+    NOTES
+    - Errors are raised as requests.exceptions.RequestException.
+
+    USAGE_EXAMPLE
+    for prop in iter_org_unit_custom_properties(123, "https://api.example.com", "your_access_token"):
+        print(prop)
+    """
+    from Utilities.Json_Stream import iter_paginated_items
+
+    url = f"{base_uri}/api/org-units/{org_unit_id}/custom-properties"
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json"
+    }
+
+    params = {}
+    if select:
+        params["select"] = select
+    if sort_by:
+        params["sortBy"] = sort_by
+    if sort_order:
+        params["sortOrder"] = sort_order
+
+    return iter_paginated_items(url, headers, params, page_size=page_size)
@@ -27,6 +27,7 @@ def get_customer(customerId, BaseURI, AccessToken):
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -44,7 +45,7 @@ def get_customer(customerId, BaseURI, AccessToken):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -43,6 +43,7 @@ def get_customers(base_uri, access_token, page_number=None, page_size=None, sele
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -77,7 +78,7 @@ def get_customers(base_uri, access_token, page_number=None, page_size=None, sele
 
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
 
         # Check for successful response
         response.raise_for_status()
@@ -43,6 +43,7 @@ def get_customers_by_service_org(soId, BaseURI, AccessToken, pageNumber=None, pa
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -77,7 +78,7 @@ def get_customers_by_service_org(soId, BaseURI, AccessToken, pageNumber=None, pa
 
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
 
         # Check for successful response
         response.raise_for_status()
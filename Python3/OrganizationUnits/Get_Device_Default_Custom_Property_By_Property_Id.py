@@ -33,6 +33,7 @@ def get_device_default_custom_property(BaseURI, AccessToken, orgUnitId, property
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -50,7 +51,7 @@ def get_device_default_custom_property(BaseURI, AccessToken, orgUnitId, property
     try:
         # Make the GET request
         logger.debug(f"Making GET request to: {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -31,6 +31,7 @@ def get_devices_by_org_unit(org_unit_id, base_uri, access_token, filter_id=None,
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -63,7 +64,7 @@ def get_devices_by_org_unit(org_unit_id, base_uri, access_token, filter_id=None,
     # Make the API request
     try:
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making request: {e}")
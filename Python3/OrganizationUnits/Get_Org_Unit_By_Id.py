@@ -36,6 +36,7 @@ def get_org_unit(org_unit_id, base_uri, access_token):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -53,7 +54,7 @@ def get_org_unit(org_unit_id, base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check for successful response
         response.raise_for_status()
@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def get_org_unit_custom_property(org_unit_id, property_id, base_uri, access_token):
     """
@@ -52,7 +53,7 @@ def get_org_unit_custom_property(org_unit_id, property_id, base_uri, access_toke
     
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
         
         # Check if the request was successful
         response.raise_for_status()
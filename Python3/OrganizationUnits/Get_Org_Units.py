@@ -34,6 +34,7 @@ def get_organization_units(base_uri, access_token, page_number=None, page_size=N
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -64,7 +65,7 @@ def get_organization_units(base_uri, access_token, page_number=None, page_size=N
     # Make the API request
     try:
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making request: {e}")
@@ -37,6 +37,7 @@ def get_org_unit_registration_token(BaseURI, AccessToken, orgUnitId):
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -54,7 +55,7 @@ def get_org_unit_registration_token(BaseURI, AccessToken, orgUnitId):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def get_service_organization(soId, BaseURI, AccessToken):
     """
@@ -58,7 +59,7 @@ def get_service_organization(soId, BaseURI, AccessToken):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check the response status code
         if response.status_code == 200:
@@ -34,6 +34,7 @@ def get_service_organizations(base_uri, access_token, page_number=None, page_siz
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -64,7 +65,7 @@ def get_service_organizations(base_uri, access_token, page_number=None, page_siz
     # Make the API request
     try:
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         response.raise_for_status()  # Raise an exception for 4xx and 5xx status codes
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making request: {e}")
@@ -34,6 +34,7 @@ def get_sites(base_uri, access_token, page_number=1, page_size=50, select=None,
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -68,7 +69,7 @@ def get_sites(base_uri, access_token, page_number=1, page_size=50, select=None,
 
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
 
         # Check for HTTP errors
         response.raise_for_status()
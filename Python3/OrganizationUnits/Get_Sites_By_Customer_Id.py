@@ -40,6 +40,7 @@ def get_customer_sites(customerId, BaseURI, AccessToken, pageNumber=None, pageSi
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -70,7 +71,7 @@ def get_customer_sites(customerId, BaseURI, AccessToken, pageNumber=None, pageSi
     # Make the API request
     try:
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         response.raise_for_status()  # Raise an exception for bad status codes
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making request: {e}")
@@ -41,6 +41,7 @@ def create_customer(soId, customer_data, BaseURI, AccessToken):
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -64,7 +65,7 @@ def create_customer(soId, customer_data, BaseURI, AccessToken):
     try:
         # Make the POST request
         logger.debug(f"Sending POST request to {url}")
-        response = requests.post(url, headers=headers, json=customer_data)
+        response = Http_Client.post(url, headers=headers, json=customer_data)
 
         # Check for successful response
         response.raise_for_status()
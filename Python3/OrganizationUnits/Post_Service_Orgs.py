@@ -71,6 +71,7 @@ def create_service_organization(base_uri, access_token, so_name, contact_first_n
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -119,7 +120,7 @@ def create_service_organization(base_uri, access_token, so_name, contact_first_n
 
     try:
         # Send the POST request
-        response = requests.post(url, headers=headers, json=payload)
+        response = Http_Client.post(url, headers=headers, json=payload)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -44,6 +44,7 @@ def create_customer_site(base_uri, access_token, customer_id, site_data):
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -61,7 +62,7 @@ def create_customer_site(base_uri, access_token, customer_id, site_data):
     try:
         # Send the POST request
         logger.debug(f"Sending POST request to {url}")
-        response = requests.post(url, headers=headers, json=site_data)
+        response = Http_Client.post(url, headers=headers, json=site_data)
 
         # Check if the request was successful
         response.raise_for_status()
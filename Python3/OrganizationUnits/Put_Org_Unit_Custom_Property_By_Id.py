@@ -33,6 +33,7 @@ def update_org_unit_custom_property(org_unit_id, property_id, value, base_uri, a
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -58,7 +59,7 @@ def update_org_unit_custom_property(org_unit_id, property_id, value, base_uri, a
 
     try:
         # Send the PUT request
-        response = requests.put(url, headers=headers, json=body)
+        response = Http_Client.put(url, headers=headers, json=body)
         
         # Check for successful response
         response.raise_for_status()
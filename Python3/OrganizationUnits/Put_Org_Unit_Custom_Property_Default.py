@@ -49,6 +49,7 @@ def update_org_unit_custom_property_defaults(org_unit_id, property_data, base_ur
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -70,7 +71,7 @@ def update_org_unit_custom_property_defaults(org_unit_id, property_data, base_ur
 
     try:
         # Send the PUT request
-        response = requests.put(url, json=property_data, headers=headers)
+        response = Http_Client.put(url, json=property_data, headers=headers)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def post_custom_psa_ticket_info(customPsaTicketId, username, password, BaseURI, AccessToken):
     """
@@ -59,7 +60,7 @@ def post_custom_psa_ticket_info(customPsaTicketId, username, password, BaseURI,
     try:
         # Send the POST request
         logger.debug(f"Sending POST request to {url}")
-        response = requests.post(url, headers=headers, json=body)
+        response = Http_Client.post(url, headers=headers, json=body)
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def validate_psa_credentials(base_uri, access_token, psa_type, username, password):
     """
@@ -59,7 +60,7 @@ def validate_psa_credentials(base_uri, access_token, psa_type, username, passwor
     try:
         # Make the POST request
         logger.debug(f"Sending POST request to {url}")
-        response = requests.post(url, headers=headers, json=payload)
+        response = Http_Client.post(url, headers=headers, json=payload)
 
         # Check if the request was successful
         response.raise_for_status()
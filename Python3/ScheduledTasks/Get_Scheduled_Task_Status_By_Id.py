@@ -33,6 +33,7 @@ def get_task_status(task_id, base_uri, access_token):
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -52,7 +53,7 @@ def get_task_status(task_id, base_uri, access_token):
 
     try:
         # Make the GET request
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
         
         # Check if the request was successful
         response.raise_for_status()
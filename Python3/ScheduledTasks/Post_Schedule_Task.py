@@ -56,6 +56,7 @@ def create_direct_support_task(base_uri, access_token, customer_id, device_id, i
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -87,7 +88,7 @@ def create_direct_support_task(base_uri, access_token, customer_id, device_id, i
 
     try:
         # Make the POST request
-        response = requests.post(url, headers=headers, json=payload)
+        response = Http_Client.post(url, headers=headers, json=payload)
         
         # Check if the request was successful
         response.raise_for_status()
@@ -35,6 +35,7 @@ def get_user_roles(BaseURI, AccessToken, orgUnitId, pageNumber=None, pageSize=No
     """
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -65,7 +66,7 @@ def get_user_roles(BaseURI, AccessToken, orgUnitId, pageNumber=None, pageSize=No
     # Make the API request
     try:
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
         response.raise_for_status()  # Raise an exception for 4xx and 5xx status codes
     except requests.exceptions.RequestException as e:
         logger.error(f"Error making request: {e}")
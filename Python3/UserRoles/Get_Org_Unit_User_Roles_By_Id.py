@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from Utilities import Http_Client
 
 def get_user_role(org_unit_id, user_role_id, base_uri, access_token):
     """
@@ -47,7 +48,7 @@ def get_user_role(org_unit_id, user_role_id, base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to: {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
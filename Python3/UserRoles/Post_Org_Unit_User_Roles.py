@@ -40,6 +40,7 @@ def add_user_role(org_unit_id, role_name, description, permission_ids, user_ids=
     import requests
     import json
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -72,7 +73,7 @@ def add_user_role(org_unit_id, role_name, description, permission_ids, user_ids=
     try:
         # Make the POST request
         logger.debug(f"Sending POST request to {url}")
-        response = requests.post(url, json=payload, headers=headers)
+        response = Http_Client.post(url, json=payload, headers=headers)
 
         # Check for successful response
         response.raise_for_status()
@@ -35,6 +35,7 @@ def get_org_unit_users(org_unit_id, base_uri, access_token, page_number=1, page_
 
     import requests
     import logging
+    from Utilities import Http_Client
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -69,7 +70,7 @@ def get_org_unit_users(org_unit_id, base_uri, access_token, page_number=1, page_
 
     try:
         # Make the GET request with the constructed URL, headers, and parameters
-        response = requests.get(url, headers=headers, params=params)
+        response = Http_Client.get(url, headers=headers, params=params)
 
         # Check for successful response
         response.raise_for_status()
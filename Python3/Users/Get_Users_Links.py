@@ -32,6 +32,7 @@ def get_users(base_uri, access_token):
     """
 import requests
 import logging
+from Utilities import Http_Client
 
 
 def get_users(base_uri, access_token):
@@ -52,7 +53,7 @@ def get_users(base_uri, access_token):
     try:
         # Make the GET request
         logger.debug(f"Making GET request to {url}")
-        response = requests.get(url, headers=headers)
+        response = Http_Client.get(url, headers=headers)
 
         # Check if the request was successful
         response.raise_for_status()
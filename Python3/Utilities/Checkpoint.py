@@ -0,0 +1,104 @@
+"""
+Checkpoint Utilities
+
+This module records the outcome of each unit of work in a bulk job (one device, one CSV row, ...)
+in an append-only JSON Lines file, so an interrupted job can resume where it stopped and the same
+file doubles as the job's per-item report.
+
+Key Features:
+- One JSON object per line, flushed as soon as the item completes, so at most the items in
+  flight are lost when a job is killed
+- Thread-safe: worker threads can record results directly
+- On reopen, the last record of each key is loaded, so a job can skip items already completed
+  and retry only the ones that failed
+- A truncated last line (e.g. from a crash mid-write) is ignored
+
+Usage:
+    from Utilities.Checkpoint import Checkpoint
+
+    with Checkpoint("custom_property_write.jsonl") as checkpoint:
+        for device_id in device_ids:
+            if checkpoint.completed(device_id):
+                continue
+            checkpoint.record(device_id, {"status": "updated"})
+"""
+
+import json
+import os
+import threading
+
+# Statuses treated as finished when resuming; anything else is retried
+DEFAULT_DONE_STATUSES = ("ok", "updated", "unchanged", "skipped")
+
+
+class Checkpoint:
+    """
+    SYNOPSIS
+    An append-only JSON Lines journal of per-item results keyed by item ID.
+
+    ARGUMENTS
+    path : str
+        The journal file. Created if missing; existing records are loaded.
+    done_statuses : tuple, optional
+        Values of a record's "status" field that mark the item as finished.
+
+    USAGE_EXAMPLE
+    checkpoint = Checkpoint("job.jsonl")
+    checkpoint.record(42, {"status": "failed", "error": "timeout"})
+    checkpoint.close()
+    """
+
+    def __init__(self, path, done_statuses=DEFAULT_DONE_STATUSES):
+        self.path = path
+        self.done_statuses = set(done_statuses)
+        self.records = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[entry.get("key")] = entry
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() > 0:
+            with open(path, "rb") as journal:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    # Terminate a line cut short by a crash so the next record starts cleanly
+                    self._file.write("\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @staticmethod
+    def _key(key):
+        return str(key)
+
+    def completed(self, key):
+        """Return True if the item's last record has a finished status."""
+        entry = self.records.get(self._key(key))
+        return entry is not None and entry.get("status") in self.done_statuses
+
+    def get(self, key):
+        """Return the item's last record, or None."""
+        return self.records.get(self._key(key))
+
+    def record(self, key, result):
+        """Append a result for the item and flush it to disk."""
+        entry = {"key": self._key(key), **result}
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            self.records[entry["key"]] = entry
+            self._file.write(line + "\n")
+            self._file.flush()
+        return entry
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
@@ -0,0 +1,156 @@
+"""
+Concurrency Utilities
+
+This module provides small building blocks for overlapping N-central API calls with other work.
+Worker threads run in a copy of the caller's context, so workflow deadlines set with
+Http_Client.workflow_deadline() apply to the calls they make.
+
+Key Features:
+- prefetch(): produce items from an iterable (e.g. a page fetcher) in a background thread while
+  the consumer processes earlier items, with a bounded look-ahead
+- imap_unordered(): call a function for every item of a (possibly lazy) iterable on a thread pool
+  with bounded parallelism, yielding results as they complete
+
+Usage:
+    from Utilities.Concurrency import prefetch, imap_unordered
+
+    for page in prefetch(fetch_pages(), depth=2):
+        write_page(page)  # the next page is downloaded meanwhile
+
+    for device_id, result, error in imap_unordered(fetch_device, device_ids, max_workers=16):
+        ...
+"""
+
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from Utilities.Http_Client import run_in_context
+
+# Seconds between checks for a stopped consumer while the look-ahead queue is full
+_POLL_INTERVAL = 0.1
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=2):
+    """
+    SYNOPSIS
+    Iterate over an iterable in a background thread, keeping a bounded number of items ready.
+
+    DESCRIPTION
+    The producer thread advances the iterable up to depth items ahead of the consumer, so network
+    fetches overlap with whatever the consumer does with each item (e.g. database writes). An
+    exception raised by the iterable is re-raised in the consumer. If the consumer stops early,
+    the producer stops after its current item.
+
+    ARGUMENTS
+    iterable : iterable
+        The source of items, typically a generator that fetches pages from the API.
+    depth : int, optional
+        The maximum number of items buffered ahead of the consumer. Defaults to 2.
+
+    OUTPUTS
+    generator
+        The items of iterable, in order.
+
+    USAGE_EXAMPLE
+    for devices in prefetch(fetch_device_pages(base_uri, access_token, page_size=500)):
+        save_page(devices)
+    """
+    items = queue.Queue(maxsize=max(1, depth))
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+
+    producer = threading.Thread(target=run_in_context(produce), name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join(timeout=_POLL_INTERVAL * 10)
+
+
+def imap_unordered(func, items, max_workers=8, max_pending=None):
+    """
+    SYNOPSIS
+    Call func(item) for every item on a thread pool, yielding results as they complete.
+
+    DESCRIPTION
+    At most max_workers calls run at once, and at most max_pending are submitted ahead of the
+    consumer, so items may be a lazy iterable of any length (e.g. device IDs streamed from a
+    paginated listing) without being materialized. An exception raised by func is yielded as
+    the error of that item rather than stopping the other calls. If the consumer stops early,
+    queued calls are cancelled.
+
+    ARGUMENTS
+    func : callable
+        Called with one item; typically an API helper wrapper.
+    items : iterable
+        The inputs.
+    max_workers : int, optional
+        The maximum number of concurrent calls. Defaults to 8.
+    max_pending : int, optional
+        The maximum number of submitted but unconsumed calls. Defaults to 2 * max_workers.
+
+    OUTPUTS
+    generator
+        (item, result, error) tuples in completion order; error is None on success.
+
+    USAGE_EXAMPLE
+    for device_id, info, error in imap_unordered(lambda d: get_device_by_id(d, base_uri, token), ids):
+        if error is None:
+            print(device_id, info)
+    """
+    max_pending = max(max_pending or 2 * max_workers, max_workers)
+    call = run_in_context(func)
+    iterator = iter(items)
+    pending = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="imap")
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                item = next(iterator, _DONE)
+                if item is _DONE:
+                    exhausted = True
+                else:
+                    pending[executor.submit(call, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error is not None else future.result()), error
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
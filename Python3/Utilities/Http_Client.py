@@ -0,0 +1,516 @@
+"""
+HTTP Client Utilities
+
+This module provides the shared HTTP client used by the N-central helper functions. Every helper
+sends its request through here instead of calling requests.get/post/put/patch directly, so that
+connection pooling, timeouts and workflow deadlines are applied consistently.
+
+Key Features:
+- One pooled requests.Session shared by all helpers in the process
+- Connect/read timeouts configurable per endpoint template (e.g. "/api/devices/{deviceId}")
+- An overall workflow deadline that propagates to every nested call, including calls made
+  from worker threads started with run_in_context()
+- Calls made after the deadline has passed fail immediately with DeadlineExceeded
+- Optional connection warm-up, TLS session resumption across pooled connections and a
+  DNS resolution cache, so short-lived scripts do not pay cold-start costs on every connection
+
+Usage:
+    from Utilities import Http_Client
+
+    Http_Client.set_endpoint_timeout("/api/devices", connect=5, read=300)
+
+    with Http_Client.workflow_deadline(20 * 60, name="device sync"):
+        response = Http_Client.get(url, headers=headers)
+
+    # Open 8 pooled connections before a burst of parallel get_device_by_id calls
+    Http_Client.warm_up(base_uri, connections=8)
+
+Notes:
+- The read timeout bounds each socket read, not the full response download; the deadline is
+  checked before every request and caps both timeouts to the remaining budget.
+- DeadlineExceeded subclasses requests.exceptions.Timeout, so helpers that already handle
+  request errors treat an exhausted budget the same way as a timed-out request.
+"""
+
+import contextvars
+import ipaddress
+import logging
+import re
+import socket
+import ssl
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.ssl_ import create_urllib3_context
+
+logger = logging.getLogger(__name__)
+
+# Default (connect, read) timeout in seconds for endpoints without a specific entry
+DEFAULT_TIMEOUT = (5.0, 60.0)
+
+# Per-endpoint (connect, read) timeouts in seconds, keyed by OpenAPI path template
+ENDPOINT_TIMEOUTS = {
+    "/api/auth/authenticate": (5.0, 30.0),
+    "/api/auth/refresh": (5.0, 30.0),
+    "/api/health": (3.0, 10.0),
+    "/api/devices": (5.0, 180.0),
+    "/api/org-units/{orgUnitId}/devices": (5.0, 180.0),
+    "/api/org-units/{orgUnitId}/custom-properties": (5.0, 120.0),
+    "/api/devices/{deviceId}/maintenance-windows": (5.0, 120.0),
+}
+
+# Connection pool sizing for the shared session
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Connection start-up tuning for the shared session
+# Offer the last TLS session ticket when opening new connections. Opt-in: it applies to verified
+# connections only (verify=False keeps urllib3's own context)
+TLS_SESSION_RESUMPTION = False
+DNS_CACHE_TTL = 300.0  # Seconds to reuse a resolved address (0 disables the cache)
+WARM_UP_PATH = "/api/health"  # Lightweight endpoint used by warm_up()
+
+_session = None
+_session_lock = threading.Lock()
+_template_patterns = {}
+_current_deadline = contextvars.ContextVar("ncentral_workflow_deadline", default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when a request is attempted or times out after the workflow deadline has passed."""
+
+
+class Deadline:
+    """
+    SYNOPSIS
+    A time budget shared by every call made inside a workflow.
+
+    DESCRIPTION
+    Tracks an absolute expiry time on the monotonic clock. A nested deadline never outlives its
+    parent, and cancelling a deadline also expires every deadline nested inside it.
+    """
+
+    def __init__(self, seconds, name="workflow", parent=None):
+        self.name = name
+        self.parent = parent
+        self.expires_at = time.monotonic() + seconds
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self._cancelled = threading.Event()
+
+    def remaining(self):
+        """Return the number of seconds left in the budget (0 when expired or cancelled)."""
+        if self.cancelled:
+            return 0.0
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0.0
+
+    def cancel(self):
+        """Expire the deadline now so outstanding work stops at its next call."""
+        self._cancelled.set()
+
+    def check(self):
+        """Raise DeadlineExceeded if the budget has run out."""
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline for '{self.name}' exceeded")
+
+
+def current_deadline():
+    """Return the Deadline active in the current context, or None."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def workflow_deadline(seconds, name="workflow"):
+    """
+    SYNOPSIS
+    Run a block of work under an overall time budget.
+
+    DESCRIPTION
+    Every request made through this module inside the block (directly, from nested helpers, or
+    from worker threads started with run_in_context) has its timeouts capped to the remaining
+    budget, and fails fast with DeadlineExceeded once the budget is spent. Nesting is allowed;
+    the inner budget is clipped to the outer one.
+
+    ARGUMENTS
+    seconds : float or None
+        The budget in seconds. None disables the deadline and runs the block unchanged.
+    name : str, optional
+        A label used in error messages.
+
+    OUTPUTS
+    Deadline or None
+        The active deadline, which callers can poll with .expired or stop early with .cancel().
+
+    USAGE_EXAMPLE
+    with workflow_deadline(20 * 60, name="device sync") as deadline:
+        sync_devices()
+    if deadline.expired:
+        print("Device sync ran out of time")
+    """
+    if seconds is None:
+        yield None
+        return
+
+    deadline = Deadline(seconds, name=name, parent=_current_deadline.get())
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def run_in_context(func):
+    """
+    Wrap func so it runs in a copy of the caller's context (and therefore under the caller's
+    deadline) when executed on another thread, e.g. executor.submit(run_in_context(func), ...).
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
+
+
+def _template_regex(template):
+    pattern = _template_patterns.get(template)
+    if pattern is None:
+        pattern = re.compile("^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(template)) + "/?$")
+        _template_patterns[template] = pattern
+    return pattern
+
+
+def set_endpoint_timeout(template, connect=None, read=None):
+    """
+    SYNOPSIS
+    Configure the connect/read timeout for an endpoint template.
+
+    ARGUMENTS
+    template : str
+        The OpenAPI path template, e.g. "/api/devices/{deviceId}/assets".
+    connect : float, optional
+        Connect timeout in seconds. Defaults to the current value for the template.
+    read : float, optional
+        Read timeout in seconds. Defaults to the current value for the template.
+
+    USAGE_EXAMPLE
+    set_endpoint_timeout("/api/devices", read=300)
+    """
+    current_connect, current_read = ENDPOINT_TIMEOUTS.get(template, DEFAULT_TIMEOUT)
+    ENDPOINT_TIMEOUTS[template] = (
+        current_connect if connect is None else connect,
+        current_read if read is None else read,
+    )
+
+
+def resolve_timeout(url):
+    """Return the (connect, read) timeout configured for the endpoint template matching url."""
+    path = urlsplit(url).path
+    for template, timeout in ENDPOINT_TIMEOUTS.items():
+        if _template_regex(template).match(path):
+            return timeout
+    return DEFAULT_TIMEOUT
+
+
+class _TLSSessionCache:
+    """
+    Remembers the most recent resumable TLS session per server name. TLS 1.3 servers send
+    session tickets after the handshake, so the live sockets are tracked and asked for their
+    session again when the next connection is opened.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._sockets = {}
+
+    def get(self, server_hostname):
+        with self._lock:
+            sock_ref = self._sockets.get(server_hostname)
+            sock = sock_ref() if sock_ref is not None else None
+            session = getattr(sock, "session", None) if sock is not None else None
+            if session is not None and session.has_ticket:
+                self._sessions[server_hostname] = session
+            return self._sessions.get(server_hostname)
+
+    def track(self, server_hostname, ssl_sock):
+        with self._lock:
+            self._sockets[server_hostname] = weakref.ref(ssl_sock)
+            session = ssl_sock.session
+            if session is not None and session.has_ticket:
+                self._sessions[server_hostname] = session
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """
+    SSLContext that offers the cached TLS session for the server when wrapping a new socket.
+    Sessions can only be resumed through the context that created them, so each context keeps
+    its own cache (tls_sessions).
+    """
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        server_hostname = kwargs.get("server_hostname")
+        if server_hostname is not None and kwargs.get("session") is None:
+            kwargs["session"] = self.tls_sessions.get(server_hostname)
+        ssl_sock = super().wrap_socket(sock, *args, **kwargs)
+        if server_hostname is not None:
+            if ssl_sock.session_reused:
+                logger.debug(f"Resumed TLS session with {server_hostname}")
+            self.tls_sessions.track(server_hostname, ssl_sock)
+        return ssl_sock
+
+
+def _create_ssl_context():
+    """Return a new session-resuming SSL context with urllib3's default settings."""
+    # urllib3's default options, except that TLS 1.2 session tickets are requested
+    context = create_urllib3_context(options=ssl.OP_NO_COMPRESSION)
+    context.load_default_certs()
+    context.load_verify_locations(DEFAULT_CA_BUNDLE_PATH)
+    # create_urllib3_context() always builds a plain SSLContext; the subclass only adds wrap_socket
+    context.__class__ = _ResumingSSLContext
+    context.tls_sessions = _TLSSessionCache()
+    return context
+
+
+_dns_cache = {}
+_dns_lock = threading.Lock()
+
+
+def _resolve_cached(host, port):
+    """Return a cached IP address for host, resolving it at most once per DNS_CACHE_TTL."""
+    if DNS_CACHE_TTL <= 0:
+        return host
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    now = time.monotonic()
+    with _dns_lock:
+        cached = _dns_cache.get((host, port))
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    try:
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+    except OSError:
+        # Let urllib3 resolve the name itself and report the failure in its usual way
+        return host
+    with _dns_lock:
+        _dns_cache[(host, port)] = (now + DNS_CACHE_TTL, address)
+    return address
+
+
+def _forget_address(host, port):
+    with _dns_lock:
+        _dns_cache.pop((host, port), None)
+
+
+class _CachedDNSMixin:
+    """Connect to the cached address of the host; TLS SNI and certificate checks still use the host name."""
+
+    def _new_conn(self):
+        hostname = self._dns_host
+        self._dns_host = _resolve_cached(hostname, self.port)
+        try:
+            return super()._new_conn()
+        except Exception:
+            _forget_address(hostname, self.port)
+            raise
+        finally:
+            self._dns_host = hostname
+
+
+class _CachedDNSHTTPConnection(_CachedDNSMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSMixin, HTTPSConnection):
+    pass
+
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+    def __init__(self, *args, **kwargs):
+        # One context per pool, since urllib3 sets verify_mode and CA locations on the context of
+        # every connection it opens; unverified pools (verify=False) keep urllib3's own context
+        if TLS_SESSION_RESUMPTION and kwargs.get("ssl_context") is None and kwargs.get("cert_reqs") != "CERT_NONE":
+            kwargs["ssl_context"] = _create_ssl_context()
+        super().__init__(*args, **kwargs)
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use the DNS cache and, when enabled, TLS session resumption."""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDNSHTTPConnectionPool,
+            "https": _CachedDNSHTTPSConnectionPool,
+        }
+
+
+def get_session():
+    """Return the process-wide pooled requests.Session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _PooledAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def warm_up(base_uri, connections=4, path=WARM_UP_PATH):
+    """
+    SYNOPSIS
+    Pre-open pooled connections to the N-central server.
+
+    DESCRIPTION
+    Resolves the server name and performs one full TLS handshake, then opens the remaining
+    connections in parallel so they can resume that TLS session (when TLS_SESSION_RESUMPTION is
+    enabled). The connections stay in the
+    shared pool, so the first wave of concurrent helper calls reuses them instead of each paying
+    DNS, TCP and TLS start-up costs.
+
+    ARGUMENTS
+    base_uri : str
+        The base URI of the N-central server.
+    connections : int, optional
+        The number of connections to open (capped at POOL_MAXSIZE). Defaults to 4.
+    path : str, optional
+        The endpoint requested on each connection. Defaults to the unauthenticated /api/health.
+
+    OUTPUTS
+    int
+        The number of warm-up requests that completed.
+
+    NOTES
+    - Any HTTP status counts as a warm connection; only connection errors are reported.
+
+    USAGE_EXAMPLE
+    Http_Client.warm_up("https://api.example.com", connections=8)
+    """
+    connections = max(1, min(connections, POOL_MAXSIZE))
+    url = f"{base_uri}{path}"
+    barrier = threading.Barrier(connections)
+
+    def touch(wait_for_peers):
+        if wait_for_peers:
+            # Start together so every request checks out its own connection from the pool
+            try:
+                barrier.wait(timeout=DEFAULT_TIMEOUT[0])
+            except threading.BrokenBarrierError:
+                pass
+        try:
+            get(url).close()
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Warm-up request to {url} failed: {e}")
+            return False
+
+    # The first request pays the full handshake and leaves a session ticket behind; the parallel
+    # wave then checks out every pooled connection at once, including the one just opened
+    first_ok = touch(False)
+    if connections == 1 or not first_ok:
+        return int(first_ok)
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        warmed = sum(executor.map(run_in_context(touch), [True] * connections))
+    logger.debug(f"Warmed {warmed} connection(s) to {base_uri}")
+    return warmed
+
+
+def request(method, url, timeout=None, **kwargs):
+    """
+    SYNOPSIS
+    Send an HTTP request through the shared session.
+
+    DESCRIPTION
+    Accepts the same keyword arguments as requests.request. When timeout is not given, the
+    timeout configured for the endpoint template is used. Both timeouts are capped to the
+    remaining workflow deadline, if any.
+
+    ARGUMENTS
+    method : str
+        The HTTP method.
+    url : str
+        The full request URL.
+    timeout : float or tuple, optional
+        Explicit timeout overriding the endpoint configuration.
+
+    OUTPUTS
+    requests.Response
+        The response object.
+
+    NOTES
+    - Raises DeadlineExceeded when the workflow deadline has already passed, or when the
+      request times out because the remaining budget ran out.
+    """
+    if timeout is None:
+        timeout = resolve_timeout(url)
+    connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check()
+        remaining = deadline.remaining()
+        connect_timeout = remaining if connect_timeout is None else min(connect_timeout, remaining)
+        read_timeout = remaining if read_timeout is None else min(read_timeout, remaining)
+
+    try:
+        return get_session().request(method, url, timeout=(connect_timeout, read_timeout), **kwargs)
+    except requests.exceptions.Timeout as e:
+        if deadline is not None and deadline.expired:
+            raise DeadlineExceeded(f"Deadline for '{deadline.name}' exceeded during {method} {url}") from e
+        raise
+
+
+def get(url, **kwargs):
+    """Send a GET request through the shared session."""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """Send a POST request through the shared session."""
+    return request("POST", url, **kwargs)
+
+
+def put(url, **kwargs):
+    """Send a PUT request through the shared session."""
+    return request("PUT", url, **kwargs)
+
+
+def patch(url, **kwargs):
+    """Send a PATCH request through the shared session."""
+    return request("PATCH", url, **kwargs)
+
+
+def delete(url, **kwargs):
+    """Send a DELETE request through the shared session."""
+    return request("DELETE", url, **kwargs)
@@ -0,0 +1,245 @@
+"""
+Incremental JSON Parsing Utilities
+
+This module parses N-central list responses incrementally, yielding each element of the "data"
+array as soon as it has been decoded from the socket stream instead of building the whole page
+as one large dict tree first.
+
+Key Features:
+- Pull-based parser over any iterable of byte chunks (e.g. response.iter_content())
+- Yields array elements one at a time; only the undecoded tail of the stream is buffered
+- Collects the other top-level fields (pageNumber, totalPages, _links, ...) into a metadata dict
+- Iterates every item of a paginated endpoint page after page, so processing overlaps the network
+
+Usage:
+    from Utilities.Json_Stream import iter_paginated_items
+
+    for device in iter_paginated_items(url, headers, params={"sortBy": "deviceId"}, page_size=1000):
+        process(device)
+
+Notes:
+- Elements are decoded with the C-accelerated json.JSONDecoder.raw_decode, so no third-party
+  streaming parser is required.
+- Peak memory is bounded by the largest single element plus one read chunk, not by the page size.
+"""
+
+import codecs
+import json
+import logging
+import re
+
+from Utilities import Http_Client
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the socket per parser refill
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _StreamBuffer:
+    """A text buffer over a byte-chunk iterator that discards everything already consumed."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """Append the next chunk to the buffer. Returns False once the stream is exhausted."""
+        while not self.exhausted:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.exhausted = True
+                text = self._utf8.decode(b"", final=True)
+            else:
+                text = self._utf8.decode(chunk)
+            if text or self.exhausted:
+                self.text = self.text[self.pos:] + text
+                self.pos = 0
+                return bool(text)
+        return False
+
+    def peek(self):
+        """Skip whitespace and return the next character without consuming it (None at the end)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, characters):
+        character = self.peek()
+        if character is None or character not in characters:
+            raise ValueError(f"Expected one of {characters!r} in JSON stream, found {character!r}")
+        self.pos += 1
+        return character
+
+    def decode_value(self):
+        """Decode the next complete JSON value, reading more chunks until it is fully buffered."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.exhausted:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            self.fill()
+
+
+def iter_array_items(chunks, array_key="data", metadata=None):
+    """
+    SYNOPSIS
+    Incrementally yield the elements of a JSON array from a stream of byte chunks.
+
+    DESCRIPTION
+    Parses a body of the form {"data": [...], "pageNumber": 1, ...} (or a bare top-level array)
+    and yields each element of the array_key array as soon as it is complete. All other top-level
+    fields are decoded normally and stored in the metadata dict, if one is supplied.
+
+    ARGUMENTS
+    chunks : iterable of bytes
+        The body, e.g. response.iter_content(chunk_size=65536).
+    array_key : str, optional
+        The top-level key holding the array to stream. Defaults to "data".
+    metadata : dict, optional
+        Receives the other top-level fields. Fields that follow the array are only available
+        once the generator has been exhausted.
+
+    OUTPUTS
+    generator
+        The decoded array elements, in order.
+
+    NOTES
+    - Raises ValueError (json.JSONDecodeError) if the body is not valid JSON.
+
+    USAGE_EXAMPLE
+    metadata = {}
+    for device in iter_array_items(response.iter_content(65536), metadata=metadata):
+        print(device["deviceId"])
+    print(metadata.get("totalPages"))
+    """
+    buffer = _StreamBuffer(chunks)
+
+    if buffer.peek() == "[":
+        yield from _iter_array(buffer)
+        return
+
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        buffer.pos += 1
+        return
+
+    while True:
+        key = buffer.decode_value()
+        buffer.expect(":")
+        if key == array_key and buffer.peek() == "[":
+            yield from _iter_array(buffer)
+        else:
+            value = buffer.decode_value()
+            if metadata is not None:
+                metadata[key] = value
+        if buffer.expect(",}") == "}":
+            return
+
+
+def _iter_array(buffer):
+    buffer.expect("[")
+    if buffer.peek() == "]":
+        buffer.pos += 1
+        return
+    while True:
+        yield buffer.decode_value()
+        if buffer.expect(",]") == "]":
+            return
+
+
+def iter_response_items(response, array_key="data", metadata=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    SYNOPSIS
+    Incrementally yield the elements of the array in a streamed response body.
+
+    ARGUMENTS
+    response : requests.Response
+        A response obtained with stream=True. It is closed when iteration finishes or stops.
+    array_key : str, optional
+        The top-level key holding the array. Defaults to "data".
+    metadata : dict, optional
+        Receives the other top-level fields of the body.
+    chunk_size : int, optional
+        The number of bytes read from the socket at a time. Defaults to 64 KiB.
+
+    OUTPUTS
+    generator
+        The decoded array elements, in order.
+    """
+    try:
+        yield from iter_array_items(response.iter_content(chunk_size=chunk_size), array_key, metadata)
+    finally:
+        response.close()
+
+
+def iter_paginated_items(url, headers, params=None, page_size=1000, start_page=1, array_key="data"):
+    """
+    SYNOPSIS
+    Incrementally yield every item of a paginated N-central list endpoint.
+
+    DESCRIPTION
+    Requests successive pages with stream=True through the shared HTTP client and yields each
+    element of the page's "data" array as soon as it has been decoded. Paging stops at the last page
+    reported by the server (totalPages), or at the first page with fewer than page_size items.
+
+    ARGUMENTS
+    url : str
+        The full endpoint URL, e.g. f"{base_uri}/api/devices".
+    headers : dict
+        The request headers, including Authorization.
+    params : dict, optional
+        Additional query parameters (filterId, select, sortBy, sortOrder, ...).
+    page_size : int, optional
+        The number of items per page. Defaults to 1000.
+    start_page : int, optional
+        The first page to request. Defaults to 1.
+    array_key : str, optional
+        The top-level key holding the items. Defaults to "data".
+
+    OUTPUTS
+    generator
+        Every item across all pages, in server order.
+
+    NOTES
+    - HTTP and connection errors are raised as requests.exceptions.RequestException; items already
+      yielded remain valid.
+    """
+    page_number = start_page
+    while True:
+        page_params = dict(params or {}, pageNumber=page_number, pageSize=page_size)
+        logger.debug(f"Streaming GET {url} page {page_number}")
+        response = Http_Client.get(url, headers=headers, params=page_params, stream=True)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+
+        metadata = {}
+        count = 0
+        for item in iter_response_items(response, array_key, metadata):
+            count += 1
+            yield item
+
+        total_pages = metadata.get("totalPages")
+        if count == 0 or (total_pages is not None and page_number >= total_pages):
+            return
+        if total_pages is None and count < page_size:
+            return
+        page_number += 1
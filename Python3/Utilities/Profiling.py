@@ -0,0 +1,254 @@
+"""
+Profiling Utilities
+
+This module provides opt-in profiling hooks for helper-driven workflows such as
+examples/All_Devices_History.py, so slow runs can be diagnosed without editing the scripts.
+
+Key Features:
+- Wraps a workflow with cProfile and tracemalloc snapshots
+- Attributes wall time and CPU time to each N-central endpoint template (e.g. GET /api/devices/{id})
+- Writes a human-readable top-N report alongside the raw .prof and tracemalloc snapshot files
+
+Usage:
+- Set the NCENTRAL_PROFILE environment variable to 1 (or pass enabled=True) to turn profiling on
+- Optionally set NCENTRAL_PROFILE_DIR (output directory, default ./profiles) and
+  NCENTRAL_PROFILE_TOP (number of report entries, default 25)
+- Wrap the workflow:
+
+    from Utilities.Profiling import profile_workflow
+
+    with profile_workflow("All_Devices_History"):
+        run_the_workflow()
+
+- The .prof file can be inspected with `python -m pstats` or snakeviz, and the
+  .tracemalloc file with tracemalloc.Snapshot.load()
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV_VAR = "NCENTRAL_PROFILE"
+PROFILE_DIR_ENV_VAR = "NCENTRAL_PROFILE_DIR"
+PROFILE_TOP_ENV_VAR = "NCENTRAL_PROFILE_TOP"
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_TOP_N = 25
+
+# Path segments that identify a single resource and are collapsed to "{id}" in endpoint templates
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$")
+
+
+def profiling_enabled():
+    """Return True when the NCENTRAL_PROFILE environment variable requests profiling."""
+    value = os.environ.get(PROFILE_ENV_VAR, "")
+    return value.strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def endpoint_template(url):
+    """
+    SYNOPSIS
+    Reduce a request URL to its endpoint template.
+
+    DESCRIPTION
+    Strips the scheme, host and query string and replaces numeric or UUID path segments with
+    "{id}", so that /api/devices/123/assets and /api/devices/456/assets are attributed together.
+
+    ARGUMENTS
+    url : str
+        The full request URL.
+
+    OUTPUTS
+    str
+        The endpoint template, e.g. "/api/devices/{id}/assets".
+    """
+    path = urlsplit(url).path or "/"
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return "/".join(segments)
+
+
+class EndpointTimings:
+    """Thread-safe accumulator of per-endpoint call counts, wall time and CPU time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, method, template, wall_seconds, cpu_seconds, failed):
+        key = (method.upper(), template)
+        with self._lock:
+            calls, wall, cpu, errors = self._stats.get(key, (0, 0.0, 0.0, 0))
+            self._stats[key] = (calls + 1, wall + wall_seconds, cpu + cpu_seconds, errors + int(failed))
+
+    def rows(self):
+        """Return (method, template, calls, wall, cpu, errors) tuples sorted by total wall time."""
+        with self._lock:
+            items = list(self._stats.items())
+        rows = [(method, template) + stats for (method, template), stats in items]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+@contextmanager
+def _instrument_requests(timings):
+    """Temporarily wrap requests.Session.request so every HTTP call is attributed to its endpoint."""
+    import requests
+
+    original_request = requests.Session.request
+
+    def timed_request(session, method, url, *args, **kwargs):
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        failed = True
+        try:
+            response = original_request(session, method, url, *args, **kwargs)
+            failed = response.status_code >= 400
+            return response
+        finally:
+            timings.record(
+                method,
+                endpoint_template(url),
+                time.perf_counter() - wall_start,
+                time.thread_time() - cpu_start,
+                failed,
+            )
+
+    requests.Session.request = timed_request
+    try:
+        yield
+    finally:
+        requests.Session.request = original_request
+
+
+def _format_endpoint_table(rows, top_n):
+    lines = [
+        f"{'method':<7} {'endpoint':<60} {'calls':>7} {'wall s':>10} {'cpu s':>10} {'wait s':>10} {'errors':>7}"
+    ]
+    for method, template, calls, wall, cpu, errors in rows[:top_n]:
+        lines.append(
+            f"{method:<7} {template:<60} {calls:>7} {wall:>10.3f} {cpu:>10.3f} {max(wall - cpu, 0.0):>10.3f} {errors:>7}"
+        )
+    if not rows:
+        lines.append("(no HTTP requests were made)")
+    return "\n".join(lines)
+
+
+def _format_pstats(profiler, sort_key, top_n):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort_key).print_stats(top_n)
+    return stream.getvalue().strip()
+
+
+def _write_report(report_path, name, wall, cpu, profiler, timings, start_snapshot, end_snapshot, top_n):
+    sections = [
+        f"Profile report for workflow '{name}'",
+        f"Generated: {datetime.now().isoformat(timespec='seconds')}",
+        f"Total wall time: {wall:.3f}s  Total CPU time: {cpu:.3f}s",
+        "",
+        f"== Endpoints by wall time (top {top_n}) ==",
+        "wait = wall - cpu, i.e. time spent blocked on the network or server",
+        _format_endpoint_table(timings.rows(), top_n),
+        "",
+        f"== Functions by cumulative time (top {top_n}) ==",
+        _format_pstats(profiler, pstats.SortKey.CUMULATIVE, top_n),
+        "",
+        f"== Functions by internal time (top {top_n}) ==",
+        _format_pstats(profiler, pstats.SortKey.TIME, top_n),
+        "",
+        f"== Memory allocated during the workflow (top {top_n} lines) ==",
+    ]
+    for stat in end_snapshot.compare_to(start_snapshot, "lineno")[:top_n]:
+        sections.append(str(stat))
+    current, peak = tracemalloc.get_traced_memory()
+    sections.append(f"Traced memory at end: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB")
+
+    with open(report_path, "w", encoding="utf-8") as report_file:
+        report_file.write("\n".join(sections) + "\n")
+
+
+@contextmanager
+def profile_workflow(name, enabled=None, output_dir=None, top_n=None):
+    """
+    SYNOPSIS
+    Profile a helper-driven workflow with cProfile and tracemalloc.
+
+    DESCRIPTION
+    Context manager (also usable as a decorator) that profiles the enclosed block when enabled.
+    On exit it writes three files to the output directory, prefixed with the workflow name and a
+    timestamp:
+    - <prefix>.prof: raw cProfile statistics
+    - <prefix>.tracemalloc: raw tracemalloc snapshot taken at the end of the workflow
+    - <prefix>_report.txt: top-N functions, top-N allocation sites and per-endpoint wall vs CPU time
+    When profiling is disabled the block runs unchanged and nothing is written.
+
+    ARGUMENTS
+    name : str
+        The workflow name used in the report and file names.
+    enabled : bool, optional
+        Force profiling on or off. Defaults to the NCENTRAL_PROFILE environment variable.
+    output_dir : str, optional
+        Directory for the output files. Defaults to NCENTRAL_PROFILE_DIR or ./profiles.
+    top_n : int, optional
+        Number of entries per report section. Defaults to NCENTRAL_PROFILE_TOP or 25.
+
+    OUTPUTS
+    EndpointTimings or None
+        The per-endpoint timing accumulator while profiling, otherwise None.
+
+    NOTES
+    - cProfile only observes the thread that entered the block; endpoint timings cover all threads.
+    - Per-endpoint CPU time is measured with time.thread_time() in the thread making the call.
+
+    USAGE_EXAMPLE
+    with profile_workflow("All_Devices_History", enabled=True, top_n=40):
+        main()
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+    if not enabled:
+        yield None
+        return
+
+    output_dir = output_dir or os.environ.get(PROFILE_DIR_ENV_VAR) or DEFAULT_PROFILE_DIR
+    top_n = int(top_n or os.environ.get(PROFILE_TOP_ENV_VAR) or DEFAULT_TOP_N)
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = os.path.join(output_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(10)
+    start_snapshot = tracemalloc.take_snapshot()
+
+    timings = EndpointTimings()
+    profiler = cProfile.Profile()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        with _instrument_requests(timings):
+            profiler.enable()
+            try:
+                yield timings
+            finally:
+                profiler.disable()
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        end_snapshot = tracemalloc.take_snapshot()
+
+        profiler.dump_stats(f"{prefix}.prof")
+        end_snapshot.dump(f"{prefix}.tracemalloc")
+        _write_report(f"{prefix}_report.txt", name, wall, cpu, profiler, timings, start_snapshot, end_snapshot, top_n)
+        if started_tracing:
+            tracemalloc.stop()
+        logger.info(f"Profile for '{name}' written to {prefix}_report.txt")
@@ -0,0 +1,220 @@
+"""
+Quartz Cron Utilities
+
+This module parses the Quartz-style cron expressions N-central uses for maintenance windows
+(e.g. "0 0 2 ? * SUN *") and expands them into start times over a date range.
+
+Key Features:
+- All seven Quartz fields: seconds, minutes, hours, day-of-month, month, day-of-week and the
+  optional year
+- Lists, ranges, steps (5/15, */2, 1-5/2) and month/day names (JAN, MON, ...)
+- Day-of-month specials: ? (no specific value), L (last day), L-n (n days before the last day),
+  nW (nearest weekday to day n), LW (last weekday)
+- Day-of-week specials: L (Saturday), nL (last given weekday of the month) and n#k (k-th given
+  weekday)
+- Expansion walks days, not seconds, so a year of occurrences is computed in milliseconds
+
+Usage:
+    from datetime import datetime, timedelta
+    from Utilities.Quartz_Cron import parse_cron
+
+    schedule = parse_cron("0 0 2 ? * SUN *")
+    for start in schedule.occurrences(datetime(2024, 1, 1), datetime(2024, 2, 1)):
+        print(start)
+
+Notes:
+- Quartz numbers days of the week 1 (Sunday) to 7 (Saturday).
+- Times are naive and interpreted in the server's time zone, as N-central schedules them.
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+MONTH_NAMES = {name: number for number, name in enumerate(
+    ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"), start=1)}
+DAY_NAMES = {name: number for number, name in enumerate(("SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"), start=1)}
+
+
+def _value(text, names, expression):
+    text = text.upper()
+    if text in names:
+        return names[text]
+    try:
+        return int(text)
+    except ValueError:
+        raise ValueError(f"Invalid value '{text}' in cron expression '{expression}'") from None
+
+
+def _value_in_range(text, low, high, expression, names=None):
+    value = _value(text, names or {}, expression)
+    if not low <= value <= high:
+        raise ValueError(f"Value out of range {low}-{high} in cron expression '{expression}'")
+    return value
+
+
+def _parse_field(text, low, high, expression, names=None):
+    """Expand a list of values, ranges and steps into a sorted tuple of integers."""
+    names = names or {}
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = _value(step_text, {}, expression)
+            if step <= 0:
+                raise ValueError(f"Invalid step in cron expression '{expression}'")
+            if part in ("", "*"):
+                part = f"{low}-{high}"
+            elif "-" not in part:
+                part = f"{part}-{high}"
+        if part in ("*", "?"):
+            first, last = low, high
+        elif "-" in part:
+            first_text, last_text = part.split("-", 1)
+            first, last = _value(first_text, names, expression), _value(last_text, names, expression)
+        else:
+            first = last = _value(part, names, expression)
+        if not (low <= first <= high and low <= last <= high):
+            raise ValueError(f"Value out of range {low}-{high} in cron expression '{expression}'")
+        if first <= last:
+            values.update(range(first, last + 1, step))
+        else:
+            # Wrapping range, e.g. FRI-MON or 22-2
+            span = list(range(first, high + 1)) + list(range(low, last + 1))
+            values.update(span[::step])
+    return tuple(sorted(values))
+
+
+def quartz_weekday(day):
+    """Return the Quartz day-of-week number (1 = Sunday ... 7 = Saturday) of a date."""
+    return (day.weekday() + 1) % 7 + 1
+
+
+class QuartzCron:
+    """
+    SYNOPSIS
+    A parsed Quartz cron expression.
+
+    ARGUMENTS
+    expression : str
+        The cron expression, with 6 or 7 whitespace-separated fields.
+
+    NOTES
+    - Raises ValueError if the expression cannot be parsed.
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) not in (6, 7):
+            raise ValueError(f"Cron expression '{expression}' must have 6 or 7 fields")
+        seconds, minutes, hours, day_of_month, month, day_of_week = fields[:6]
+        year = fields[6] if len(fields) == 7 else "*"
+
+        self.seconds = _parse_field(seconds, 0, 59, expression)
+        self.minutes = _parse_field(minutes, 0, 59, expression)
+        self.hours = _parse_field(hours, 0, 23, expression)
+        self.months = frozenset(_parse_field(month, 1, 12, expression, MONTH_NAMES))
+        self.years = None if year == "*" else frozenset(_parse_field(year, 1970, 2199, expression))
+        self._day_of_month = self._parse_day_of_month(day_of_month.upper())
+        self._day_of_week = self._parse_day_of_week(day_of_week.upper())
+        self.times = tuple((hour, minute, second) for hour in self.hours
+                           for minute in self.minutes for second in self.seconds)
+
+    def _parse_day_of_month(self, text):
+        if text in ("?", "*"):
+            return None
+        if text == "L":
+            return ("last", 0)
+        if text == "LW":
+            return ("last_weekday", None)
+        if text.startswith("L-"):
+            return ("last", _value_in_range(text[2:], 0, 30, self.expression))
+        if text.endswith("W"):
+            return ("nearest_weekday", _value_in_range(text[:-1], 1, 31, self.expression))
+        return ("days", frozenset(_parse_field(text, 1, 31, self.expression)))
+
+    def _parse_day_of_week(self, text):
+        if text in ("?", "*"):
+            return None
+        if text == "L":
+            # A bare L is the last day of the week, Saturday
+            return ("days", frozenset((7,)), None)
+        if "#" in text:
+            day, nth = text.split("#", 1)
+            return ("nth", _value_in_range(day, 1, 7, self.expression, DAY_NAMES),
+                    _value_in_range(nth, 1, 5, self.expression))
+        if text.endswith("L"):
+            return ("last", _value_in_range(text[:-1], 1, 7, self.expression, DAY_NAMES), None)
+        return ("days", frozenset(_parse_field(text, 1, 7, self.expression, DAY_NAMES)), None)
+
+    def _matches_day_of_month(self, day):
+        spec = self._day_of_month
+        if spec is None:
+            return True
+        kind, value = spec
+        last_day = calendar.monthrange(day.year, day.month)[1]
+        if kind == "days":
+            return day.day in value
+        if kind == "last":
+            return day.day == last_day - value
+        if kind == "last_weekday":
+            target = date(day.year, day.month, last_day)
+            while target.weekday() >= 5:
+                target -= timedelta(days=1)
+            return day == target
+        # Nearest weekday to the given day, without leaving the month
+        target = date(day.year, day.month, min(value, last_day))
+        if target.weekday() == 5:
+            target = target - timedelta(days=1) if target.day > 1 else target + timedelta(days=2)
+        elif target.weekday() == 6:
+            target = target + timedelta(days=1) if target.day < last_day else target - timedelta(days=2)
+        return day == target
+
+    def _matches_day_of_week(self, day):
+        spec = self._day_of_week
+        if spec is None:
+            return True
+        kind, value, nth = spec
+        weekday = quartz_weekday(day)
+        if kind == "days":
+            return weekday in value
+        if weekday != value:
+            return False
+        if kind == "nth":
+            return (day.day - 1) // 7 + 1 == nth
+        return day.day + 7 > calendar.monthrange(day.year, day.month)[1]
+
+    def matches_day(self, day):
+        """Return True if the schedule fires on this date."""
+        return ((self.years is None or day.year in self.years) and day.month in self.months
+                and self._matches_day_of_month(day) and self._matches_day_of_week(day))
+
+    def occurrences(self, start, end):
+        """
+        SYNOPSIS
+        Yield every start time in [start, end), in order.
+
+        ARGUMENTS
+        start : datetime
+            The beginning of the range (inclusive).
+        end : datetime
+            The end of the range (exclusive).
+
+        OUTPUTS
+        generator
+            datetime objects.
+        """
+        day = start.date()
+        while day <= end.date():
+            if self.matches_day(day):
+                for hour, minute, second in self.times:
+                    moment = datetime(day.year, day.month, day.day, hour, minute, second)
+                    if start <= moment < end:
+                        yield moment
+            day += timedelta(days=1)
+
+
+def parse_cron(expression):
+    """Parse a Quartz cron expression. Raises ValueError if it is invalid."""
+    return QuartzCron(expression.strip())
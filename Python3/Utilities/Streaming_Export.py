@@ -0,0 +1,214 @@
+"""
+Streaming Export Utilities
+
+This module streams paginated N-central responses straight to disk (or any other sink) without
+buffering whole page bodies in memory, so full exports keep a flat memory profile regardless of
+the page size or the size of the fleet.
+
+Key Features:
+- Copies a response body to a sink chunk by chunk, keeping only small head/tail windows
+- Picks the pagination fields (pageNumber, pageSize, itemCount, totalItems, totalPages) out of
+  those windows so paging can stop without parsing the body; a body that fits in the head window
+  is parsed, so an empty page is recognized from its top-level "data" array
+- Writes each page to its own file, via a temporary file that is renamed once complete
+
+Usage:
+    from functools import partial
+    from Devices.Get_Devices import get_devices
+    from Utilities.Streaming_Export import export_pages
+
+    fetch_page = partial(get_devices, base_uri, access_token, sort_by="deviceId")
+    export_pages(fetch_page, "exports/devices", "devices", page_size=1000)
+
+Notes:
+- The helper passed to export_pages must accept page_number, page_size and sink keyword
+  arguments and return the summary produced by stream_body_to_sink (get_devices and
+  get_org_unit_custom_properties do).
+- When the server omits the pagination fields, paging continues until a page with an empty
+  top-level "data" array (or an itemCount of 0) is returned.
+"""
+
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the socket per write to the sink
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Size of the head and tail windows scanned for pagination metadata
+METADATA_WINDOW = 4096
+
+METADATA_FIELDS = ("pageNumber", "pageSize", "itemCount", "totalItems", "totalPages")
+
+_METADATA_PATTERN = re.compile(rb'"(pageNumber|pageSize|itemCount|totalItems|totalPages)"\s*:\s*(\d+)')
+
+
+def _small_page_summary(body):
+    """Return the pagination fields and emptiness of a complete page body, or None if it is not a JSON object."""
+    try:
+        page = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(page, dict):
+        return None
+    summary = {field: page[field] for field in METADATA_FIELDS
+               if isinstance(page.get(field), int) and not isinstance(page.get(field), bool)}
+    data = page.get("data")
+    summary["empty"] = isinstance(data, list) and not data
+    return summary
+
+
+def _sink_writer(sink):
+    if hasattr(sink, "write"):
+        return sink.write
+    if callable(sink):
+        return sink
+    raise TypeError("sink must be a writable binary file object or a callable accepting bytes")
+
+
+def stream_body_to_sink(response, sink, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    SYNOPSIS
+    Copy a streamed response body to a sink with bounded memory.
+
+    DESCRIPTION
+    Reads the body of a response requested with stream=True in chunks and writes each chunk to the
+    sink as it arrives. Only the first and last METADATA_WINDOW bytes are retained, and they are
+    scanned for the page's pagination fields once the body has been written. A body no larger
+    than METADATA_WINDOW is held whole in the head window and parsed instead, which is how an
+    empty page (a top-level "data" array with no items) is recognized; only such small bodies
+    can be empty.
+
+    ARGUMENTS
+    response : requests.Response
+        A response obtained with stream=True. It is closed when the body has been copied.
+    sink : file object or callable
+        A binary file object opened for writing, or a callable that accepts each chunk of bytes.
+    chunk_size : int, optional
+        The number of bytes to read per chunk. Defaults to 64 KiB.
+
+    OUTPUTS
+    dict
+        A page summary with "bytesWritten", "empty" (True when the top-level "data" array is
+        empty or itemCount is 0) and any
+        of "pageNumber", "pageSize", "itemCount", "totalItems" and "totalPages" found in the body.
+
+    USAGE_EXAMPLE
+    with open("devices_page_1.json", "wb") as sink:
+        summary = stream_body_to_sink(response, sink)
+    """
+    write = _sink_writer(sink)
+    head = bytearray()
+    tail = b""
+    written = 0
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            write(chunk)
+            written += len(chunk)
+            if len(head) < METADATA_WINDOW:
+                head += chunk[:METADATA_WINDOW - len(head)]
+            tail = (tail + chunk)[-METADATA_WINDOW:]
+    finally:
+        response.close()
+
+    head = bytes(head)
+    summary = {"bytesWritten": written}
+    page = _small_page_summary(head) if written <= METADATA_WINDOW else None
+    if page is not None:
+        summary.update(page)
+        summary["empty"] = summary["empty"] or summary.get("itemCount") == 0
+        return summary
+
+    for window in (head, tail):
+        for key, value in _METADATA_PATTERN.findall(window):
+            summary.setdefault(key.decode("ascii"), int(value))
+    summary["empty"] = summary.get("itemCount") == 0
+    return summary
+
+
+def _is_last_page(summary, page_number, page_size):
+    if summary.get("empty"):
+        return True
+    if "totalPages" in summary:
+        return page_number >= summary["totalPages"]
+    if "itemCount" in summary:
+        return summary["itemCount"] < page_size
+    if "totalItems" in summary:
+        return page_number * page_size >= summary["totalItems"]
+    return False
+
+
+def export_pages(fetch_page, directory, prefix, page_size=1000, start_page=1, max_pages=None):
+    """
+    SYNOPSIS
+    Export every page of a paginated endpoint to its own file.
+
+    DESCRIPTION
+    Calls fetch_page for successive page numbers with a file sink, so each raw page body is written
+    to <directory>/<prefix>_page_<number>.json without being held in memory. Each page is written to
+    a .part file first and renamed when complete, so an interrupted export never leaves a truncated
+    page behind. Paging stops at the last page reported by the server, or at the first empty page.
+
+    ARGUMENTS
+    fetch_page : callable
+        A helper accepting page_number, page_size and sink keyword arguments, e.g.
+        functools.partial(get_devices, base_uri, access_token).
+    directory : str
+        The output directory. It is created if it does not exist.
+    prefix : str
+        The file name prefix, e.g. "devices".
+    page_size : int, optional
+        The number of items per page. Defaults to 1000.
+    start_page : int, optional
+        The first page to export, for resuming an interrupted export. Defaults to 1.
+    max_pages : int, optional
+        Stop after this many pages.
+
+    OUTPUTS
+    list
+        The page summaries (see stream_body_to_sink), each with an added "path" entry.
+
+    USAGE_EXAMPLE
+    pages = export_pages(partial(get_devices, base_uri, access_token), "exports", "devices")
+    print(f"Exported {sum(p['bytesWritten'] for p in pages)} bytes")
+    """
+    os.makedirs(directory, exist_ok=True)
+    summaries = []
+    page_number = start_page
+
+    while max_pages is None or len(summaries) < max_pages:
+        path = os.path.join(directory, f"{prefix}_page_{page_number:05d}.json")
+        part_path = path + ".part"
+        try:
+            with open(part_path, "wb") as sink:
+                summary = fetch_page(page_number=page_number, page_size=page_size, sink=sink)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+        if summary is None:
+            os.remove(part_path)
+            raise RuntimeError(f"Failed to export page {page_number} of {prefix}")
+
+        if summary.get("empty") and summaries:
+            # A trailing empty page only marks the end of the data
+            os.remove(part_path)
+            break
+
+        os.replace(part_path, path)
+        summary["path"] = path
+        summaries.append(summary)
+        logger.info(f"Exported {prefix} page {page_number} ({summary['bytesWritten']} bytes) to {path}")
+
+        if _is_last_page(summary, page_number, page_size):
+            break
+        page_number += 1
+
+    return summaries
@@ -8,17 +8,27 @@ Key Features:
 - Authenticates with N-central using a JWT token to obtain an access token
 - Retrieves device information using the GET /api/devices endpoint
 - Stores device data in SQLite with a 'date' column for each run
+- Writes each snapshot with batched inserts in WAL mode, so large fleets save in well under a second
+- Writes each page to a staging database as it arrives and swaps the day's snapshot in
+  atomically at the end, so memory stays bounded and fetching overlaps database writes
 - On each run, wipes and repopulates data for the current date only
+- Optional change-only (SCD type 2) storage that writes a row only when a device changes
 - Preserves historical data from previous days, building a history over time
+- Enforces an overall time budget so a stalled connection cannot hang a scheduled run
+- Optional retention policy (dailies for N days, weeklies for M months, monthlies forever) with
+  per-month archive files and scheduled vacuuming, so the database stays small
+- Optionally exports each day's snapshot as a date-partitioned Parquet or Arrow file for analytics
+- Optional DuckDB backend (ncentral_device_history.duckdb) for fast trend queries over long histories
 
 Usage:
 - Update base_uri and jwt_token with your N-central server URL and API token
 - Run the script daily (e.g., via cron) to build historical device records
-- Query the SQLite database to analyze device changes over time
+- Query the SQLite database to analyze device changes over time, e.g. with the as-of, diff and
+  first/last-seen helpers in History/Device_History_Query.py (indexed after every run)
+- Set NCENTRAL_PROFILE=1 to write cProfile/tracemalloc reports for the run to ./profiles
 """
 
 import sys
-import sqlite3
 import os
 from datetime import date
 
@@ -29,91 +39,48 @@ sys.path.append(parent_dir)
 
 from Devices.Get_Devices import get_devices
 from Authentication.Post_auth_authenticate import authenticate_user
-
-
-# Hardcoded schema for the devices table
-DEVICES_TABLE_SCHEMA = '''
-CREATE TABLE devices (
-    date TEXT NOT NULL,
-    "applianceId" INTEGER,
-    "customerId" INTEGER,
-    "customerName" TEXT,
-    "description" TEXT,
-    "deviceClass" TEXT,
-    "deviceClassLabel" TEXT,
-    "deviceId" INTEGER,
-    "discoveredName" TEXT,
-    "isProbe" INTEGER,
-    "lastApplianceCheckinTime" TEXT,
-    "lastLoggedInUser" TEXT,
-    "licenseMode" TEXT,
-    "longName" TEXT,
-    "orgUnitId" INTEGER,
-    "osId" TEXT,
-    "remoteControlUri" TEXT,
-    "siteId" INTEGER,
-    "siteName" TEXT,
-    "soId" INTEGER,
-    "soName" TEXT,
-    "sourceUri" TEXT,
-    "stillLoggedIn" TEXT,
-    "supportedOs" TEXT,
-    "supportedOsLabel" TEXT,
-    "uri" TEXT
-)
-'''
-
-# Column names in order (excluding date)
-DEVICE_COLUMNS = [
-    "applianceId", "customerId", "customerName", "description", "deviceClass",
-    "deviceClassLabel", "deviceId", "discoveredName", "isProbe",
-    "lastApplianceCheckinTime", "lastLoggedInUser", "licenseMode", "longName",
-    "orgUnitId", "osId", "remoteControlUri", "siteId", "siteName", "soId",
-    "soName", "sourceUri", "stillLoggedIn", "supportedOs", "supportedOsLabel", "uri"
-]
-
-
-def save_devices_to_db(db_path, devices):
-    """Save devices to SQLite database with date tracking."""
-    today = date.today().isoformat()
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    try:
-        # Create table if it doesn't exist
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='devices'")
-        if not cursor.fetchone():
-            cursor.execute(DEVICES_TABLE_SCHEMA)
-            print("Created table 'devices'")
-        
-        # Delete existing records for today's date
-        cursor.execute("DELETE FROM devices WHERE date = ?", (today,))
-        deleted_count = cursor.rowcount
-        if deleted_count > 0:
-            print(f"Removed {deleted_count} existing records for {today}")
-        
-        # Insert new records
-        placeholders = ", ".join(["?" for _ in range(len(DEVICE_COLUMNS) + 1)])
-        column_names = ", ".join(['"date"'] + [f'"{c}"' for c in DEVICE_COLUMNS])
-        insert_sql = f"INSERT INTO devices ({column_names}) VALUES ({placeholders})"
-        
-        for device in devices:
-            values = [today] + [device.get(col) for col in DEVICE_COLUMNS]
-            cursor.execute(insert_sql, values)
-        
-        conn.commit()
-        print(f"Successfully saved {len(devices)} devices to database for {today}")
-        
-        # Show summary of historical data
-        cursor.execute("SELECT date, COUNT(*) FROM devices GROUP BY date ORDER BY date")
-        history = cursor.fetchall()
-        print("\nDatabase history:")
-        for record_date, count in history:
-            print(f"  {record_date}: {count} devices")
-        
-    finally:
-        conn.close()
+from Utilities.Profiling import profile_workflow
+from Utilities.Http_Client import workflow_deadline
+from Utilities.Concurrency import prefetch
+from History.Device_History_Store import connect_history_db, save_devices_to_db, save_device_pages_to_db
+from History.Device_History_Query import ensure_history_indexes
+from History.Parquet_Export import export_snapshot
+from History.History_Retention import apply_retention
+from History.DuckDB_Backend import save_devices_to_duckdb, save_device_pages_to_duckdb
+
+
+def fetch_device_pages(base_uri, access_token, page_size, filter_id=None, select=None, sort_by=None, sort_order=None):
+    """Yield each page of devices from get_devices; raises RuntimeError if a page cannot be retrieved."""
+    page_number = 1
+    fetched_count = 0
+    while True:
+        response = get_devices(
+            base_uri=base_uri,
+            access_token=access_token,
+            filter_id=filter_id,
+            page_number=page_number,
+            page_size=page_size,
+            select=select,
+            sort_by=sort_by,
+            sort_order=sort_order
+        )
+
+        if not response or "data" not in response:
+            raise RuntimeError(f"Failed to retrieve devices on page {page_number}.")
+
+        devices = response["data"]
+        if not devices:
+            return  # No more devices to fetch
+
+        fetched_count += len(devices)
+        print(f"  Page {page_number}: fetched {len(devices)} devices (total: {fetched_count})")
+        yield devices
+
+        # Check if we've fetched all devices (less than page_size means last page)
+        if len(devices) < page_size:
+            return
+
+        page_number += 1
 
 
 # Define the variables needed for authentication
@@ -124,66 +91,98 @@ jwt_token = "your_jwt_token"  # Replace with your N-central User-API Token (JWT)
 access_expiry = None  # Override access token expiry (e.g., "120s" for 120 seconds)
 refresh_expiry = None  # Override refresh token expiry (e.g., "120m" for 120 minutes)
 
-# Authenticate and get access token
-auth_response = authenticate_user(
-    base_uri=base_uri,
-    jwt_token=jwt_token,
-    access_expiry=access_expiry,
-    refresh_expiry=refresh_expiry
-)
-
-if not auth_response or "tokens" not in auth_response:
-    print("Authentication failed. Please check your credentials.")
-    sys.exit(1)
-
-access_token = auth_response["tokens"]["access"]["token"]
-print("Successfully authenticated!")
-
-# Optional parameters for get_devices (set to None if not needed)
-filter_id = None  # The ID of a filter to apply
-page_size = 500  # Number of devices per page
-select = None  # Field selection expression
-sort_by = "deviceName"  # Sort by device name
-sort_order = "asc"  # Sort in ascending order
-
-# Fetch all devices with pagination
-all_devices = []
-page_number = 1
-
-print("Fetching devices...")
-while True:
-    response = get_devices(
+# Overall time budget for the run in seconds (None for no limit). Every API call is capped to the
+# remaining budget, and nothing is written to the database if the budget runs out mid-fetch.
+deadline_seconds = 20 * 60
+
+# Write each page to the database as it arrives (True), or fetch every device first (False)
+pipelined = True
+
+# "snapshot" stores every device every day; "scd2" stores a row only when a device changes and
+# exposes a 'devices' view with the same columns (see History/Device_History_Store.py).
+# A database keeps the storage mode it was created with.
+storage_mode = "snapshot"
+
+# "sqlite" (default) or "duckdb" (requires the duckdb package; see History/DuckDB_Backend.py).
+# Indexing, retention and columnar export below apply to the SQLite backend.
+history_backend = "sqlite"
+
+# Directory for the columnar copy of each day's snapshot (None to skip; requires pyarrow), and its
+# format: "parquet" or "arrow" (see History/Parquet_Export.py)
+columnar_export_dir = None
+columnar_export_format = "parquet"
+
+# Retention (see History/History_Retention.py): keep every snapshot for retention_daily_days days,
+# weekly snapshots for retention_weekly_months months and monthly snapshots forever. None keeps
+# everything. Removed snapshots are copied to per-month files in retention_archive_dir, if set.
+retention_daily_days = None
+retention_weekly_months = 12
+retention_archive_dir = None
+
+# Profiling is off unless NCENTRAL_PROFILE=1 is set (see Utilities/Profiling.py)
+with profile_workflow("All_Devices_History"), workflow_deadline(deadline_seconds, name="All_Devices_History") as deadline:
+    # Authenticate and get access token
+    auth_response = authenticate_user(
         base_uri=base_uri,
-        access_token=access_token,
-        filter_id=filter_id,
-        page_number=page_number,
-        page_size=page_size,
-        select=select,
-        sort_by=sort_by,
-        sort_order=sort_order
+        jwt_token=jwt_token,
+        access_expiry=access_expiry,
+        refresh_expiry=refresh_expiry
     )
-    
-    if not response or "data" not in response:
-        print(f"Failed to retrieve devices on page {page_number}.")
-        break
-    
-    devices = response["data"]
-    if not devices:
-        break  # No more devices to fetch
-    
-    all_devices.extend(devices)
-    print(f"  Page {page_number}: fetched {len(devices)} devices (total: {len(all_devices)})")
-    
-    # Check if we've fetched all devices (less than page_size means last page)
-    if len(devices) < page_size:
-        break
-    
-    page_number += 1
-
-# Save results to SQLite database
-db_filename = os.path.join(script_dir, "ncentral_device_history.db")
-
-if all_devices:
-    save_devices_to_db(db_filename, all_devices)
-else:
-    print("No devices found.")
+
+    if not auth_response or "tokens" not in auth_response:
+        print("Authentication failed. Please check your credentials.")
+        sys.exit(1)
+
+    access_token = auth_response["tokens"]["access"]["token"]
+    print("Successfully authenticated!")
+
+    # Optional parameters for get_devices (set to None if not needed)
+    filter_id = None  # The ID of a filter to apply
+    page_size = 500  # Number of devices per page
+    select = None  # Field selection expression
+    sort_by = "deviceName"  # Sort by device name
+    sort_order = "asc"  # Sort in ascending order
+
+    if history_backend == "duckdb":
+        db_filename = os.path.join(script_dir, "ncentral_device_history.duckdb")
+        save_pages, save_all = save_device_pages_to_duckdb, save_devices_to_duckdb
+    else:
+        db_filename = os.path.join(script_dir, "ncentral_device_history.db")
+        save_pages, save_all = save_device_pages_to_db, save_devices_to_db
+    pages = fetch_device_pages(base_uri, access_token, page_size, filter_id, select, sort_by, sort_order)
+
+    print("Fetching devices...")
+    try:
+        if pipelined:
+            # The next page downloads in the background while the current one is written
+            save_pages(db_filename, prefetch(pages, depth=2), storage=storage_mode)
+        else:
+            all_devices = [device for devices in pages for device in devices]
+            if all_devices:
+                save_all(db_filename, all_devices, storage=storage_mode)
+            else:
+                print("No devices found.")
+    except (RuntimeError, ValueError) as e:
+        print(e)
+        if deadline is not None and deadline.expired:
+            print(f"Time budget of {deadline_seconds}s exceeded; database left unchanged.")
+        sys.exit(1)
+
+    if history_backend == "sqlite" and os.path.exists(db_filename):
+        # Keep the time-travel indexes in place; statistics are rebuilt only when one is created
+        conn = connect_history_db(db_filename)
+        try:
+            ensure_history_indexes(conn)
+        finally:
+            conn.close()
+
+        if retention_daily_days is not None:
+            apply_retention(db_filename, daily_days=retention_daily_days, weekly_months=retention_weekly_months,
+                            archive_dir=retention_archive_dir)
+
+        if columnar_export_dir:
+            try:
+                export_snapshot(db_filename, date.today().isoformat(), columnar_export_dir,
+                                export_format=columnar_export_format)
+            except RuntimeError as e:
+                print(f"Columnar export skipped: {e}")
@@ -0,0 +1,74 @@
+"""
+All Entities History Script
+
+This script records a daily snapshot of customers, sites, organization units, and the users and
+access groups of every organization unit in a local SQLite database (ncentral_entity_history.db).
+
+Key Features:
+- Authenticates with N-central using a JWT token to obtain an access token
+- Lists every entity with its existing helper (get_customers, get_sites, get_organization_units,
+  get_org_unit_users, get_org_unit_access_groups), as configured in History/Snapshot_Engine.py
+- Fetches all entities concurrently over the shared pooled HTTP client
+- Writes every entity in one transaction, so a failed run leaves the database unchanged
+- Stores one table per entity with a 'date' column; reruns on the same day only rewrite changed rows
+- Enforces an overall time budget so a stalled connection cannot hang a scheduled run
+
+Usage:
+- Update base_uri and jwt_token with your N-central server URL and API token
+- Run the script daily (e.g., via cron) alongside All_Devices_History.py
+- Set entities to a subset of names to snapshot fewer entities
+"""
+
+import sys
+import os
+
+# Add the parent directory to the path (relative to this script's location)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(parent_dir)
+
+import requests
+
+from Authentication.Post_auth_authenticate import authenticate_user
+from Utilities.Profiling import profile_workflow
+from Utilities.Http_Client import workflow_deadline
+from History.Snapshot_Engine import snapshot_entities
+
+
+# Define the variables needed for authentication
+base_uri = "https://yourdomain.com"  # Replace with your N-central server URL
+jwt_token = "your_jwt_token"  # Replace with your N-central User-API Token (JWT)
+
+# Entities to snapshot (None for all of: customers, sites, org_units, org_unit_users, org_unit_access_groups)
+entities = None
+
+# Number of concurrent requests, and items per page
+max_workers = 8
+page_size = 500
+
+# Overall time budget for the run in seconds (None for no limit)
+deadline_seconds = 20 * 60
+
+db_filename = os.path.join(script_dir, "ncentral_entity_history.db")
+
+# Profiling is off unless NCENTRAL_PROFILE=1 is set (see Utilities/Profiling.py)
+with profile_workflow("All_Entities_History"), workflow_deadline(deadline_seconds, name="All_Entities_History") as deadline:
+    # Authenticate and get access token
+    auth_response = authenticate_user(base_uri=base_uri, jwt_token=jwt_token)
+
+    if not auth_response or "tokens" not in auth_response:
+        print("Authentication failed. Please check your credentials.")
+        sys.exit(1)
+
+    access_token = auth_response["tokens"]["access"]["token"]
+    print("Successfully authenticated!")
+
+    print("Fetching entities...")
+    try:
+        snapshot_entities(db_filename, base_uri, access_token, entities=entities,
+                          page_size=page_size, max_workers=max_workers)
+    except (RuntimeError, ValueError, requests.exceptions.RequestException) as e:
+        print(e)
+        if deadline is not None and deadline.expired:
+            print(f"Time budget of {deadline_seconds}s exceeded; database left unchanged.")
+        sys.exit(1)
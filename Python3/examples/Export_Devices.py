@@ -0,0 +1,79 @@
+"""
+Export Devices Script
+
+This script exports every device from N-central via the REST API to local files, streaming each
+page body straight to disk so memory use stays flat regardless of page size or fleet size.
+
+Key Features:
+- Authenticates with N-central using a JWT token to obtain an access token
+- Retrieves device pages using the GET /api/devices endpoint
+- Writes each raw page body to exports/devices_page_<number>.json as it is received, or
+  parses devices incrementally and writes one device per line to exports/devices.jsonl
+- Never holds a full page in memory, so large page sizes are safe
+
+Usage:
+- Update base_uri and jwt_token with your N-central server URL and API token
+- Run the script; the page files can be loaded one at a time with json.load()
+- Set export_format to "pages" (raw page files) or "jsonl" (one device per line)
+- Set start_page to resume an interrupted "pages" export
+"""
+
+import sys
+import os
+import json
+from functools import partial
+
+# Add the parent directory to the path (relative to this script's location)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(parent_dir)
+
+from Devices.Get_Devices import get_devices, iter_devices
+from Authentication.Post_auth_authenticate import authenticate_user
+from Utilities.Streaming_Export import export_pages
+
+
+# Define the variables needed for authentication
+base_uri = "https://yourdomain.com"  # Replace with your N-central server URL
+jwt_token = "your_jwt_token"  # Replace with your N-central User-API Token (JWT)
+
+# Export settings
+export_dir = os.path.join(script_dir, "exports")  # Directory for the exported files
+export_format = "pages"  # "pages" for raw page files, "jsonl" for one device per line
+page_size = 1000  # Number of devices per page
+start_page = 1  # First page to export in "pages" format (set higher to resume an interrupted export)
+
+# Authenticate and get access token
+auth_response = authenticate_user(base_uri=base_uri, jwt_token=jwt_token)
+
+if not auth_response or "tokens" not in auth_response:
+    print("Authentication failed. Please check your credentials.")
+    sys.exit(1)
+
+access_token = auth_response["tokens"]["access"]["token"]
+print("Successfully authenticated!")
+
+print("Exporting devices...")
+
+if export_format == "jsonl":
+    # Parse devices as they arrive and write one per line, sorted by ID so pages are stable
+    os.makedirs(export_dir, exist_ok=True)
+    jsonl_path = os.path.join(export_dir, "devices.jsonl")
+    device_count = 0
+    with open(jsonl_path + ".part", "w", encoding="utf-8") as jsonl_file:
+        for device in iter_devices(base_uri, access_token, page_size=page_size, sort_by="deviceId", sort_order="asc"):
+            jsonl_file.write(json.dumps(device, separators=(",", ":")) + "\n")
+            device_count += 1
+    os.replace(jsonl_path + ".part", jsonl_path)
+    print(f"Exported {device_count} devices to {jsonl_path}")
+else:
+    # Stream every raw page body to disk, sorted by ID so page boundaries are stable
+    fetch_page = partial(get_devices, base_uri, access_token, sort_by="deviceId", sort_order="asc")
+    try:
+        pages = export_pages(fetch_page, export_dir, "devices", page_size=page_size, start_page=start_page)
+    except RuntimeError as e:
+        print(f"Export failed: {e}")
+        sys.exit(1)
+
+    total_bytes = sum(page["bytesWritten"] for page in pages)
+    print(f"Exported {len(pages)} page(s), {total_bytes} bytes, to {export_dir}")
@@ -0,0 +1,133 @@
+"""
+Get Activation Keys Script
+
+This script exports the activation key of every device on the N-central server to a CSV (or JSON
+Lines) file. It is the Python counterpart of Powershell/examples/Get_Activation_Keys.ps1.
+
+Key Features:
+- Authenticates with N-central using a JWT token to obtain an access token
+- Streams devices page by page from GET /api/devices (iter_devices), so fetching activation
+  keys starts with the first page instead of after the whole device list has been downloaded
+- Fetches activation keys concurrently over the shared pooled HTTP client, with the pool's
+  connections opened up front
+- Writes each device to the output file as soon as its key arrives; the file is renamed into
+  place only when the export completes
+- Output columns: deviceId, longName, deviceClass, activationKey ("ERROR" when the key could not
+  be retrieved, as in the PowerShell script)
+
+Usage:
+- Update base_uri and jwt_token with your N-central server URL and API token
+- Set output_format to "csv" or "jsonl" and max_workers to the number of concurrent requests
+- Run the script; the file is written to examples/exports/Devices_<timestamp>.<format>
+"""
+
+import sys
+import os
+import csv
+import json
+from datetime import datetime
+
+# Add the parent directory to the path (relative to this script's location)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(parent_dir)
+
+import requests
+
+from Authentication.Post_auth_authenticate import authenticate_user
+from Devices.Get_Devices import iter_devices
+from Devices.Get_Activation_Key_By_Device_Id import get_device_activation_key
+from Utilities.Concurrency import imap_unordered
+from Utilities.Http_Client import warm_up, workflow_deadline
+from Utilities.Profiling import profile_workflow
+
+
+# Define the variables needed for authentication
+base_uri = "https://yourdomain.com"  # Replace with your N-central server URL
+jwt_token = "your_jwt_token"  # Replace with your N-central User-API Token (JWT)
+
+# Export settings
+export_dir = os.path.join(script_dir, "exports")  # Directory for the exported file
+output_format = "csv"  # "csv" or "jsonl"
+page_size = 1000  # Number of devices per page
+max_workers = 16  # Number of concurrent activation key requests
+progress_every = 1000  # Print progress after this many devices
+
+# Overall time budget for the run in seconds (None for no limit)
+deadline_seconds = 60 * 60
+
+COLUMNS = ("deviceId", "longName", "deviceClass", "activationKey")
+
+
+def activation_key(response):
+    """Extract the key from a get_device_activation_key response (plain or wrapped in "data")."""
+    if isinstance(response, dict) and isinstance(response.get("data"), dict):
+        response = response["data"]
+    if isinstance(response, dict) and response.get("activationKey") is not None:
+        return response["activationKey"]
+    return "ERROR"
+
+
+# Profiling is off unless NCENTRAL_PROFILE=1 is set (see Utilities/Profiling.py)
+with profile_workflow("Get_Activation_Keys"), workflow_deadline(deadline_seconds, name="Get_Activation_Keys") as deadline:
+    # Authenticate and get access token
+    auth_response = authenticate_user(base_uri=base_uri, jwt_token=jwt_token)
+
+    if not auth_response or "tokens" not in auth_response:
+        print("Authentication failed. Please check your credentials.")
+        sys.exit(1)
+
+    access_token = auth_response["tokens"]["access"]["token"]
+    print("Successfully authenticated!")
+
+    # Open the pooled connections before the burst of parallel requests
+    warm_up(base_uri, connections=max_workers)
+
+    os.makedirs(export_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(export_dir, f"Devices_{timestamp}.{output_format}")
+
+    def fetch_key(device):
+        return get_device_activation_key(device["deviceId"], base_uri, access_token)
+
+    print("Fetching activation keys...")
+    device_count = 0
+    failed_count = 0
+    try:
+        with open(output_path + ".part", "w", encoding="utf-8", newline="") as output_file:
+            writer = csv.writer(output_file) if output_format == "csv" else None
+            if writer is not None:
+                writer.writerow(COLUMNS)
+
+            # Devices sorted by ID so page boundaries stay stable while keys are being fetched
+            devices = iter_devices(base_uri, access_token, page_size=page_size, sort_by="deviceId", sort_order="asc")
+            for device, response, error in imap_unordered(fetch_key, devices, max_workers=max_workers):
+                key = activation_key(response) if error is None else "ERROR"
+                if key == "ERROR":
+                    failed_count += 1
+                    print(f"Failed to retrieve activation key for device {device.get('deviceId')}"
+                          + (f": {error}" if error is not None else ""))
+
+                row = (device.get("deviceId"), device.get("longName"), device.get("deviceClass"), key)
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    output_file.write(json.dumps(dict(zip(COLUMNS, row)), separators=(",", ":")) + "\n")
+
+                device_count += 1
+                if device_count % progress_every == 0:
+                    print(f"Processed {device_count} devices...")
+    except requests.exceptions.RequestException as e:
+        # Listing devices failed; the partial file is kept for inspection
+        print(f"Error fetching devices: {e}")
+        if deadline is not None and deadline.expired:
+            print(f"Time budget of {deadline_seconds}s exceeded.")
+        print(f"Partial export of {device_count} devices left in {output_path}.part")
+        sys.exit(1)
+
+    os.replace(output_path + ".part", output_path)
+
+    if device_count == 0:
+        print("No devices were retrieved from the API.")
+    else:
+        print(f"Successfully exported {device_count} devices to {output_path} ({failed_count} without a key)")